@@ -20,11 +20,12 @@ import numpy as np
 import time
 
 # Modullarni import qilish
-from audio_utils import AudioLoader, AudioPreprocessor, SilenceRemover
+from audio_utils import AudioLoader, AudioPreprocessor, SilenceRemover, TimestampMap
 from stt import WhisperTranscriber
 from diarization import SpeakerDiarizer
 from emotion import EmotionDetector
 from subtitles import SubtitleGenerator
+from timeline import join_timeline, summarize_speaker_emotions
 
 
 # Streamlit konfiguratsiya
@@ -90,6 +91,8 @@ if 'emotion_predictions' not in st.session_state:
     st.session_state.emotion_predictions = None
 if 'aligned_segments' not in st.session_state:
     st.session_state.aligned_segments = None
+if 'timestamp_map' not in st.session_state:
+    st.session_state.timestamp_map = None
 
 
 def main():
@@ -120,6 +123,16 @@ def main():
             help="Transkripsiya tili"
         )
         
+        # Decode preseti
+        decode_preset = st.selectbox(
+            "Decode rejimi",
+            options=[None, 'fast', 'balanced', 'accurate'],
+            index=0,
+            format_func=lambda preset: preset or 'standart',
+            help="standart - whisper odatiy decode (API va CLI bilan bir xil); "
+                 "fast - greedy, eng tez; accurate - beam search, eng aniq"
+        )
+        
         st.markdown("---")
         
         # Preprocessing sozlamalari
@@ -254,12 +267,14 @@ def main():
                         progress_bar.progress(50)
                         
                         # 2. Sukut kesish
+                        timestamp_map = TimestampMap.identity(len(processed_audio), sr)
                         if enable_silence_removal:
                             status_text.text("2/2 - Sukut qismlari olib tashlanmoqda...")
-                            processed_audio, removed_intervals = remover.remove_silence(
+                            processed_audio, removed_intervals, timestamp_map = remover.remove_silence(
                                 processed_audio,
                                 threshold_db=-40.0,
-                                min_silence_duration=0.5
+                                min_silence_duration=0.5,
+                                return_map=True
                             )
                         
                         progress_bar.progress(100)
@@ -267,6 +282,7 @@ def main():
                         
                         # Session state'ga saqlash
                         st.session_state.processed_audio = processed_audio
+                        st.session_state.timestamp_map = timestamp_map
                         
                         # Natijalarni ko'rsatish
                         col1, col2 = st.columns(2)
@@ -305,7 +321,8 @@ def main():
                         transcriber = WhisperTranscriber(
                             model_name=whisper_model,
                             device='cpu',
-                            language=language
+                            language=language,
+                            preset=decode_preset
                         )
                         
                         # Progress bar
@@ -325,6 +342,9 @@ def main():
                         progress_bar.progress(100)
                         status_text.text("✅ Transkripsiya tugallandi!")
                         
+                        # Model registry'da qoladi - keyingi bosishda qayta yuklanmaydi
+                        transcriber.release_model()
+                        
                         # Session state'ga saqlash
                         st.session_state.transcription_segments = segments
                         
@@ -384,10 +404,11 @@ def main():
                                 # Session state'ga saqlash
                                 st.session_state.speaker_segments = speaker_segments
                                 
-                                # Transkripsiya bilan moslashtirish
-                                aligned = diarizer.align_with_transcription(
-                                    speaker_segments,
-                                    st.session_state.transcription_segments
+                                # Transkripsiya (va mavjud bo'lsa emotsiyalar) bilan birlashtirish
+                                aligned = join_timeline(
+                                    st.session_state.transcription_segments,
+                                    speakers=speaker_segments,
+                                    emotions=st.session_state.emotion_predictions
                                 )
                                 st.session_state.aligned_segments = aligned
                                 
@@ -427,6 +448,14 @@ def main():
                                 # Session state'ga saqlash
                                 st.session_state.emotion_predictions = predictions
                                 
+                                # Spikerlar aniqlangan bo'lsa emotsiyalarni ularga bog'lash
+                                if st.session_state.speaker_segments:
+                                    st.session_state.aligned_segments = join_timeline(
+                                        segments,
+                                        speakers=st.session_state.speaker_segments,
+                                        emotions=predictions
+                                    )
+                                
                                 st.success(f"✅ {len(predictions)} ta segment uchun emotsiya aniqlandi!")
                                 
                                 # Formatlangan natija
@@ -444,6 +473,16 @@ def main():
                                     emotion_uz = EmotionDetector.EMOTIONS.get(emotion, emotion)
                                     st.write(f"• {emotion_uz}: {percentage:.1f}%")
                                 
+                                if st.session_state.aligned_segments:
+                                    st.write("**👥 Spikerlar bo'yicha emotsiyalar:**")
+                                    speaker_emotions = summarize_speaker_emotions(st.session_state.aligned_segments)
+                                    for speaker, entry in sorted(speaker_emotions.items()):
+                                        shares = ', '.join(
+                                            f"{EmotionDetector.EMOTIONS.get(emotion, emotion)} {share * 100:.0f}%"
+                                            for emotion, share in entry['emotions'].items()
+                                        )
+                                        st.write(f"• {speaker}: {shares}")
+                                
                             except Exception as e:
                                 st.error(f"❌ Xatolik: {str(e)}")
     
@@ -493,6 +532,10 @@ def main():
                         # Aligned segments yoki oddiy transkripsiya
                         segments = st.session_state.aligned_segments if st.session_state.aligned_segments else st.session_state.transcription_segments
                         
+                        # Vaqt belgilarini asl media vaqtiga qaytarish
+                        if st.session_state.timestamp_map is not None:
+                            segments = st.session_state.timestamp_map.remap_segments(segments)
+                        
                         srt_path, vtt_path = generator.generate_both(
                             segments,
                             output_dir,
@@ -7,10 +7,14 @@ Modullar:
     - loader: Audio/video fayllarni yuklash va konvertatsiya
     - preprocessing: Shovqin tozalash va normalizatsiya
     - silence_removal: Sukut qismlarini kesish
+    - timestamp_map: Tozalangan vaqtni asl vaqtga qaytarish
+    - segmented_audio: Nusxasiz (view) tozalangan audio buferi
 """
 
 from .loader import AudioLoader
 from .preprocessing import AudioPreprocessor
 from .silence_removal import SilenceRemover
+from .timestamp_map import TimestampMap
+from .segmented_audio import SegmentedAudio
 
-__all__ = ['AudioLoader', 'AudioPreprocessor', 'SilenceRemover']
+__all__ = ['AudioLoader', 'AudioPreprocessor', 'SilenceRemover', 'TimestampMap', 'SegmentedAudio']
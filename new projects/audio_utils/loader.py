@@ -14,6 +14,8 @@ from pydub import AudioSegment
 from moviepy.editor import VideoFileClip
 import numpy as np
 
+from .segmented_audio import SegmentedAudio
+
 
 class AudioLoader:
     """
@@ -196,7 +198,8 @@ class AudioLoader:
         Audio ma'lumotlarni faylga saqlash
         
         Args:
-            audio_data (np.ndarray): Audio ma'lumotlar
+            audio_data (np.ndarray): Audio ma'lumotlar (yoki SegmentedAudio -
+                bo'laklari uzluksiz massivga yig'ilmasdan ketma-ket yoziladi)
             output_path (str): Saqlash yo'li
             sample_rate (int, optional): Sample rate
             
@@ -211,7 +214,12 @@ class AudioLoader:
             os.makedirs(Path(output_path).parent, exist_ok=True)
             
             # Audio saqlash
-            sf.write(output_path, audio_data, sample_rate)
+            if isinstance(audio_data, SegmentedAudio) and not audio_data.is_materialized:
+                with sf.SoundFile(output_path, 'w', samplerate=sample_rate, channels=1) as f:
+                    for view, _, _ in audio_data.iter_segments():
+                        f.write(view)
+            else:
+                sf.write(output_path, audio_data, sample_rate)
             
             print(f"💾 Audio saqlandi: {Path(output_path).name}")
             return output_path
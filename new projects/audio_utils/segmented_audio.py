@@ -0,0 +1,153 @@
+"""
+Segmented Audio Module
+======================
+Sukut olib tashlangan audiodni nusxalamasdan saqlash:
+asl massivdagi view'lar ro'yxati + TimestampMap
+"""
+
+import numpy as np
+from typing import Iterator, List, Optional, Tuple
+
+from .timestamp_map import TimestampMap
+
+
+class SegmentedAudio:
+    """
+    Tozalangan audio uchun yengil bufer
+
+    Saqlangan bo'laklar asl massivning view'lari sifatida turadi, shuning uchun
+    yaratish O(bo'laklar soni) va audio nusxalanmaydi. Uzluksiz massiv faqat
+    haqiqatan kerak bo'lganda (materialize / np.asarray) bir marta yaratiladi.
+
+    len() va [start:end] kesish np.ndarray kabi ishlaydi: segment bo'yicha
+    kesadigan joylar (emotion, VAD, AudioLoader.save_audio, oynali
+    transkripsiya - transcribe_gated / transcribe_batched) uni nusxasiz
+    ishlatadi. Butun audio kerak bo'lgan joylar (diarization, to'liq
+    transkripsiya) np.asarray orqali uni bir marta materialize qiladi.
+    """
+
+    def __init__(self, audio_data: np.ndarray, timestamp_map: TimestampMap):
+        """
+        Args:
+            audio_data (np.ndarray): Asl (kesilmagan) audio
+            timestamp_map (TimestampMap): Saqlangan bo'laklar xaritasi
+        """
+        self.timestamp_map = timestamp_map
+        self.sample_rate = timestamp_map.sample_rate
+        self.dtype = audio_data.dtype
+
+        self.views: List[np.ndarray] = [
+            audio_data[start:start + length]
+            for start, length in zip(timestamp_map.original_starts, timestamp_map.lengths)
+        ]
+        self._clean_starts = timestamp_map.clean_starts
+        self._length = int(timestamp_map.lengths.sum())
+        self._materialized: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def shape(self) -> Tuple[int]:
+        return (self._length,)
+
+    @property
+    def ndim(self) -> int:
+        return 1
+
+    @property
+    def duration(self) -> float:
+        """Tozalangan audio davomiyligi (soniya)"""
+        return self._length / float(self.sample_rate)
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._materialized is not None
+
+    def materialize(self) -> np.ndarray:
+        """
+        Uzluksiz massivni yaratish (natija keshlanadi)
+
+        Returns:
+            np.ndarray: Tozalangan audio
+        """
+        if self._materialized is None:
+            if len(self.views) == 1:
+                self._materialized = self.views[0]
+            elif self.views:
+                self._materialized = np.concatenate(self.views)
+            else:
+                self._materialized = np.zeros(0, dtype=self.dtype)
+        return self._materialized
+
+    def __array__(self, dtype=None, copy=None):
+        audio = self.materialize()
+        if dtype is not None:
+            return audio.astype(dtype, copy=False)
+        return audio
+
+    def astype(self, dtype, copy: bool = True) -> np.ndarray:
+        return self.materialize().astype(dtype, copy=copy)
+
+    def __getitem__(self, key):
+        """
+        Tozalangan vaqt bo'yicha kesish
+
+        Bitta bo'lak ichidagi kesish view qaytaradi (nusxasiz), bir nechta
+        bo'lakni kesib o'tsa faqat shu oraliq nusxalanadi.
+        """
+        if self._materialized is not None:
+            return self._materialized[key]
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return self.materialize()[key]
+            return self._slice(start, stop)
+
+        if isinstance(key, (int, np.integer)):
+            index = int(key)
+            if index < 0:
+                index += self._length
+            if not 0 <= index < self._length:
+                raise IndexError("SegmentedAudio index out of range")
+            i = int(np.searchsorted(self._clean_starts, index, side='right')) - 1
+            return self.views[i][index - self._clean_starts[i]]
+
+        return self.materialize()[key]
+
+    def _slice(self, start: int, stop: int) -> np.ndarray:
+        if stop <= start:
+            return np.zeros(0, dtype=self.dtype)
+
+        first = int(np.searchsorted(self._clean_starts, start, side='right')) - 1
+        pieces = []
+
+        i = first
+        while i < len(self.views) and self._clean_starts[i] < stop:
+            offset = int(self._clean_starts[i])
+            local_start = max(start - offset, 0)
+            local_stop = min(stop - offset, len(self.views[i]))
+            if local_stop > local_start:
+                pieces.append(self.views[i][local_start:local_stop])
+            i += 1
+
+        if len(pieces) == 1:
+            return pieces[0]
+        if not pieces:
+            return np.zeros(0, dtype=self.dtype)
+        return np.concatenate(pieces)
+
+    def iter_segments(self) -> Iterator[Tuple[np.ndarray, float, float]]:
+        """
+        Saqlangan bo'laklarni aylanib chiqish
+
+        Yields:
+            Tuple[np.ndarray, float, float]: (view, tozalangan boshlanish, asl boshlanish)
+        """
+        for view, clean_start, orig_start in zip(
+            self.views,
+            self._clean_starts,
+            self.timestamp_map.original_starts
+        ):
+            yield view, clean_start / self.sample_rate, orig_start / self.sample_rate
@@ -8,6 +8,9 @@ import numpy as np
 import librosa
 from typing import List, Tuple
 
+from .timestamp_map import TimestampMap
+from .segmented_audio import SegmentedAudio
+
 
 class SilenceRemover:
     """
@@ -106,8 +109,10 @@ class SilenceRemover:
         audio_data: np.ndarray,
         threshold_db: float = -40.0,
         min_silence_duration: float = 0.5,
-        keep_silence_duration: float = 0.1
-    ) -> Tuple[np.ndarray, List[Tuple[float, float]]]:
+        keep_silence_duration: float = 0.1,
+        return_map: bool = False,
+        as_segments: bool = False
+    ) -> Tuple:
         """
         Sukut qismlarini olib tashlash
         
@@ -116,9 +121,14 @@ class SilenceRemover:
             threshold_db (float): Sukut chegarasi (dB). Default: -40.0
             min_silence_duration (float): Minimal sukut davomiyligi (soniya). Default: 0.5
             keep_silence_duration (float): Qoldiriladigan sukut (soniya). Default: 0.1
+            return_map (bool): TimestampMap ham qaytarish. Default: False
+            as_segments (bool): np.concatenate o'rniga SegmentedAudio (view'lar,
+                nusxasiz) qaytarish. Default: False
             
         Returns:
             Tuple[np.ndarray, List]: (Tozalangan audio, olib tashlangan intervallar)
+            return_map=True bo'lsa: (Tozalangan audio, intervallar, TimestampMap)
+            as_segments=True bo'lsa tozalangan audio o'rnida SegmentedAudio
         """
         try:
             print("\n" + "="*50)
@@ -134,51 +144,20 @@ class SilenceRemover:
             
             if not silence_intervals:
                 print("ℹ️ Sukut qismlari topilmadi")
-                return audio_data, []
-            
-            # Audio segmentlarini ajratish (sukutdan tashqari qismlar)
-            segments = []
-            removed_intervals = []
-            
-            prev_end = 0.0
-            total_duration = len(audio_data) / self.sample_rate
-            
-            for start, end in silence_intervals:
-                # Sukutdan oldingi qismni qo'shish
-                if start > prev_end:
-                    start_sample = int(prev_end * self.sample_rate)
-                    end_sample = int(start * self.sample_rate)
-                    segments.append(audio_data[start_sample:end_sample])
-                
-                # Oz miqdorda sukutni qoldirish (tabiiy eshitish uchun)
-                keep_samples = int(keep_silence_duration * self.sample_rate)
-                start_sample = int(start * self.sample_rate)
-                end_sample = min(int(end * self.sample_rate), len(audio_data))
-                
-                # Sukutning boshidan va oxiridan oz qoldirish
-                if keep_samples > 0 and (end_sample - start_sample) > keep_samples * 2:
-                    segments.append(audio_data[start_sample:start_sample + keep_samples])
-                    segments.append(audio_data[end_sample - keep_samples:end_sample])
-                    removed_intervals.append((start + keep_silence_duration, end - keep_silence_duration))
-                else:
-                    removed_intervals.append((start, end))
-                
-                prev_end = end
+                return self._result(audio_data, [], [(0, len(audio_data))], len(audio_data), return_map, as_segments)
             
-            # Oxirgi qismni qo'shish
-            if prev_end < total_duration:
-                start_sample = int(prev_end * self.sample_rate)
-                segments.append(audio_data[start_sample:])
+            kept_ranges, removed_intervals = self._compute_kept_ranges(
+                audio_data,
+                silence_intervals,
+                keep_silence_duration
+            )
             
-            # Segmentlarni birlashtirish
-            if segments:
-                cleaned_audio = np.concatenate(segments)
-            else:
-                cleaned_audio = audio_data
+            if not kept_ranges:
+                kept_ranges = [(0, len(audio_data))]
             
             # Statistika
             original_duration = len(audio_data) / self.sample_rate
-            cleaned_duration = len(cleaned_audio) / self.sample_rate
+            cleaned_duration = sum(e - s for s, e in kept_ranges) / self.sample_rate
             removed_duration = original_duration - cleaned_duration
             removed_percent = (removed_duration / original_duration) * 100
             
@@ -191,11 +170,81 @@ class SilenceRemover:
             print("✅ SUKUT TOZALASH TUGALLANDI")
             print("="*50 + "\n")
             
-            return cleaned_audio, removed_intervals
+            return self._result(audio_data, removed_intervals, kept_ranges, len(audio_data), return_map, as_segments)
             
         except Exception as e:
             print(f"⚠️ Sukut olib tashlaganda xatolik: {str(e)}")
-            return audio_data, []
+            return self._result(audio_data, [], [(0, len(audio_data))], len(audio_data), return_map, as_segments)
+    
+    def _compute_kept_ranges(
+        self,
+        audio_data: np.ndarray,
+        silence_intervals: List[Tuple[float, float]],
+        keep_silence_duration: float
+    ) -> Tuple[List[Tuple[int, int]], List[Tuple[float, float]]]:
+        """
+        Saqlanadigan bo'laklarni (sample indekslarida) hisoblash
+        
+        Returns:
+            Tuple[List, List]: (saqlangan (start, end) samplelar, olib tashlangan intervallar)
+        """
+        kept_ranges = []
+        removed_intervals = []
+        
+        prev_end = 0.0
+        total_duration = len(audio_data) / self.sample_rate
+        keep_samples = int(keep_silence_duration * self.sample_rate)
+        
+        for start, end in silence_intervals:
+            # Sukutdan oldingi qismni qo'shish
+            if start > prev_end:
+                kept_ranges.append((int(prev_end * self.sample_rate), int(start * self.sample_rate)))
+            
+            # Oz miqdorda sukutni qoldirish (tabiiy eshitish uchun)
+            start_sample = int(start * self.sample_rate)
+            end_sample = min(int(end * self.sample_rate), len(audio_data))
+            
+            # Sukutning boshidan va oxiridan oz qoldirish
+            if keep_samples > 0 and (end_sample - start_sample) > keep_samples * 2:
+                kept_ranges.append((start_sample, start_sample + keep_samples))
+                kept_ranges.append((end_sample - keep_samples, end_sample))
+                removed_intervals.append((start + keep_silence_duration, end - keep_silence_duration))
+            else:
+                removed_intervals.append((start, end))
+            
+            prev_end = end
+        
+        # Oxirgi qismni qo'shish
+        if prev_end < total_duration:
+            kept_ranges.append((int(prev_end * self.sample_rate), len(audio_data)))
+        
+        return kept_ranges, removed_intervals
+    
+    def _result(
+        self,
+        audio_data: np.ndarray,
+        removed_intervals: List[Tuple[float, float]],
+        kept_ranges: List[Tuple[int, int]],
+        original_length: int,
+        return_map: bool,
+        as_segments: bool = False
+    ) -> Tuple:
+        """remove_silence natijasini kerakli shaklda qaytarish"""
+        timestamp_map = TimestampMap(kept_ranges, self.sample_rate, original_length)
+        
+        if as_segments:
+            cleaned_audio = SegmentedAudio(audio_data, timestamp_map)
+        elif len(timestamp_map) == 1 and timestamp_map.lengths[0] == len(audio_data):
+            cleaned_audio = audio_data
+        else:
+            # Segmentlarni birlashtirish
+            cleaned_audio = np.concatenate(
+                [audio_data[s:s + n] for s, n in zip(timestamp_map.original_starts, timestamp_map.lengths)]
+            )
+        
+        if not return_map:
+            return cleaned_audio, removed_intervals
+        return cleaned_audio, removed_intervals, timestamp_map
     
     def split_on_silence(
         self,
@@ -279,13 +328,30 @@ class SilenceRemover:
         """
         Nutq segmentlarini (sukut bo'lmagan qismlar) aniqlash
         
+        SegmentedAudio bo'laklari alohida tahlil qilinadi (uzluksiz massiv
+        yaratilmaydi): bo'lak chegarasida ikki tomonda ham nutq bo'lsa
+        intervallar birlashtiriladi - chegaradagi qoldirilgan sukut
+        (2 x keep_silence_duration) 0.3 soniyalik minimumdan qisqa.
+        
         Args:
-            audio_data (np.ndarray): Audio ma'lumotlar
+            audio_data (np.ndarray): Audio ma'lumotlar yoki SegmentedAudio
             threshold_db (float): Sukut chegarasi (dB). Default: -40.0
             
         Returns:
             List[Tuple[float, float]]: Nutq intervallari (boshlanish, tugash)
         """
+        if isinstance(audio_data, SegmentedAudio) and not audio_data.is_materialized:
+            speech_segments = []
+            for view, clean_start, _ in audio_data.iter_segments():
+                view_end = clean_start + len(view) / self.sample_rate
+                for start, end in self.get_speech_segments(view, threshold_db=threshold_db):
+                    start, end = start + clean_start, min(end + clean_start, view_end)
+                    if speech_segments and abs(speech_segments[-1][1] - start) < 1e-6:
+                        speech_segments[-1] = (speech_segments[-1][0], end)
+                    else:
+                        speech_segments.append((start, end))
+            return speech_segments
+        
         try:
             # Sukut intervallarini aniqlash
             silence_intervals = self.detect_silence(
@@ -0,0 +1,181 @@
+"""
+Timestamp Map Module
+====================
+Sukut olib tashlangan (tozalangan) audio vaqtini asl media vaqtiga
+qaytarish uchun ixcham kumulyativ offset xaritasi
+"""
+
+import dataclasses
+import numpy as np
+from typing import List, Tuple, Union
+
+
+class TimestampMap:
+    """
+    Tozalangan vaqt -> asl vaqt konvertatsiyasi
+
+    Har bir saqlangan (kesilmagan) bo'lak uchun faqat ikkita offset saqlanadi:
+    tozalangan audiodagi boshlanishi va asl audiodagi boshlanishi.
+    Qidiruv np.searchsorted (bisect) orqali O(log n) va massivlar ustida
+    vektorlashtirilgan.
+    """
+
+    def __init__(
+        self,
+        kept_ranges: List[Tuple[int, int]],
+        sample_rate: int = 16000,
+        original_length: int = None
+    ):
+        """
+        Args:
+            kept_ranges (List[Tuple[int, int]]): Asl audiodagi saqlangan
+                bo'laklar (start_sample, end_sample), tartiblangan
+            sample_rate (int): Audio sample rate (Hz). Default: 16000
+            original_length (int, optional): Asl audio uzunligi (sample)
+        """
+        self.sample_rate = sample_rate
+
+        # Bo'sh va qo'shni bo'laklarni birlashtirish (xarita ixcham bo'lsin)
+        merged = []
+        for start, end in kept_ranges:
+            if end <= start:
+                continue
+            if merged and merged[-1][1] == start:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+
+        if not merged:
+            merged = [[0, 0]]
+
+        ranges = np.asarray(merged, dtype=np.int64)
+        lengths = ranges[:, 1] - ranges[:, 0]
+
+        # Sample offsetlar (aniq) va soniyadagi offsetlar (tez qidiruv uchun)
+        self.original_starts = ranges[:, 0]
+        self.lengths = lengths
+        self.clean_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+
+        self._orig_sec = self.original_starts / float(sample_rate)
+        self._clean_sec = self.clean_starts / float(sample_rate)
+        self._len_sec = self.lengths / float(sample_rate)
+
+        if original_length is None:
+            original_length = int(ranges[-1, 1])
+        self.original_length = original_length
+
+    @classmethod
+    def identity(cls, num_samples: int, sample_rate: int = 16000) -> 'TimestampMap':
+        """
+        Hech narsa kesilmagan audio uchun xarita
+
+        Args:
+            num_samples (int): Audio uzunligi (sample)
+            sample_rate (int): Audio sample rate (Hz)
+
+        Returns:
+            TimestampMap: Vaqtni o'zgartirmaydigan xarita
+        """
+        return cls([(0, num_samples)], sample_rate, original_length=num_samples)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    @property
+    def clean_duration(self) -> float:
+        """Tozalangan audio davomiyligi (soniya)"""
+        return float(self.lengths.sum()) / self.sample_rate
+
+    @property
+    def original_duration(self) -> float:
+        """Asl audio davomiyligi (soniya)"""
+        return self.original_length / float(self.sample_rate)
+
+    def to_original(
+        self,
+        times: Union[float, np.ndarray],
+        is_end: bool = False
+    ) -> Union[float, np.ndarray]:
+        """
+        Tozalangan vaqtni asl vaqtga aylantirish
+
+        Kesish chegarasiga to'g'ri keladigan vaqt boshlanish uchun keyingi
+        bo'lakka, tugash uchun (is_end=True) oldingi bo'lak oxiriga bog'lanadi.
+
+        Args:
+            times (float | np.ndarray): Tozalangan audiodagi vaqt(lar), soniya
+            is_end (bool): Vaqtlar segment tugashi bo'lsa True
+
+        Returns:
+            float | np.ndarray: Asl audiodagi vaqt(lar), soniya
+        """
+        t = np.asarray(times, dtype=np.float64)
+
+        side = 'left' if is_end else 'right'
+        idx = np.searchsorted(self._clean_sec, t, side=side) - 1
+        idx = np.clip(idx, 0, len(self.lengths) - 1)
+
+        # Bo'lak ichidagi siljish (yaxlitlash xatolari chegaradan chiqmasin)
+        local = np.clip(t - self._clean_sec[idx], 0.0, self._len_sec[idx])
+        result = self._orig_sec[idx] + local
+
+        if result.ndim == 0:
+            return float(result)
+        return result
+
+    def to_original_interval(self, start: float, end: float) -> Tuple[float, float]:
+        """
+        (start, end) intervalini asl vaqtga aylantirish
+
+        Args:
+            start (float): Boshlanish (tozalangan vaqt)
+            end (float): Tugash (tozalangan vaqt)
+
+        Returns:
+            Tuple[float, float]: Asl vaqtdagi interval
+        """
+        return self.to_original(start), self.to_original(end, is_end=True)
+
+    def remap_segments(self, segments: List) -> List:
+        """
+        Segmentlar nusxasini asl vaqt belgilari bilan qaytarish
+
+        TranscriptionSegment, SpeakerSegment, EmotionPrediction kabi
+        dataclass'lar va aligned dict segmentlar qo'llab-quvvatlanadi.
+        Asl segmentlar o'zgartirilmaydi (ular tozalangan audiodan bo'lak
+        kesish uchun kerak bo'lishi mumkin).
+
+        Args:
+            segments (List): start/end maydonli segmentlar
+
+        Returns:
+            List: Asl vaqtga o'tkazilgan segmentlar
+        """
+        if not segments:
+            return []
+
+        starts = np.fromiter((self._get(seg, 'start') for seg in segments), dtype=np.float64)
+        ends = np.fromiter((self._get(seg, 'end') for seg in segments), dtype=np.float64)
+
+        new_starts = self.to_original(starts)
+        new_ends = self.to_original(ends, is_end=True)
+
+        remapped = []
+        for seg, start, end in zip(segments, new_starts, new_ends):
+            if isinstance(seg, dict):
+                new_seg = dict(seg)
+                new_seg['start'] = float(start)
+                new_seg['end'] = float(end)
+            elif dataclasses.is_dataclass(seg):
+                new_seg = dataclasses.replace(seg, start=float(start), end=float(end))
+            else:
+                new_seg = seg
+            remapped.append(new_seg)
+
+        return remapped
+
+    @staticmethod
+    def _get(segment, key: str) -> float:
+        if isinstance(segment, dict):
+            return segment.get(key, 0.0)
+        return getattr(segment, key, 0.0)
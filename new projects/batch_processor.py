@@ -11,16 +11,18 @@ import os
 import argparse
 import json
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import concurrent.futures
 from tqdm import tqdm
 
-from audio_utils import AudioLoader, AudioPreprocessor, SilenceRemover
-from stt import WhisperTranscriber
-from diarization import SpeakerDiarizer
+from audio_utils import AudioLoader, AudioPreprocessor, SilenceRemover, TimestampMap
+from stt import WhisperTranscriber, BACKENDS, get_inference_service, shutdown_inference_services
+from diarization import SpeakerDiarizer, SpeakerIndex
 from emotion import EmotionDetector
 from subtitles import SubtitleGenerator
+from thread_budget import ThreadBudget
+from timeline import join_timeline, summarize_speaker_emotions
 
 
 class BatchAudioProcessor:
@@ -36,7 +38,22 @@ class BatchAudioProcessor:
         enable_diarization: bool = True,
         enable_emotion: bool = True,
         enable_subtitles: bool = True,
-        max_workers: int = 2
+        max_workers: int = 2,
+        batched_inference: bool = False,
+        long_audio_threshold: float = 300.0,
+        backend: str = 'whisper',
+        precision: str = 'fp32',
+        preset: str = None,
+        cascade_draft_model: str = None,
+        speculative_draft_model: str = None,
+        pack_short_clips: bool = False,
+        pack_max_duration: float = 10.0,
+        variable_length_max: float = None,
+        runaway_guard: bool = False,
+        speaker_index: str = None,
+        speaker_threshold: float = None,
+        threads_per_worker: int = None,
+        pin_cpus: bool = False
     ):
         """
         Args:
@@ -47,7 +64,49 @@ class BatchAudioProcessor:
             enable_emotion (bool): Emotion detection yoqish
             enable_subtitles (bool): Subtitrlar yaratish
             max_workers (int): Parallel worker'lar soni (CPU uchun 2-3 tavsiya)
+            batched_inference (bool): Nutq oynalarini batch qilib transkripsiya qilish
+                (barcha worker'lar oynalari umumiy micro-batch navbatiga tushadi)
+            long_audio_threshold (float): Bundan uzun audio sukutga moslangan
+                bo'laklarga bo'linadi (soniya)
+            backend (str): STT inference backend
+            precision (str): Model aniqligi (fp32 yoki int8)
+            preset (str, optional): Decode preseti (fast, balanced, accurate)
+            cascade_draft_model (str, optional): Kaskad rejim uchun kichik model
+                (ishonchsiz oynalargina whisper_model bilan qayta decode qilinadi)
+            speculative_draft_model (str, optional): Speculative decoding uchun
+                draft model (natija whisper_model greedy decode'iga teng)
+            pack_short_clips (bool): Qisqa kliplarni umumiy 30 soniyalik
+                oynalarga joylab transkripsiya qilish (preset qo'llanadi;
+                kaskad va speculative bilan mos emas). Joylangan kliplar VAD
+                bo'yicha filtrlanmaydi - runaway_guard ularda faqat decode'ni
+                erta to'xtatadi
+            pack_max_duration (float): Joylanadigan klipning maksimal
+                (tozalangan) davomiyligi (soniya)
+            variable_length_max (float, optional): Shundan qisqa audio
+                encoder'dan 30 soniyaga to'ldirilmasdan o'tkaziladi (soniya)
+            runaway_guard (bool): Takrorlanish / nutqsiz oynalarda decode'ni
+                erta to'xtatish va faqat VAD nutq oynalarini decode qilish
+            speaker_index (str, optional): Spikerlar indeksi (SQLite) yo'li -
+                berilsa klasterlar fayllar orasida ma'lum spikerlarga moslashtiriladi
+            speaker_threshold (float, optional): Indeks bo'yicha moslashtirish
+                uchun minimal cosine o'xshashlik
+            threads_per_worker (int, optional): Har bir worker uchun torch/BLAS
+                thread'lari (None = yadrolar / workers)
+            pin_cpus (bool): Worker'larni alohida yadrolarga bog'lash
         """
+        # Joylangan oynalar target model bilan batch decode qilinadi - kaskad
+        # va speculative rejimlari bu yo'lda ishlamaydi
+        if pack_short_clips and (cascade_draft_model or speculative_draft_model):
+            raise ValueError(
+                "pack_short_clips kaskad yoki speculative rejim bilan birga ishlatib bo'lmaydi"
+            )
+        
+        # Inference service oynalarni bitta model bilan batch decode qiladi
+        if batched_inference and (cascade_draft_model or speculative_draft_model):
+            raise ValueError(
+                "batched_inference kaskad yoki speculative rejim bilan birga ishlatib bo'lmaydi"
+            )
+        
         self.whisper_model = whisper_model
         self.language = language
         self.enable_preprocessing = enable_preprocessing
@@ -55,17 +114,40 @@ class BatchAudioProcessor:
         self.enable_emotion = enable_emotion
         self.enable_subtitles = enable_subtitles
         self.max_workers = max_workers
+        self.batched_inference = batched_inference
+        self.long_audio_threshold = long_audio_threshold
+        self.cascade_draft_model = cascade_draft_model
+        self.pack_short_clips = pack_short_clips
+        self.pack_max_duration = pack_max_duration
+        self.runaway_guard = runaway_guard
+        
+        # Yadrolarni worker'lar orasida taqsimlash (oversubscription oldini olish)
+        self.thread_budget = ThreadBudget(
+            workers=max_workers,
+            threads_per_worker=threads_per_worker,
+            pin_cpus=pin_cpus
+        )
+        self.thread_budget.apply_process_limits()
         
         print(f"\n{'='*60}")
         print("🚀 BATCH AUDIO PROCESSOR")
         print(f"{'='*60}")
         print(f"  • Whisper Model: {whisper_model}")
+        print(f"  • Backend: {backend} ({precision})")
+        print(f"  • Decode preset: {preset or 'standart'}")
+        if cascade_draft_model:
+            print(f"  • Kaskad: {cascade_draft_model} -> {whisper_model}")
         print(f"  • Til: {language}")
         print(f"  • Preprocessing: {'✅' if enable_preprocessing else '❌'}")
         print(f"  • Speaker Diarization: {'✅' if enable_diarization else '❌'}")
         print(f"  • Emotion Detection: {'✅' if enable_emotion else '❌'}")
         print(f"  • Subtitrlar: {'✅' if enable_subtitles else '❌'}")
         print(f"  • Parallel Workers: {max_workers}")
+        print(f"  • Thread'lar / worker: {self.thread_budget.threads_per_worker}"
+              f"{' (CPU pinning)' if self.thread_budget.pin_cpus else ''}")
+        print(f"  • Batched Inference: {'✅' if batched_inference else '❌'}")
+        print(f"  • Qisqa kliplarni joylash: "
+              f"{f'✅ (<= {pack_max_duration:.0f}s)' if pack_short_clips else '❌'}")
         print(f"{'='*60}\n")
         
         # Modellarni bir marta yuklash
@@ -75,13 +157,40 @@ class BatchAudioProcessor:
         self.remover = SilenceRemover()
         self.transcriber = WhisperTranscriber(
             model_name=whisper_model,
-            language=language
+            language=language,
+            backend=backend,
+            precision=precision,
+            preset=preset,
+            speculative_draft=speculative_draft_model,
+            variable_length_max=variable_length_max,
+            runaway_guard=runaway_guard
         )
         self.transcriber.load_model()  # Oldindan yuklash
         
+        # Worker'lar oynalari bitta navbatda yig'ilib birgalikda decode qilinadi.
+        # Busiz worker'lar self.transcriber'ni ulashadi: preprocessing,
+        # diarization va emotion parallel ishlaydi, decode'lar esa model
+        # lock'i ostida ketma-ket (openai-whisper kv-cache hook'lari modelda).
+        self.inference_service = None
+        if batched_inference:
+            self.inference_service = get_inference_service(
+                whisper_model,
+                precision=precision,
+                backend=backend,
+                preset=preset,
+                runaway_guard=runaway_guard,
+                variable_length_max=variable_length_max
+            )
+        
         if enable_diarization:
             self.diarizer = SpeakerDiarizer()
         
+        # Fayllar orasida bir xil spikerlarga bir xil nom berish
+        self.speaker_index = None
+        if enable_diarization and speaker_index:
+            self.speaker_index = SpeakerIndex(speaker_index, threshold=speaker_threshold)
+            print(f"  • Spikerlar indeksi: {len(self.speaker_index)} ta ma'lum spiker")
+        
         if enable_emotion:
             self.detector = EmotionDetector()
         
@@ -105,6 +214,28 @@ class BatchAudioProcessor:
         Returns:
             Dict: Natijalar
         """
+        result, context = self._start_file(input_path, output_dir)
+        if context is None:
+            return result
+        return self._finish_file(result, context)
+    
+    def _start_file(
+        self,
+        input_path: str,
+        output_dir: str,
+        defer_short: bool = False
+    ) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Yuklash, preprocessing va transkripsiya bosqichlari
+        
+        defer_short=True bo'lsa pack_max_duration'dan qisqa kliplar
+        transkripsiya qilinmaydi (context['segments'] = None) - ular keyin
+        boshqa qisqa kliplar bilan umumiy oynalarda transkripsiya qilinadi.
+        
+        Returns:
+            Tuple[Dict, Optional[Dict]]: Natija va keyingi bosqichlar uchun
+                kontekst (xatolik bo'lsa None)
+        """
         filename = Path(input_path).stem
         file_output_dir = os.path.join(output_dir, filename)
         os.makedirs(file_output_dir, exist_ok=True)
@@ -122,6 +253,9 @@ class BatchAudioProcessor:
             audio_data, sr = self.loader.load_audio(input_path)
             result['duration'] = len(audio_data) / sr
             
+            # Tozalangan vaqt -> asl media vaqti (sukut kesilmasa o'zgarmaydi)
+            timestamp_map = TimestampMap.identity(len(audio_data), sr)
+            
             # 2. Preprocessing
             if self.enable_preprocessing:
                 print(f"🔧 [{filename}] Preprocessing...")
@@ -132,47 +266,107 @@ class BatchAudioProcessor:
                     enhance_speech=True
                 )
                 
-                audio_data, _ = self.remover.remove_silence(audio_data)
+                # Nusxasiz view'lar: saqlash, VAD va oynali transkripsiya
+                # uzluksiz massiv yaratmaydi (kerak bo'lsa bir marta materialize)
+                audio_data, _, timestamp_map = self.remover.remove_silence(
+                    audio_data,
+                    return_map=True,
+                    as_segments=True
+                )
                 
                 # Tozalangan audiodni saqlash
                 clean_path = os.path.join(file_output_dir, f"{filename}_clean.wav")
                 self.loader.save_audio(audio_data, clean_path, sr)
                 result['clean_audio'] = clean_path
             
+            context = {
+                'filename': filename,
+                'file_output_dir': file_output_dir,
+                'audio_data': audio_data,
+                'sr': sr,
+                'timestamp_map': timestamp_map,
+                'segments': None,
+            }
+            
+            if defer_short and len(audio_data) / sr <= self.pack_max_duration:
+                print(f"📦 [{filename}] Qisqa klip - joylangan transkripsiyaga qoldirildi")
+                return result, context
+            
             # 3. Transkripsiya
             print(f"📝 [{filename}] Transkripsiya...")
-            segments = self.transcriber.transcribe_with_timestamps(
-                audio_data,
-                sample_rate=sr,
-                language=self.language
-            )
+            if self.cascade_draft_model:
+                segments, result['cascade'] = self.transcriber.transcribe_cascade(
+                    audio_data,
+                    sample_rate=sr,
+                    language=self.language,
+                    draft_model=self.cascade_draft_model
+                )
+            elif self.batched_inference:
+                segments = self.inference_service.transcribe(
+                    audio_data,
+                    sample_rate=sr,
+                    language=self.language,
+                    speech_segments=self.remover.get_speech_segments(audio_data)
+                )
+            else:
+                segments = self.transcriber.transcribe_auto(
+                    audio_data,
+                    sample_rate=sr,
+                    language=self.language,
+                    long_audio_threshold=self.long_audio_threshold,
+                    speech_segments=(
+                        self.remover.get_speech_segments(audio_data) if self.runaway_guard else None
+                    )
+                )
+            context['segments'] = segments
+            
+        except Exception as e:
+            result['status'] = 'failed'
+            result['errors'].append(str(e))
+            result['end_time'] = datetime.now().isoformat()
+            print(f"❌ [{filename}] Xatolik: {str(e)}")
+            return result, None
+        
+        return result, context
+    
+    def _finish_file(self, result: Dict, context: Dict) -> Dict:
+        """
+        Transkripsiyadan keyingi bosqichlar: saqlash, diarization, emotsiya,
+        subtitrlar va hisobot
+        """
+        filename = context['filename']
+        file_output_dir = context['file_output_dir']
+        audio_data = context['audio_data']
+        timestamp_map = context['timestamp_map']
+        segments = context['segments']
+        
+        try:
             result['segments_count'] = len(segments)
             
             # Transkripsiyani saqlash
             transcript_path = os.path.join(file_output_dir, f"{filename}_transcript.txt")
-            self.transcriber.save_transcript(segments, transcript_path)
+            self.transcriber.save_transcript(
+                timestamp_map.remap_segments(segments),
+                transcript_path
+            )
             result['transcript'] = transcript_path
             
             # 4. Speaker Diarization
+            speaker_segments = None
             if self.enable_diarization:
                 print(f"👥 [{filename}] Speaker diarization...")
-                speaker_segments = self.diarizer.diarize(audio_data)
-                aligned = self.diarizer.align_with_transcription(
-                    speaker_segments,
-                    segments
-                )
-                
-                # Spikerlar bo'yicha matnni saqlash
-                diarization_path = os.path.join(file_output_dir, f"{filename}_speakers.txt")
-                formatted = self.diarizer.format_diarization(aligned)
-                with open(diarization_path, 'w', encoding='utf-8') as f:
-                    f.write(formatted)
-                result['diarization'] = diarization_path
+                if self.speaker_index is not None:
+                    speaker_segments, centroids = self.diarizer.diarize(audio_data, return_centroids=True)
+                    identities = self.speaker_index.assign(centroids, source=filename)
+                    for seg in speaker_segments:
+                        seg.speaker_id = identities.get(seg.speaker_id, seg.speaker_id)
+                    result['speaker_identities'] = identities
+                else:
+                    speaker_segments = self.diarizer.diarize(audio_data)
                 result['speakers_count'] = len(set(seg.speaker_id for seg in speaker_segments))
-            else:
-                aligned = segments
             
             # 5. Emotion Detection
+            emotions = None
             if self.enable_emotion:
                 print(f"😊 [{filename}] Emotion detection...")
                 emotions = self.detector.detect_emotions_segments(
@@ -182,16 +376,36 @@ class BatchAudioProcessor:
                 
                 # Emotsiyalarni saqlash
                 emotion_path = os.path.join(file_output_dir, f"{filename}_emotions.txt")
-                formatted_emotions = self.detector.format_emotions(emotions)
+                formatted_emotions = self.detector.format_emotions(
+                    timestamp_map.remap_segments(emotions)
+                )
                 with open(emotion_path, 'w', encoding='utf-8') as f:
                     f.write(formatted_emotions)
                 result['emotions'] = emotion_path
             
+            # Segment, spiker va emotsiyalarni bitta vaqt chizig'ida birlashtirish
+            timeline = timestamp_map.remap_segments(
+                join_timeline(segments, speakers=speaker_segments, emotions=emotions)
+            )
+            
+            if self.enable_diarization:
+                # Spikerlar bo'yicha matnni saqlash
+                diarization_path = os.path.join(file_output_dir, f"{filename}_speakers.txt")
+                formatted = self.diarizer.format_diarization(timeline)
+                with open(diarization_path, 'w', encoding='utf-8') as f:
+                    f.write(formatted)
+                result['diarization'] = diarization_path
+            
+            timeline_path = os.path.join(file_output_dir, f"{filename}_timeline.json")
+            with open(timeline_path, 'w', encoding='utf-8') as f:
+                json.dump(timeline, f, ensure_ascii=False, indent=2)
+            result['timeline'] = timeline_path
+            
             # 6. Subtitrlar
             if self.enable_subtitles:
                 print(f"📝 [{filename}] Subtitrlar yaratilmoqda...")
                 srt_path, vtt_path = self.generator.generate_both(
-                    aligned,
+                    timeline,
                     file_output_dir,
                     filename=filename,
                     include_speaker=self.enable_diarization
@@ -201,7 +415,7 @@ class BatchAudioProcessor:
             
             # To'liq hisobot
             report_path = os.path.join(file_output_dir, f"{filename}_report.txt")
-            self._create_report(result, report_path, aligned, emotions if self.enable_emotion else None)
+            self._create_report(result, report_path, timeline, emotions)
             result['report'] = report_path
             
             result['status'] = 'success'
@@ -217,6 +431,45 @@ class BatchAudioProcessor:
         
         return result
     
+    def _process_with_budget(self, input_path: str, output_dir: str) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Faylni worker slotining thread limitlari ostida qayta ishlash
+        
+        Returns:
+            Tuple[Dict, Optional[Dict]]: Natija va (qisqa klip joylash uchun
+                qoldirilgan bo'lsa) kontekst
+        """
+        with self.thread_budget.worker_slot():
+            result, context = self._start_file(
+                input_path,
+                output_dir,
+                defer_short=self.pack_short_clips
+            )
+            if context is None or context['segments'] is None:
+                return result, context
+            return self._finish_file(result, context), None
+    
+    def _finish_with_budget(self, result: Dict, context: Dict) -> Dict:
+        """Joylangan klipni worker slotida yakunlash"""
+        with self.thread_budget.worker_slot():
+            return self._finish_file(result, context)
+    
+    def _transcribe_deferred(self, deferred: List[Tuple[Dict, Dict]]):
+        """Qoldirilgan qisqa kliplarni umumiy oynalarda transkripsiya qilish"""
+        clips_by_sr: Dict[int, List[Tuple[Dict, Dict]]] = {}
+        for result, context in deferred:
+            clips_by_sr.setdefault(context['sr'], []).append((result, context))
+        
+        for sr, items in clips_by_sr.items():
+            clip_segments = self.transcriber.transcribe_packed(
+                [context['audio_data'] for _, context in items],
+                sample_rate=sr,
+                language=self.language
+            )
+            for (result, context), segments in zip(items, clip_segments):
+                context['segments'] = segments
+                result['packed'] = True
+    
     def _create_report(self, result: Dict, report_path: str, segments, emotions=None):
         """To'liq hisobot yaratish"""
         with open(report_path, 'w', encoding='utf-8') as f:
@@ -260,6 +513,15 @@ class BatchAudioProcessor:
                 for emotion, count in sorted(emotion_counts.items(), key=lambda x: x[1], reverse=True):
                     percentage = (count / len(emotions)) * 100
                     f.write(f"{emotion}: {percentage:.1f}% ({count} segment)\n")
+                
+                speaker_emotions = summarize_speaker_emotions(segments)
+                if speaker_emotions:
+                    f.write("\nSpikerlar bo'yicha:\n")
+                    for speaker, entry in sorted(speaker_emotions.items()):
+                        shares = ', '.join(
+                            f"{emotion} {share * 100:.0f}%" for emotion, share in entry['emotions'].items()
+                        )
+                        f.write(f"{speaker} ({entry['duration']:.1f}s): {shares}\n")
     
     def process_batch(
         self,
@@ -287,12 +549,13 @@ class BatchAudioProcessor:
         print(f"{'='*60}\n")
         
         results = []
+        deferred = []  # joylangan transkripsiyaga qoldirilgan qisqa kliplar
         
         # Parallel processing
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # Barcha tasklar submit qilish
             future_to_file = {
-                executor.submit(self.process_single_file, file_path, output_dir): file_path
+                executor.submit(self._process_with_budget, file_path, output_dir): file_path
                 for file_path in input_files
             }
             
@@ -301,8 +564,11 @@ class BatchAudioProcessor:
                 for future in concurrent.futures.as_completed(future_to_file):
                     file_path = future_to_file[future]
                     try:
-                        result = future.result()
-                        results.append(result)
+                        result, context = future.result()
+                        if context is not None:
+                            deferred.append((result, context))
+                        else:
+                            results.append(result)
                     except Exception as e:
                         print(f"\n❌ {Path(file_path).name} - Xatolik: {str(e)}")
                         results.append({
@@ -311,12 +577,44 @@ class BatchAudioProcessor:
                             'errors': [str(e)]
                         })
                     pbar.update(1)
+            
+            # Qisqa kliplar: bitta oynada bir nechta klip transkripsiya qilinadi
+            if deferred:
+                try:
+                    self._transcribe_deferred(deferred)
+                except Exception as e:
+                    print(f"\n❌ Joylangan transkripsiya xatoligi: {str(e)}")
+                    for result, _ in deferred:
+                        result['status'] = 'failed'
+                        result['errors'].append(str(e))
+                        result['end_time'] = datetime.now().isoformat()
+                        results.append(result)
+                    deferred = []
+                
+                finish_futures = [
+                    executor.submit(self._finish_with_budget, result, context)
+                    for result, context in deferred
+                ]
+                for future in tqdm(
+                    concurrent.futures.as_completed(finish_futures),
+                    total=len(finish_futures),
+                    desc="Packed clips"
+                ):
+                    results.append(future.result())
         
         # Summary yaratish
         self._create_summary(results, output_dir)
         
         return results
     
+    def _guard_stats(self) -> Dict:
+        """Runaway guard statistikasi (umumiy transcriber + inference service)"""
+        stats = dict(self.transcriber.get_guard_stats())
+        if self.inference_service is not None:
+            for key, value in self.inference_service.transcriber.get_guard_stats().items():
+                stats[key] = stats.get(key, 0) + value
+        return stats
+    
     def _create_summary(self, results: List[Dict], output_dir: str):
         """Umumiy natijalar xulosasi"""
         summary_path = os.path.join(output_dir, 'batch_summary.json')
@@ -325,6 +623,10 @@ class BatchAudioProcessor:
             'total_files': len(results),
             'successful': sum(1 for r in results if r['status'] == 'success'),
             'failed': sum(1 for r in results if r['status'] == 'failed'),
+            'runaway_guard': self._guard_stats(),
+            # Joylangan kliplar VAD bo'yicha filtrlanmaydi (transcribe_packed)
+            'packed_without_vad': sum(1 for r in results if r.get('packed')) if self.runaway_guard else 0,
+            'speaker_index': self.speaker_index.list_speakers() if self.speaker_index is not None else None,
             'results': results
         }
         
@@ -337,10 +639,84 @@ class BatchAudioProcessor:
         print(f"  • Jami fayllar: {summary['total_files']}")
         print(f"  • Muvaffaqiyatli: {summary['successful']} ✅")
         print(f"  • Xato: {summary['failed']} ❌")
+        guard = summary['runaway_guard']
+        if guard:
+            print(f"  • Runaway guard: {guard['aborted_repetition']} takrorlanish, "
+                  f"{guard['aborted_no_speech']} nutqsiz oyna to'xtatildi, "
+                  f"{guard['vad_skipped_windows']} oyna o'tkazib yuborildi")
+        if summary['packed_without_vad']:
+            print(f"  • Joylangan kliplar: {summary['packed_without_vad']} ta (VAD filtrisiz decode qilindi)")
+        if self.speaker_index is not None:
+            print(f"  • Spikerlar indeksi: {len(self.speaker_index)} ta spiker ({self.speaker_index.db_path})")
         print(f"  • Summary fayl: {summary_path}")
         print(f"{'='*60}\n")
 
 
+def calibrate_speaker_index(
+    input_dir: str,
+    index_path: Optional[str] = None,
+    enable_preprocessing: bool = True,
+    target_far: Optional[float] = None
+) -> Dict:
+    """
+    Spikerlar indeksi chegarasini ma'lum spikerlar yozuvlarida kalibrlash
+    
+    Papka tuzilmasi: input_dir/<spiker nomi>/<audio fayllar> - har bir fayl
+    bitta spikerniki. Markazlar batch rejimidagi kabi (preprocessing va
+    sukut olib tashlangan audio) olinadi, chegara indeksda saqlanadi.
+    
+    Args:
+        input_dir (str): Kalibrlash papkasi
+        index_path (str, optional): Spikerlar indeksi (SQLite) yo'li
+        enable_preprocessing (bool): Batch rejimidagi preprocessing
+        target_far (float, optional): Noto'g'ri qabul ulushi (None = 0.01)
+        
+    Returns:
+        Dict: SpeakerIndex.calibrate natijasi
+    """
+    loader = AudioLoader()
+    preprocessor = AudioPreprocessor()
+    remover = SilenceRemover()
+    diarizer = SpeakerDiarizer()
+    index = SpeakerIndex(index_path)
+    
+    audio_extensions = ['.mp3', '.wav', '.flac', '.ogg', '.m4a', '.mp4', '.avi', '.mov', '.mkv']
+    samples = []
+    for speaker_dir in sorted(Path(input_dir).iterdir()):
+        if not speaker_dir.is_dir():
+            continue
+        for path in sorted(speaker_dir.iterdir()):
+            if path.suffix.lower() not in audio_extensions:
+                continue
+            
+            audio_data, sr = loader.load_audio(str(path))
+            if enable_preprocessing:
+                audio_data = preprocessor.preprocess_audio(
+                    audio_data,
+                    remove_noise=True,
+                    normalize=True,
+                    enhance_speech=True
+                )
+                audio_data, _ = remover.remove_silence(audio_data)
+            
+            _, centroids = diarizer.diarize(audio_data, num_speakers=1, return_centroids=True)
+            for centroid, _ in centroids.values():
+                samples.append((speaker_dir.name, centroid))
+    
+    print(f"\n🎯 Kalibrlash: {len(samples)} fayl, {len(set(name for name, _ in samples))} spiker")
+    
+    kwargs = {'target_far': target_far} if target_far is not None else {}
+    calibration = index.calibrate(samples, **kwargs)
+    
+    print(f"  • Chegara: {calibration['threshold']:.3f} "
+          f"(FAR {calibration['far']:.1%}, FRR {calibration['frr']:.1%})")
+    print(f"  • EER: {calibration['eer']:.1%} (chegara {calibration['eer_threshold']:.3f})")
+    print(f"  • Juftliklar: {calibration['same_pairs']} bir xil, {calibration['different_pairs']} turli")
+    print(f"  • Indeksda saqlandi: {index.db_path}")
+    
+    return calibration
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Batch Audio Processing - bir nechta faylni qayta ishlash'
@@ -368,6 +744,46 @@ def main():
         help='Whisper model (default: medium)'
     )
     
+    parser.add_argument(
+        '--backend',
+        type=str,
+        default='whisper',
+        choices=list(BACKENDS),
+        help='STT inference backend (default: whisper)'
+    )
+    
+    parser.add_argument(
+        '--precision',
+        type=str,
+        default='fp32',
+        choices=WhisperTranscriber.AVAILABLE_PRECISIONS,
+        help='Model aniqligi: fp32 yoki int8 (CPU dinamik kvantizatsiya)'
+    )
+    
+    parser.add_argument(
+        '--preset',
+        type=str,
+        default=None,
+        choices=WhisperTranscriber.AVAILABLE_PRESETS,
+        help='Decode preseti: fast (greedy), balanced yoki accurate (beam search)'
+    )
+    
+    parser.add_argument(
+        '--cascade',
+        type=str,
+        default=None,
+        choices=['tiny', 'base', 'small'],
+        help='Kaskad rejim: oynalar avval shu model bilan, ishonchsizlari --model bilan decode qilinadi'
+    )
+    
+    parser.add_argument(
+        '--speculative-draft',
+        type=str,
+        default=None,
+        choices=['tiny', 'base'],
+        help='Speculative decoding: draft model tokenlarni taklif qiladi, --model tekshiradi'
+    )
+    
     parser.add_argument(
         '--language',
         type=str,
@@ -382,6 +798,81 @@ def main():
         help='Parallel workers soni (default: 2, CPU uchun 2-3 optimal)'
     )
     
+    parser.add_argument(
+        '--threads-per-worker',
+        type=int,
+        default=None,
+        help='Har bir worker uchun torch/BLAS thread\'lari (default: yadrolar / workers)'
+    )
+    
+    parser.add_argument(
+        '--pin-cpus',
+        action='store_true',
+        help='Har bir worker\'ni alohida CPU yadrolariga bog\'lash (Linux)'
+    )
+    
+    parser.add_argument(
+        '--batched',
+        action='store_true',
+        help='Worker\'lar oynalarini umumiy micro-batch navbatida decode qilish (ko\'p yadroli CPU uchun)'
+    )
+    
+    parser.add_argument(
+        '--pack-short-clips',
+        action='store_true',
+        help='Qisqa kliplarni umumiy 30 soniyalik oynalarga joylab transkripsiya qilish '
+             '(--cascade / --speculative-draft bilan ishlamaydi; joylangan kliplarda '
+             '--runaway-guard VAD filtrisiz, faqat decode\'ni to\'xtatish bilan ishlaydi)'
+    )
+    
+    parser.add_argument(
+        '--pack-max-duration',
+        type=float,
+        default=10.0,
+        help='Joylanadigan klipning maksimal davomiyligi, soniya (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--variable-length-max',
+        type=float,
+        default=None,
+        help='Shundan qisqa audio (soniya) encoder\'dan 30 soniyaga to\'ldirilmasdan o\'tkaziladi'
+    )
+    
+    parser.add_argument(
+        '--runaway-guard',
+        action='store_true',
+        help='Musiqa/shovqinda takrorlanuvchi decode\'ni to\'xtatish va faqat nutqli oynalarni decode qilish'
+    )
+    
+    parser.add_argument(
+        '--speaker-index',
+        type=str,
+        default=None,
+        help='Spikerlar indeksi (SQLite) - fayllar orasida bir xil spikerga bir xil nom beriladi'
+    )
+    
+    parser.add_argument(
+        '--speaker-threshold',
+        type=float,
+        default=None,
+        help='Indeks bo\'yicha spikerni tanish uchun minimal cosine o\'xshashlik '
+             '(default: indeksdagi kalibrlangan chegara yoki 0.92)'
+    )
+    
+    parser.add_argument(
+        '--calibrate-speakers',
+        action='store_true',
+        help='Indeks chegarasini kalibrlash: --input-dir/<spiker>/<fayllar> (har bir fayl bitta spiker)'
+    )
+    
+    parser.add_argument(
+        '--target-far',
+        type=float,
+        default=None,
+        help='Kalibrlashda turli spikerlar juftliklarining ruxsat etilgan qabul ulushi (default: 0.01)'
+    )
+    
     parser.add_argument(
         '--no-preprocessing',
         action='store_true',
@@ -408,6 +899,21 @@ def main():
     
     args = parser.parse_args()
     
+    if args.pack_short_clips and (args.cascade or args.speculative_draft):
+        parser.error("--pack-short-clips --cascade yoki --speculative-draft bilan birga ishlatilmaydi")
+    
+    if args.batched and (args.cascade or args.speculative_draft):
+        parser.error("--batched --cascade yoki --speculative-draft bilan birga ishlatilmaydi")
+    
+    if args.calibrate_speakers:
+        calibrate_speaker_index(
+            args.input_dir,
+            index_path=args.speaker_index,
+            enable_preprocessing=not args.no_preprocessing,
+            target_far=args.target_far
+        )
+        return
+    
     # Kirish fayllarni topish
     input_dir = Path(args.input_dir)
     if not input_dir.exists():
@@ -435,11 +941,28 @@ def main():
         enable_diarization=not args.no_diarization,
         enable_emotion=not args.no_emotion,
         enable_subtitles=not args.no_subtitles,
-        max_workers=args.workers
+        max_workers=args.workers,
+        batched_inference=args.batched,
+        backend=args.backend,
+        precision=args.precision,
+        preset=args.preset,
+        cascade_draft_model=args.cascade,
+        speculative_draft_model=args.speculative_draft,
+        pack_short_clips=args.pack_short_clips,
+        pack_max_duration=args.pack_max_duration,
+        variable_length_max=args.variable_length_max,
+        runaway_guard=args.runaway_guard,
+        speaker_index=args.speaker_index,
+        speaker_threshold=args.speaker_threshold,
+        threads_per_worker=args.threads_per_worker,
+        pin_cpus=args.pin_cpus
     )
     
     # Batch processing
-    results = processor.process_batch(input_files, args.output_dir)
+    try:
+        results = processor.process_batch(input_files, args.output_dir)
+    finally:
+        shutdown_inference_services()
     
     print("\n✅ Batch processing tugallandi!")
 
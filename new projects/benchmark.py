@@ -0,0 +1,405 @@
+"""
+STT Benchmark
+=============
+Lokal benchmark kliplar to'plamida STT sozlamalarining tezligi (RTF) va
+aniqligini (WER) solishtirish
+
+Har bir klip yonida bir xil nomli .txt fayl bo'lsa u etalon matn sifatida
+ishlatiladi; aks holda birinchi konfiguratsiya natijasi etalon hisoblanadi
+(delta o'lchanadi).
+
+Foydalanish:
+    python benchmark.py --clips-dir ./bench_clips --model medium --precisions fp32 int8
+    python benchmark.py --clips-dir ./bench_clips --model small --presets fast balanced accurate
+    python benchmark.py --clips-dir ./bench_clips --model medium --speculative-draft tiny
+    python benchmark.py --clips-dir ./bench_clips --model medium --variable-length 10
+"""
+
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from audio_utils import AudioLoader
+from stt import WhisperTranscriber, SpeculativeDecoder
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    So'z darajasidagi xatolik ulushi (Levenshtein masofasi / etalon uzunligi)
+
+    Args:
+        reference (str): Etalon matn
+        hypothesis (str): Tekshiriladigan matn
+
+    Returns:
+        float: WER (0 = bir xil)
+    """
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Bitta qator bilan dinamik dasturlash
+    prev = np.arange(len(hyp) + 1)
+    for i, ref_word in enumerate(ref, 1):
+        curr = np.empty_like(prev)
+        curr[0] = i
+        for j, hyp_word in enumerate(hyp, 1):
+            cost = 0 if ref_word == hyp_word else 1
+            curr[j] = min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + cost)
+        prev = curr
+
+    return float(prev[-1]) / len(ref)
+
+
+def load_clips(clips_dir: str) -> List[Tuple[str, np.ndarray, Optional[str]]]:
+    """
+    Benchmark kliplarni (va mavjud bo'lsa etalon matnlarni) yuklash
+
+    Returns:
+        List[Tuple[str, np.ndarray, Optional[str]]]: (nom, audio, etalon)
+    """
+    loader = AudioLoader(sample_rate=16000)
+    clips = []
+
+    for path in sorted(Path(clips_dir).iterdir()):
+        if not loader.is_supported_format(str(path)):
+            continue
+        audio, _ = loader.load_audio(str(path))
+        ref_path = path.with_suffix('.txt')
+        reference = ref_path.read_text(encoding='utf-8') if ref_path.exists() else None
+        clips.append((path.stem, audio, reference))
+
+    return clips
+
+
+def run_config(
+    name: str,
+    transcriber_kwargs: Dict,
+    clips: List[Tuple[str, np.ndarray, Optional[str]]],
+    transcribe_kwargs: Optional[Dict] = None
+) -> Dict:
+    """
+    Bitta konfiguratsiyani barcha kliplarda ishga tushirish
+
+    Args:
+        name (str): Konfiguratsiya nomi
+        transcriber_kwargs (Dict): WhisperTranscriber parametrlari
+        clips (List): load_clips() natijasi
+        transcribe_kwargs (Dict, optional): transcribe_with_timestamps parametrlari
+
+    Returns:
+        Dict: Vaqtlar, RTF va matnlar
+    """
+    transcribe_kwargs = transcribe_kwargs or {}
+    transcriber = WhisperTranscriber(**transcriber_kwargs)
+
+    load_start = time.perf_counter()
+    transcriber.load_model()
+    load_time = time.perf_counter() - load_start
+
+    texts = {}
+    total_audio = 0.0
+    total_time = 0.0
+
+    for clip_name, audio, _ in clips:
+        start = time.perf_counter()
+        segments = transcriber.transcribe_with_timestamps(audio, 16000, **transcribe_kwargs)
+        elapsed = time.perf_counter() - start
+
+        texts[clip_name] = transcriber.get_full_text(segments)
+        total_audio += len(audio) / 16000
+        total_time += elapsed
+
+    transcriber.release_model()
+
+    return {
+        'name': name,
+        'load_time': load_time,
+        'audio_seconds': total_audio,
+        'decode_seconds': total_time,
+        'rtf': total_time / total_audio if total_audio else 0.0,
+        'texts': texts,
+    }
+
+
+def summarize(
+    results: List[Dict],
+    clips: List[Tuple[str, np.ndarray, Optional[str]]]
+) -> List[Dict]:
+    """
+    Natijalarga WER va birinchi konfiguratsiyaga nisbatan tezlanishni qo'shish
+    """
+    baseline = results[0]
+    summary = []
+
+    for result in results:
+        wers = []
+        for clip_name, _, reference in clips:
+            ref_text = reference if reference is not None else baseline['texts'][clip_name]
+            wers.append(word_error_rate(ref_text, result['texts'][clip_name]))
+
+        summary.append({
+            'name': result['name'],
+            'load_time': round(result['load_time'], 2),
+            'rtf': round(result['rtf'], 3),
+            'speedup': round(baseline['rtf'] / result['rtf'], 2) if result['rtf'] else None,
+            'wer': round(float(np.mean(wers)), 4) if wers else None,
+            'wer_reference': 'etalon' if all(c[2] is not None for c in clips) else baseline['name'],
+        })
+
+    return summary
+
+
+def print_summary(summary: List[Dict]):
+    print(f"\n{'='*72}")
+    print("📊 BENCHMARK NATIJALARI")
+    print(f"{'='*72}")
+    print(f"{'Konfiguratsiya':<24}{'Yuklash (s)':>12}{'RTF':>10}{'Tezlanish':>12}{'WER':>10}")
+    print("-" * 72)
+    for row in summary:
+        speedup = f"{row['speedup']:.2f}x" if row['speedup'] else '-'
+        wer = f"{row['wer']:.3f}" if row['wer'] is not None else '-'
+        print(f"{row['name']:<24}{row['load_time']:>12.2f}{row['rtf']:>10.3f}{speedup:>12}{wer:>10}")
+    print(f"{'='*72}")
+    if summary:
+        print(f"WER etaloni: {summary[0]['wer_reference']}\n")
+
+
+def run_speculative(
+    clips: List[Tuple[str, np.ndarray, Optional[str]]],
+    model_name: str,
+    draft_name: str,
+    language: str,
+    draft_tokens: int = 4,
+    precision: str = 'fp32'
+) -> Dict:
+    """
+    Speculative decoding va Whisper'ning o'z greedy decode'ini tokens/sec
+    bo'yicha solishtirish
+
+    Etalon - target model bilan whisper.decode (temperature=0, vaqt
+    belgilari bilan) xuddi shu mel spektrogrammada. Speculative natija
+    har bir oynada etalon bilan token-token teng bo'lishi kerak.
+
+    Returns:
+        Dict: tokens/sec, tezlanish, qabul ulushi va nomuvofiq oynalar soni
+    """
+    import torch
+    import whisper
+
+    target = WhisperTranscriber(model_name, language=language, precision=precision,
+                                use_cache=False, encoder_cache=False)
+    draft = WhisperTranscriber(draft_name, language=language, precision=precision,
+                               use_cache=False, encoder_cache=False)
+    target.load_model()
+    draft.load_model()
+
+    options = whisper.DecodingOptions(
+        language=language,
+        temperature=0.0,
+        without_timestamps=False,
+        fp16=False
+    )
+    speculative = SpeculativeDecoder(target.model, draft.model, language=language,
+                                     draft_tokens=draft_tokens)
+
+    totals = {'greedy_time': 0.0, 'speculative_time': 0.0, 'tokens': 0,
+              'proposed': 0, 'accepted': 0, 'windows': 0, 'mismatched_windows': 0}
+    mismatches = []
+
+    for clip_name, audio, _ in clips:
+        boundaries = WhisperTranscriber._find_silence_boundaries(audio, 16000)
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            window = audio[start:end]
+            # SpeculativeDecoder._embed bilan bir xil mel
+            mel = whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(np.asarray(window, dtype=np.float32))),
+                n_mels=target.model.dims.n_mels
+            ).to(target.model.device)
+
+            t0 = time.perf_counter()
+            with torch.no_grad():
+                reference = whisper.decode(target.model, mel, options)
+            t1 = time.perf_counter()
+            result = speculative.decode(window)
+            t2 = time.perf_counter()
+
+            totals['greedy_time'] += t1 - t0
+            totals['speculative_time'] += t2 - t1
+            totals['tokens'] += len(reference.tokens)
+            totals['proposed'] += result.stats['proposed']
+            totals['accepted'] += result.stats['accepted']
+            totals['windows'] += 1
+            if list(result.tokens) != list(reference.tokens):
+                totals['mismatched_windows'] += 1
+                mismatches.append({'clip': clip_name, 'start': start / 16000, 'end': end / 16000})
+
+    target.release_model()
+    draft.release_model()
+
+    return {
+        'name': f"{model_name} + {draft_name} (k={draft_tokens})",
+        'windows': totals['windows'],
+        'tokens': totals['tokens'],
+        'greedy_tokens_per_sec': totals['tokens'] / totals['greedy_time'] if totals['greedy_time'] else 0.0,
+        'speculative_tokens_per_sec': totals['tokens'] / totals['speculative_time'] if totals['speculative_time'] else 0.0,
+        'speedup': totals['greedy_time'] / totals['speculative_time'] if totals['speculative_time'] else None,
+        'acceptance_rate': totals['accepted'] / totals['proposed'] if totals['proposed'] else 0.0,
+        'mismatched_windows': totals['mismatched_windows'],
+        'mismatches': mismatches,
+    }
+
+
+def print_speculative(result: Dict):
+    print(f"\n{'='*72}")
+    print(f"⚡ SPECULATIVE DECODING: {result['name']}")
+    print(f"{'='*72}")
+    print(f"  • Oynalar / tokenlar: {result['windows']} / {result['tokens']}")
+    print(f"  • Greedy: {result['greedy_tokens_per_sec']:.1f} token/s")
+    print(f"  • Speculative: {result['speculative_tokens_per_sec']:.1f} token/s")
+    if result['speedup']:
+        print(f"  • Tezlanish: {result['speedup']:.2f}x")
+    print(f"  • Draft qabul ulushi: {result['acceptance_rate']:.0%}")
+    print(f"  • Greedy'dan farq qilgan oynalar: {result['mismatched_windows']}")
+    for item in result['mismatches']:
+        print(f"    ❌ {item['clip']} [{item['start']:.2f}s - {item['end']:.2f}s]")
+    print(f"{'='*72}\n")
+
+
+def save_output(path: str, payload: Dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"💾 Natijalar saqlandi: {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='STT benchmark - tezlik va aniqlik')
+
+    parser.add_argument('--clips-dir', type=str, required=True, help='Benchmark kliplar papkasi')
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='medium',
+        choices=WhisperTranscriber.AVAILABLE_MODELS,
+        help='Whisper model (default: medium)'
+    )
+    parser.add_argument('--language', type=str, default='uz', help='Til kodi (default: uz)')
+    parser.add_argument(
+        '--precisions',
+        nargs='+',
+        default=['fp32', 'int8'],
+        choices=WhisperTranscriber.AVAILABLE_PRECISIONS,
+        help='Solishtiriladigan precision rejimlari (default: fp32 int8)'
+    )
+    parser.add_argument(
+        '--presets',
+        nargs='+',
+        default=None,
+        choices=WhisperTranscriber.AVAILABLE_PRESETS,
+        help='Solishtiriladigan decode presetlari (default: backend standarti)'
+    )
+    parser.add_argument(
+        '--speculative-draft',
+        type=str,
+        default=None,
+        choices=['tiny', 'base'],
+        help='Speculative decoding tokens/sec benchmarki uchun draft model'
+    )
+    parser.add_argument('--draft-tokens', type=int, default=4, help='Draft taklif qiladigan tokenlar (k)')
+    parser.add_argument(
+        '--variable-length',
+        type=float,
+        default=None,
+        help='Shundan qisqa kliplarda 30 soniyaga to\'ldirilgan va qisqartirilgan encoder kirishini solishtirish'
+    )
+    parser.add_argument('--output', type=str, default=None, help='Natijalarni JSON ga saqlash')
+
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips_dir)
+    if not clips:
+        print(f"❌ Kliplar topilmadi: {args.clips_dir}")
+        return
+
+    print(f"\n✅ {len(clips)} ta klip yuklandi")
+
+    if args.speculative_draft:
+        result = run_speculative(
+            clips,
+            args.model,
+            args.speculative_draft,
+            args.language,
+            draft_tokens=args.draft_tokens,
+            precision=args.precisions[0]
+        )
+        print_speculative(result)
+        if args.output:
+            save_output(args.output, {'speculative': result})
+        if result['mismatched_windows']:
+            raise SystemExit("❌ Speculative natija whisper greedy decode'iga teng emas")
+        return
+
+    if args.variable_length:
+        # Faqat chegaradan qisqa kliplar - avtomatik rejim aynan shularga tegadi
+        short_clips = [clip for clip in clips if len(clip[1]) / 16000 <= args.variable_length]
+        if not short_clips:
+            print(f"❌ {args.variable_length:.1f}s dan qisqa kliplar topilmadi")
+            return
+
+        print(f"✂️ {len(short_clips)} ta qisqa klip (<= {args.variable_length:.1f}s)")
+        base_kwargs = {
+            'model_name': args.model,
+            'language': args.language,
+            'precision': args.precisions[0],
+            'preset': args.presets[0] if args.presets else None,
+            'use_cache': False,
+            'encoder_cache': False,
+        }
+        results = [
+            run_config(f"{args.model}/padded-30s", base_kwargs, short_clips),
+            run_config(
+                f"{args.model}/variable<={args.variable_length:g}s",
+                {**base_kwargs, 'variable_length_max': args.variable_length},
+                short_clips
+            ),
+        ]
+        summary = summarize(results, short_clips)
+        print_summary(summary)
+        if args.output:
+            save_output(args.output, {'variable_length': summary, 'results': results})
+        return
+
+    results = []
+    for precision in args.precisions:
+        for preset in (args.presets or [None]):
+            name = f"{args.model}/{precision}" + (f"/{preset}" if preset else '')
+            results.append(run_config(
+                name,
+                {
+                    'model_name': args.model,
+                    'language': args.language,
+                    'precision': precision,
+                    'preset': preset,
+                    'use_cache': False,
+                    'encoder_cache': False,
+                },
+                clips
+            ))
+
+    summary = summarize(results, clips)
+    print_summary(summary)
+
+    if args.output:
+        save_output(args.output, {'summary': summary, 'results': results})
+
+
+if __name__ == "__main__":
+    main()
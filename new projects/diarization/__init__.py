@@ -7,8 +7,10 @@ Funksiyalar:
     - Spikerlarni aniqlash
     - Har bir gapni spikerga bog'lash
     - Vaqt oralig'i bilan chiqarish
+    - Fayllar orasida spikerlarni tanish (SpeakerIndex)
 """
 
 from .speaker import SpeakerDiarizer
+from .speaker_index import SpeakerIndex
 
-__all__ = ['SpeakerDiarizer']
+__all__ = ['SpeakerDiarizer', 'SpeakerIndex']
@@ -8,10 +8,12 @@ har bir gapni alohida spikerga bog'lash
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
-from sklearn.cluster import AgglomerativeClustering
+from sklearn.cluster import AgglomerativeClustering, MiniBatchKMeans
 from scipy.spatial.distance import cosine
 import librosa
 
+from timeline import join_timeline
+
 
 @dataclass
 class SpeakerSegment:
@@ -38,6 +40,14 @@ class SpeakerDiarizer:
     yoki speechbrain ishlatish tavsiya etiladi.
     """
     
+    N_MFCC = 13
+    FEATURE_N_FFT = 2048  # librosa standarti
+    FEATURE_HOP = 320  # 20 ms - oyna/qadam shu qadamga yaxlitlanadi
+    
+    # Bundan ko'p oynada klasterlash ikki bosqichli (O(n^2) xotira o'rniga)
+    DIRECT_CLUSTER_LIMIT = 2000
+    MICRO_CLUSTERS = 256
+    
     def __init__(self, sample_rate: int = 16000):
         """
         Args:
@@ -47,61 +57,126 @@ class SpeakerDiarizer:
         self.min_speakers = 1
         self.max_speakers = 10
     
+    def _feature_frames(self, duration: float) -> int:
+        """Davomiylik MFCC frame'lariga yaxlitlangan (kamida 1 frame)"""
+        return max(1, int(round(duration * self.sample_rate / self.FEATURE_HOP)))
+    
+    def effective_hop(self, hop_duration: float) -> float:
+        """
+        extract_speaker_features ishlatadigan haqiqiy qadam (soniya)
+        
+        Qadam butun MFCC frame'lariga yaxlitlanadi (masalan 16 kHz'da 0.25s
+        -> 12 frame = 0.24s), shuning uchun oyna vaqtlari va davomiyliklar
+        so'ralgan emas, shu qadam bilan hisoblanishi kerak.
+        """
+        return self._feature_frames(hop_duration) * self.FEATURE_HOP / self.sample_rate
+    
     def extract_speaker_features(
         self,
         audio_data: np.ndarray,
-        segment_duration: float = 1.0
-    ) -> List[np.ndarray]:
+        segment_duration: float = 1.0,
+        hop_duration: Optional[float] = None,
+        block_duration: float = 300.0
+    ) -> np.ndarray:
         """
-        Har bir segment uchun spiker xususiyatlarini ajratib olish
+        Har bir oyna uchun spiker xususiyatlarini ajratib olish
         (MFCC - Mel Frequency Cepstral Coefficients)
         
+        MFCC butun signal bo'yicha bir marta hisoblanadi (STFT xotirasi
+        cheklangan bo'lishi uchun block_duration bloklarda), keyin har bir
+        oyna uchun kumulyativ yig'indi orqali o'rtacha olinadi - oynalar
+        ustma-ust tushishi mumkin (hop_duration < segment_duration).
+        
         Args:
             audio_data (np.ndarray): Audio ma'lumotlar
-            segment_duration (float): Segment davomiyligi (soniya). Default: 1.0
+            segment_duration (float): Oyna davomiyligi (soniya). Default: 1.0
+            hop_duration (float, optional): Oynalar orasidagi qadam (soniya).
+                None = segment_duration (ustma-ust tushmaydi). Frame'larga
+                yaxlitlanadi - haqiqiy qadam: effective_hop(hop_duration)
+            block_duration (float): MFCC hisoblanadigan blok (soniya). Default: 300.0
             
         Returns:
-            List[np.ndarray]: Har bir segment uchun feature vector
+            np.ndarray: (oynalar soni, n_mfcc) float32 feature matritsa
         """
         try:
-            segment_samples = int(segment_duration * self.sample_rate)
-            features = []
+            if hop_duration is None:
+                hop_duration = segment_duration
             
-            # Audiodni segmentlarga bo'lish
-            num_segments = len(audio_data) // segment_samples
+            audio_data = np.asarray(audio_data, dtype=np.float32)
             
-            for i in range(num_segments):
-                start_idx = i * segment_samples
-                end_idx = start_idx + segment_samples
-                segment = audio_data[start_idx:end_idx]
-                
-                # MFCC xususiyatlarini ajratish
-                mfcc = librosa.feature.mfcc(
-                    y=segment,
-                    sr=self.sample_rate,
-                    n_mfcc=13
-                )
-                
-                # O'rtacha qiymatni olish (har bir MFCC koeffitsiyenti uchun)
-                mfcc_mean = np.mean(mfcc, axis=1)
-                features.append(mfcc_mean)
+            # Oyna va qadam MFCC frame'lariga karrali bo'lishi uchun
+            frame_hop = self.FEATURE_HOP
+            window_frames = self._feature_frames(segment_duration)
+            step_frames = self._feature_frames(hop_duration)
+            
+            n_frames = len(audio_data) // frame_hop
+            if n_frames < window_frames:
+                return np.zeros((0, self.N_MFCC), dtype=np.float32)
+            
+            mfcc = self._mfcc_frames(audio_data, n_frames, block_duration)
+            
+            # Oyna o'rtachalari: cumsum[end] - cumsum[start] (bitta strided ayirma)
+            cumsum = np.zeros((n_frames + 1, self.N_MFCC), dtype=np.float64)
+            np.cumsum(mfcc, axis=0, dtype=np.float64, out=cumsum[1:])
             
-            return features
+            starts = np.arange(0, n_frames - window_frames + 1, step_frames)
+            features = (cumsum[starts + window_frames] - cumsum[starts]) / window_frames
+            
+            return features.astype(np.float32)
             
         except Exception as e:
             print(f"⚠️ Feature extraction xatolik: {str(e)}")
-            return []
+            return np.zeros((0, self.N_MFCC), dtype=np.float32)
+    
+    def _mfcc_frames(
+        self,
+        audio_data: np.ndarray,
+        n_frames: int,
+        block_duration: float
+    ) -> np.ndarray:
+        """
+        Butun signal MFCC frame'lari (n_frames, n_mfcc), bloklab hisoblangan
+        
+        Har bir blok chetlarida n_fft/2 kontekst bilan (center=False) olinadi,
+        shuning uchun blok chegaralarida frame'lar yo'qolmaydi va takrorlanmaydi.
+        """
+        frame_hop = self.FEATURE_HOP
+        half = self.FEATURE_N_FFT // 2
+        block_frames = max(1, int(block_duration * self.sample_rate) // frame_hop)
+        
+        mfcc = np.empty((n_frames, self.N_MFCC), dtype=np.float32)
+        
+        for first in range(0, n_frames, block_frames):
+            count = min(block_frames, n_frames - first)
+            
+            # Global (center=True) frame t: [t*hop - n_fft/2, t*hop + n_fft/2)
+            start = first * frame_hop - half
+            end = (first + count - 1) * frame_hop + half
+            block = audio_data[max(start, 0):min(end, len(audio_data))]
+            block = np.pad(block, (max(-start, 0), max(end - len(audio_data), 0)))
+            
+            block_mfcc = librosa.feature.mfcc(
+                y=block,
+                sr=self.sample_rate,
+                n_mfcc=self.N_MFCC,
+                n_fft=self.FEATURE_N_FFT,
+                hop_length=frame_hop,
+                center=False
+            )
+            mfcc[first:first + count] = block_mfcc[:, :count].T
+        
+        return mfcc
     
     def cluster_speakers(
         self,
-        features: List[np.ndarray],
+        features: np.ndarray,
         num_speakers: Optional[int] = None
     ) -> np.ndarray:
         """
         Feature'larni klasterlash orqali spikerlarni aniqlash
         
         Args:
-            features (List[np.ndarray]): Feature vectorlar ro'yxati
+            features (np.ndarray): (oynalar soni, n_features) feature matritsa
             num_speakers (int, optional): Spikerlar soni (None = auto)
             
         Returns:
@@ -111,8 +186,7 @@ class SpeakerDiarizer:
             if len(features) == 0:
                 return np.array([])
             
-            # Feature'larni array'ga aylantirish
-            X = np.array(features)
+            X = np.asarray(features, dtype=np.float32)
             
             # Agar spiker soni berilmagan bo'lsa, auto aniqlash
             if num_speakers is None:
@@ -126,6 +200,9 @@ class SpeakerDiarizer:
             
             num_speakers = max(self.min_speakers, min(num_speakers, self.max_speakers, len(X)))
             
+            if len(X) > self.DIRECT_CLUSTER_LIMIT:
+                return self._two_stage_cluster(X, num_speakers)
+            
             # Agglomerative Clustering
             clustering = AgglomerativeClustering(
                 n_clusters=num_speakers,
@@ -141,12 +218,56 @@ class SpeakerDiarizer:
             print(f"⚠️ Clustering xatolik: {str(e)}")
             return np.zeros(len(features), dtype=int)
     
+    def _two_stage_cluster(self, X: np.ndarray, num_speakers: int) -> np.ndarray:
+        """
+        Ko'p oynali (soatlab) audio uchun ikki bosqichli klasterlash
+        
+        1. Oynalar MiniBatchKMeans bilan MICRO_CLUSTERS ta mikro-klasterga
+           siqiladi (L2-normallangan vektorlar - evklid masofasi kosinusga mos)
+        2. Mikro-klaster markazlari cosine/average AgglomerativeClustering
+           bilan spikerlarga birlashtiriladi va yorliqlar oynalarga qaytariladi
+        
+        Juftlik masofalari faqat markazlar uchun hisoblanadi, shuning uchun
+        xotira audio uzunligidan qat'i nazar cheklangan.
+        
+        Args:
+            X (np.ndarray): (oynalar soni, n_features) feature matritsa
+            num_speakers (int): Spikerlar soni
+            
+        Returns:
+            np.ndarray: Har bir oyna uchun spiker ID
+        """
+        norms = np.linalg.norm(X, axis=1, keepdims=True)
+        X_norm = X / np.maximum(norms, 1e-8)
+        
+        n_micro = max(num_speakers, min(self.MICRO_CLUSTERS, len(X) // 10))
+        print(f"  • Ikki bosqichli klasterlash: {len(X)} oyna -> {n_micro} mikro-klaster")
+        
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_micro,
+            batch_size=1024,
+            n_init=3,
+            random_state=0
+        )
+        micro_labels = kmeans.fit_predict(X_norm)
+        
+        clustering = AgglomerativeClustering(
+            n_clusters=num_speakers,
+            metric='cosine',
+            linkage='average'
+        )
+        centroid_labels = clustering.fit_predict(kmeans.cluster_centers_)
+        
+        return centroid_labels[micro_labels]
+    
     def diarize(
         self,
         audio_data: np.ndarray,
         num_speakers: Optional[int] = None,
-        segment_duration: float = 1.0
-    ) -> List[SpeakerSegment]:
+        segment_duration: float = 1.0,
+        hop_duration: Optional[float] = None,
+        return_centroids: bool = False
+    ):
         """
         Audio uchun speaker diarization amalga oshirish
         
@@ -154,9 +275,14 @@ class SpeakerDiarizer:
             audio_data (np.ndarray): Audio ma'lumotlar
             num_speakers (int, optional): Spikerlar soni (None = auto)
             segment_duration (float): Segment davomiyligi (soniya). Default: 1.0
+            hop_duration (float, optional): Oynalar qadami (soniya).
+                None = segment_duration
+            return_centroids (bool): Spiker markazlarini ham qaytarish
+                (SpeakerIndex bilan fayllar orasida moslashtirish uchun)
             
         Returns:
             List[SpeakerSegment]: Spiker segmentlari ro'yxati
+                (return_centroids=True bo'lsa (segmentlar, speaker_centroids()) juftligi)
         """
         try:
             print("\n" + "="*50)
@@ -169,11 +295,16 @@ class SpeakerDiarizer:
             
             # 1. Feature extraction
             print("\n🔍 Feature'lar ajratib olinmoqda...")
-            features = self.extract_speaker_features(audio_data, segment_duration)
+            if hop_duration is None:
+                hop_duration = segment_duration
+            features = self.extract_speaker_features(audio_data, segment_duration, hop_duration)
+            
+            # Oyna vaqtlari frame'larga yaxlitlangan qadam bo'yicha
+            hop_duration = self.effective_hop(hop_duration)
             
             if len(features) == 0:
                 print("⚠️ Feature'lar ajratib olinmadi")
-                return []
+                return ([], {}) if return_centroids else []
             
             print(f"✅ {len(features)} ta segment uchun feature'lar ajratildi")
             
@@ -186,7 +317,6 @@ class SpeakerDiarizer:
             
             # 3. Segmentlarni yaratish
             segments = []
-            segment_samples = int(segment_duration * self.sample_rate)
             
             current_speaker = labels[0]
             segment_start = 0.0
@@ -194,7 +324,7 @@ class SpeakerDiarizer:
             for i in range(1, len(labels)):
                 if labels[i] != current_speaker:
                     # Yangi spiker boshlandi
-                    segment_end = i * segment_duration
+                    segment_end = i * hop_duration
                     
                     segment = SpeakerSegment(
                         speaker_id=f"SPEAKER_{current_speaker + 1:02d}",
@@ -230,11 +360,60 @@ class SpeakerDiarizer:
             print("✅ SPEAKER DIARIZATION TUGALLANDI")
             print("="*50 + "\n")
             
+            if return_centroids:
+                return segments, self.speaker_centroids(features, labels, hop_duration)
             return segments
             
         except Exception as e:
             print(f"⚠️ Diarization xatolik: {str(e)}")
-            return []
+            return ([], {}) if return_centroids else []
+    
+    def speaker_centroids(
+        self,
+        features: np.ndarray,
+        labels: np.ndarray,
+        hop_duration: float
+    ) -> Dict[str, Tuple[np.ndarray, float]]:
+        """
+        Har bir spiker klasterining markaziy vektori (SpeakerIndex uchun)
+        
+        c0 (log-energiya) tashlanadi - u ovoz balandligi va yozuv darajasini
+        ifodalaydi va xom MFCC cosine o'xshashligini egallab oladi. Qolgan
+        koeffitsientlar fayl bo'yicha dispersiyaga normallanadi (CVN), so'ng
+        oyna vektorlari L2-normallanib o'rtachalanadi, markaz ham normallanadi.
+        
+        Fayl o'rtachasi ayirilmaydi (to'liq CMVN emas): markaz aynan shu
+        oynalarning o'rtachasi, shuning uchun bitta spikerli faylda u nolga
+        tushib qolardi, ko'p spikerlida esa fayldagi boshqa spikerlarga
+        bog'liq bo'lib qolardi.
+        
+        Args:
+            features (np.ndarray): (oynalar soni, n_features) feature matritsa
+            labels (np.ndarray): Har bir oyna uchun klaster ID
+            hop_duration (float): Oynalar qadami (soniya) - effective_hop() natijasi
+            
+        Returns:
+            Dict[str, Tuple[np.ndarray, float]]: Spiker ID -> (float32 markaz
+                (n_features - 1 o'lchamli), gapirilgan vaqt soniyada)
+        """
+        X = np.asarray(features, dtype=np.float64)[:, 1:]
+        std = X.std(axis=0)
+        std[std < 1e-8] = 1.0
+        X = X / std
+        X = X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-8)
+        labels = np.asarray(labels)
+        
+        centroids = {}
+        for label in np.unique(labels):
+            mask = labels == label
+            centroid = X[mask].mean(axis=0)
+            centroid /= max(np.linalg.norm(centroid), 1e-8)
+            centroids[f"SPEAKER_{label + 1:02d}"] = (
+                centroid.astype(np.float32),
+                float(mask.sum() * hop_duration)
+            )
+        
+        return centroids
     
     def merge_short_segments(
         self,
@@ -279,6 +458,9 @@ class SpeakerDiarizer:
         """
         Spiker segmentlarini transkripsiya segmentlari bilan moslashtirish
         
+        Har bir segmentga eng ko'p kesishgan spiker beriladi (timeline.join_timeline,
+        bitta o'tishli sweep).
+        
         Args:
             speaker_segments (List[SpeakerSegment]): Spiker segmentlari
             transcription_segments (List): Transkripsiya segmentlari
@@ -286,37 +468,7 @@ class SpeakerDiarizer:
         Returns:
             List[Dict]: Moshlashtirilgan segmentlar
         """
-        aligned = []
-        
-        for trans_seg in transcription_segments:
-            # Qaysi spiker bu vaqt oralig'ida gapirgan?
-            trans_mid = (trans_seg.start + trans_seg.end) / 2
-            
-            for speaker_seg in speaker_segments:
-                if speaker_seg.start <= trans_mid <= speaker_seg.end:
-                    aligned.append({
-                        'speaker': speaker_seg.speaker_id,
-                        'text': trans_seg.text,
-                        'start': trans_seg.start,
-                        'end': trans_seg.end,
-                        'confidence': (speaker_seg.confidence + trans_seg.confidence) / 2
-                    })
-                    break
-            else:
-                # Agar topilmasa, eng yaqin spikerni topish
-                closest_speaker = min(
-                    speaker_segments,
-                    key=lambda s: min(abs(s.start - trans_mid), abs(s.end - trans_mid))
-                )
-                aligned.append({
-                    'speaker': closest_speaker.speaker_id,
-                    'text': trans_seg.text,
-                    'start': trans_seg.start,
-                    'end': trans_seg.end,
-                    'confidence': trans_seg.confidence * 0.7  # Past confidence
-                })
-        
-        return aligned
+        return join_timeline(transcription_segments, speakers=speaker_segments)
     
     def format_diarization(
         self,
@@ -0,0 +1,381 @@
+"""
+Speaker Index
+=============
+Fayllar orasida spikerlarni tanish uchun lokal doimiy indeks
+
+Har bir ma'lum spiker (o'qituvchi, operator, ...) uchun markaziy vektor
+(SpeakerDiarizer.speaker_centroids) va metadata SQLite'da saqlanadi
+(vektor - float32 BLOB). Xotirada barcha markazlar bitta normallangan
+NumPy matritsasida turadi, shuning uchun eng yaqin spikerni izlash bitta
+matritsa-vektor ko'paytmasi (cosine o'xshashlik).
+
+Batch rejimida har bir faylning klasterlari ma'lum spikerlarga
+moslashtiriladi (bitta fayldagi ikki klaster bitta spikerga tushmaydi),
+moslashgan markazlar gapirilgan vaqt bo'yicha og'irlikli o'rtacha bilan
+yangilanadi, tanilmaganlari esa yangi spiker sifatida qo'shiladi.
+
+Moslashtirish chegarasi feature'larga bog'liq, shuning uchun u ma'lum
+spikerlar yozuvlarida kalibrlanadi (calibrate): bir xil / turli spiker
+juftliklarining cosine o'xshashliklaridan maqsadli noto'g'ri qabul
+ulushiga (FAR) mos chegara tanlanadi va indeksda saqlanadi.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Markaz og'irligi (soniya) shu qiymatdan oshmaydi: eski yozuvlar markazni
+# "muzlatib" qo'ymasligi va ovoz o'zgarishini kuzatish uchun
+MAX_CENTROID_WEIGHT = 3600.0
+
+# Shundan qisqa gapirgan klasterlar indeksga qo'shilmaydi va yangilamaydi
+MIN_CLUSTER_SECONDS = 5.0
+
+# Kalibrlanmagan indeks uchun boshlang'ich chegara (calibrate bilan almashtiring)
+DEFAULT_THRESHOLD = 0.92
+
+# calibrate: turli spikerlar juftliklarining chegaradan o'tishi mumkin bo'lgan
+# ulushi - ikki odamni bitta nom ostida birlashtirish ajratishdan yomonroq
+DEFAULT_TARGET_FAR = 0.01
+
+
+class SpeakerIndex:
+    """
+    SQLite'da saqlanadigan spiker markazlari indeksi (thread-safe)
+    """
+
+    def __init__(self, db_path: Optional[str] = None, threshold: Optional[float] = None):
+        """
+        Args:
+            db_path (str, optional): SQLite fayl yo'li
+                (None = SPEAKER_INDEX_PATH env yoki ~/.cache/uzbek_audio_ai/speakers.sqlite)
+            threshold (float, optional): Moslashtirish uchun minimal cosine
+                o'xshashlik (None = SPEAKER_INDEX_THRESHOLD env, indeksda
+                saqlangan kalibrlangan chegara yoki DEFAULT_THRESHOLD)
+        """
+        if db_path is None:
+            db_path = os.environ.get(
+                'SPEAKER_INDEX_PATH',
+                os.path.join(os.path.expanduser("~"), ".cache", "uzbek_audio_ai", "speakers.sqlite")
+            )
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS speakers ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " name TEXT UNIQUE NOT NULL,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " weight REAL NOT NULL,"
+                " files INTEGER NOT NULL DEFAULT 0,"
+                " metadata TEXT NOT NULL DEFAULT '{}',"
+                " created REAL NOT NULL,"
+                " updated REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            calibration = conn.execute(
+                "SELECT value FROM settings WHERE key = 'calibration'"
+            ).fetchone()
+
+        self.calibration: Optional[Dict] = json.loads(calibration[0]) if calibration else None
+
+        if threshold is None:
+            if 'SPEAKER_INDEX_THRESHOLD' in os.environ:
+                threshold = float(os.environ['SPEAKER_INDEX_THRESHOLD'])
+            elif self.calibration is not None:
+                threshold = self.calibration['threshold']
+            else:
+                threshold = DEFAULT_THRESHOLD
+        self.threshold = threshold
+
+        self._load()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:  # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self):
+        """Barcha markazlarni xotiradagi matritsaga yuklash"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT name, dim, vector, weight FROM speakers ORDER BY id"
+            ).fetchall()
+
+        self._names: List[str] = []
+        self._weights: List[float] = []
+        vectors = []
+        for name, dim, blob, weight in rows:
+            self._names.append(name)
+            self._weights.append(weight)
+            vectors.append(np.frombuffer(blob, dtype=np.float32, count=dim))
+
+        dims = {len(v) for v in vectors}
+        if len(dims) > 1:
+            raise ValueError(f"Spiker indeksida turli o'lchamli vektorlar: {sorted(dims)}")
+        self._matrix = np.vstack(vectors) if vectors else None
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        return vector / max(float(np.linalg.norm(vector)), 1e-8)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, vector: np.ndarray, k: int = 1) -> List[Tuple[str, float]]:
+        """
+        Eng yaqin ma'lum spikerlar
+
+        Args:
+            vector (np.ndarray): Spiker markazi
+            k (int): Natijalar soni
+
+        Returns:
+            List[Tuple[str, float]]: (spiker nomi, cosine o'xshashlik), kamayish tartibida
+        """
+        with self._lock:
+            if self._matrix is None:
+                return []
+            scores = self._matrix @ self._normalize(vector)
+            names = list(self._names)
+
+        top = np.argsort(-scores)[:k]
+        return [(names[i], float(scores[i])) for i in top]
+
+    def assign(
+        self,
+        centroids: Dict[str, Tuple[np.ndarray, float]],
+        source: Optional[str] = None,
+        enroll: bool = True
+    ) -> Dict[str, str]:
+        """
+        Bitta faylning klasterlarini ma'lum spikerlarga moslashtirish va
+        indeksni yangilash
+
+        Juftliklar o'xshashlik kamayishi tartibida tanlanadi (har bir spiker
+        bitta klasterga). Moslashgan markazlar og'irlikli o'rtacha bilan
+        yangilanadi; threshold'dan past klasterlar (enroll=True bo'lsa)
+        yangi spiker sifatida qo'shiladi.
+
+        Args:
+            centroids (Dict[str, Tuple[np.ndarray, float]]): Klaster ID ->
+                (markaz, gapirilgan vaqt) - SpeakerDiarizer.speaker_centroids()
+            source (str, optional): Fayl nomi (metadata uchun)
+            enroll (bool): Tanilmagan klasterlarni indeksga qo'shish
+
+        Returns:
+            Dict[str, str]: Klaster ID -> spiker nomi (tanilmagan va qo'shilmagan
+                klasterlar o'z ID'si bilan qoladi)
+        """
+        labels = list(centroids)
+        mapping = {label: label for label in labels}
+        if not labels:
+            return mapping
+
+        vectors = np.vstack([self._normalize(centroids[label][0]) for label in labels])
+        seconds = [float(centroids[label][1]) for label in labels]
+
+        with self._lock, self._connect() as conn:
+            if self._matrix is not None and self._matrix.shape[1] != vectors.shape[1]:
+                raise ValueError(
+                    f"Vektor o'lchami mos emas: indeks {self._matrix.shape[1]}, "
+                    f"klaster {vectors.shape[1]}"
+                )
+
+            matched = set()
+            if self._matrix is not None:
+                scores = vectors @ self._matrix.T
+                used = set()
+                for flat in np.argsort(-scores, axis=None):
+                    row, col = np.unravel_index(flat, scores.shape)
+                    if scores[row, col] < self.threshold:
+                        break
+                    if row in matched or col in used:
+                        continue
+                    matched.add(row)
+                    used.add(col)
+                    mapping[labels[row]] = self._names[col]
+                    if seconds[row] >= MIN_CLUSTER_SECONDS:
+                        self._update(conn, col, vectors[row], seconds[row], source)
+
+            if enroll:
+                for row, label in enumerate(labels):
+                    if row in matched or seconds[row] < MIN_CLUSTER_SECONDS:
+                        continue
+                    mapping[label] = self._enroll(conn, vectors[row], seconds[row], source)
+
+        return mapping
+
+    def _update(self, conn: sqlite3.Connection, col: int, vector: np.ndarray, seconds: float, source: Optional[str]):
+        """Markazni og'irlikli o'rtacha bilan yangilash (lock ostida)"""
+        old_weight = min(self._weights[col], MAX_CENTROID_WEIGHT)
+        total = old_weight + seconds
+        centroid = self._normalize((self._matrix[col] * old_weight + vector * seconds) / total)
+
+        self._matrix[col] = centroid
+        self._weights[col] = total
+
+        row = conn.execute(
+            "SELECT metadata FROM speakers WHERE name = ?", (self._names[col],)
+        ).fetchone()
+        metadata = json.loads(row[0]) if row else {}
+        metadata['last_source'] = source
+        conn.execute(
+            "UPDATE speakers SET vector = ?, weight = ?, files = files + 1, metadata = ?, updated = ?"
+            " WHERE name = ?",
+            (centroid.tobytes(), total, json.dumps(metadata, ensure_ascii=False), time.time(), self._names[col])
+        )
+
+    def _enroll(self, conn: sqlite3.Connection, vector: np.ndarray, seconds: float, source: Optional[str]) -> str:
+        """Yangi spiker qo'shish (lock ostida)"""
+        now = time.time()
+        metadata = json.dumps({'first_source': source, 'last_source': source}, ensure_ascii=False)
+        cursor = conn.execute(
+            "INSERT INTO speakers (name, dim, vector, weight, files, metadata, created, updated)"
+            " VALUES (?, ?, ?, ?, 1, ?, ?, ?)",
+            (f"_pending_{now}", len(vector), vector.tobytes(), seconds, metadata, now, now)
+        )
+        name = f"PERSON_{cursor.lastrowid:03d}"
+        conn.execute("UPDATE speakers SET name = ? WHERE id = ?", (name, cursor.lastrowid))
+
+        self._names.append(name)
+        self._weights.append(seconds)
+        row = vector.reshape(1, -1)
+        self._matrix = row.copy() if self._matrix is None else np.vstack([self._matrix, row])
+        return name
+
+    def rename(self, old_name: str, new_name: str):
+        """
+        Spikerga haqiqiy ism berish (masalan PERSON_003 -> Dilnoza)
+
+        Raises:
+            ValueError: old_name indeksda yo'q yoki new_name band
+        """
+        with self._lock, self._connect() as conn:
+            try:
+                cursor = conn.execute("UPDATE speakers SET name = ? WHERE name = ?", (new_name, old_name))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Bu nom allaqachon mavjud: {new_name}") from None
+            if cursor.rowcount == 0:
+                raise ValueError(f"Spiker topilmadi: {old_name}")
+            self._names = [new_name if name == old_name else name for name in self._names]
+
+    def calibrate(
+        self,
+        samples: List[Tuple[str, np.ndarray]],
+        target_far: float = DEFAULT_TARGET_FAR,
+        save: bool = True
+    ) -> Dict:
+        """
+        Moslashtirish chegarasini ma'lum spikerlar markazlarida kalibrlash
+
+        Har bir juftlik bir xil yoki turli spiker sifatida belgilanadi. Chegara -
+        turli spiker juftliklarining ko'pi bilan target_far ulushi o'tadigan
+        eng past qiymat (shu chegarada bir xil spiker juftliklarining rad
+        etilgan ulushi - FRR - ham qaytariladi). Markazlar
+        SpeakerDiarizer.speaker_centroids bilan, indekslanadigan audioga
+        qo'llanadigan preprocessing bilan olinishi kerak.
+
+        Args:
+            samples (List[Tuple[str, np.ndarray]]): (spiker nomi, markaz) -
+                har bir spiker uchun kamida ikki fayl
+            target_far (float): Ruxsat etilgan noto'g'ri qabul ulushi
+            save (bool): Chegarani indeksda saqlash va shu indeksga qo'llash
+
+        Returns:
+            Dict: threshold, far, frr, eer, eer_threshold, same_pairs, different_pairs
+        """
+        if not 0 <= target_far < 1:
+            raise ValueError("target_far 0 va 1 oralig'ida bo'lishi kerak")
+
+        names = np.array([name for name, _ in samples])
+        vectors = np.vstack([self._normalize(vector) for _, vector in samples]) if samples else None
+        if vectors is None:
+            raise ValueError("Kalibrlash uchun markazlar berilmagan")
+
+        rows, cols = np.triu_indices(len(samples), k=1)
+        scores = np.sum(vectors[rows] * vectors[cols], axis=1)
+        same_mask = names[rows] == names[cols]
+        same = np.sort(scores[same_mask])
+        different = np.sort(scores[~same_mask])
+        if len(same) == 0 or len(different) == 0:
+            raise ValueError("Kalibrlash uchun bir xil va turli spiker juftliklari kerak "
+                             "(kamida ikki spiker, har biri kamida ikki faylda)")
+
+        def far_at(t: float) -> float:
+            return float(len(different) - np.searchsorted(different, t, side='left')) / len(different)
+
+        def frr_at(t: float) -> float:
+            return float(np.searchsorted(same, t, side='left')) / len(same)
+
+        # Nomzodlar: kuzatilgan o'xshashliklar (chegara = score qabul qilinadi)
+        candidates = np.unique(np.concatenate([same, different, [1.0 + 1e-6]]))
+        far = np.array([far_at(t) for t in candidates])
+        frr = np.array([frr_at(t) for t in candidates])
+
+        threshold = float(candidates[np.argmax(far <= target_far)])
+        eer_index = int(np.argmin(np.abs(far - frr)))
+
+        result = {
+            'threshold': threshold,
+            'target_far': target_far,
+            'far': far_at(threshold),
+            'frr': frr_at(threshold),
+            'eer': float((far[eer_index] + frr[eer_index]) / 2),
+            'eer_threshold': float(candidates[eer_index]),
+            'same_pairs': int(len(same)),
+            'different_pairs': int(len(different)),
+            'dim': int(vectors.shape[1]),
+            'calibrated_at': time.time(),
+        }
+
+        if save:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO settings (key, value) VALUES ('calibration', ?)",
+                    (json.dumps(result),)
+                )
+            self.calibration = result
+            self.threshold = threshold
+
+        return result
+
+    def list_speakers(self) -> List[Dict]:
+        """
+        Indeksdagi spikerlar
+
+        Returns:
+            List[Dict]: {'name', 'weight' (soniya), 'files', 'metadata', 'updated'}
+        """
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT name, weight, files, metadata, updated FROM speakers ORDER BY id"
+            ).fetchall()
+
+        return [
+            {
+                'name': name,
+                'weight': weight,
+                'files': files,
+                'metadata': json.loads(metadata),
+                'updated': updated,
+            }
+            for name, weight, files, metadata, updated in rows
+        ]
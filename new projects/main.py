@@ -8,25 +8,53 @@ Endpoints:
     POST /process          - Audio qayta ishlash
     GET  /status/{task_id} - Task statusini tekshirish
     GET  /download/{task_id}/{file_type} - Natijalarni yuklab olish
+    GET  /models           - Yuklangan modellar statistikasi
+    GET  /ready            - Modellar yuklanib, warm-up tugaganini tekshirish
+    GET  /segments/{task_id} - Tayyor bo'lgan (final/provisional) segmentlar
+    WS   /stream           - Jonli (streaming) transkripsiya
+
+Uzun task'larning tugagan bo'laklari task papkasiga yoziladi; server
+qayta ishga tushganda tugallanmagan task'lar oxirgi bo'lakdan davom etadi.
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Form, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Callable, Optional, List
 import os
 import uuid
 import shutil
 from pathlib import Path
 from datetime import datetime
 import json
-
-from audio_utils import AudioLoader, AudioPreprocessor, SilenceRemover
-from stt import WhisperTranscriber
+import time
+import threading
+from dataclasses import asdict, replace
+import numpy as np
+
+from audio_utils import AudioLoader, AudioPreprocessor, SilenceRemover, TimestampMap
+from stt import (
+    WhisperTranscriber,
+    StreamingTranscriber,
+    get_model_registry,
+    get_transcription_cache,
+    get_encoder_cache,
+    get_inference_service,
+    get_inference_services_stats,
+    shutdown_inference_services,
+    get_rtf_table,
+)
+from stt.whisper_model import TranscriptionSegment
+from stt.transcription_cache import audio_fingerprint
 from diarization import SpeakerDiarizer
+from diarization.speaker import SpeakerSegment
 from emotion import EmotionDetector
+from emotion.emotion_model import EmotionPrediction
 from subtitles import SubtitleGenerator
+from task_checkpoint import TaskCheckpoint
+from timeline import join_timeline, summarize_speaker_emotions
 
 
 # FastAPI app
@@ -50,6 +78,27 @@ app.add_middleware(
 UPLOAD_DIR = "api_uploads"
 OUTPUT_DIR = "api_outputs"
 TASKS = {}  # Task statuslarini saqlash
+LONG_AUDIO_THRESHOLD = 300.0  # Bundan uzun audio sukutga moslangan bo'laklarga bo'linadi (soniya)
+STREAM_CHUNK_SECONDS = 10.0  # Streaming rejimda transcriber'ga beriladigan bo'lak (soniya)
+# Shundan qisqa audio encoder'dan 30 soniyaga to'ldirilmasdan o'tkaziladi
+# (soniya). 0 = o'chirilgan
+VARIABLE_LENGTH_MAX = float(os.environ.get('WHISPER_VARIABLE_LENGTH_MAX', 0)) or None
+# Takrorlanish sikli / nutqsiz oynalarda decode'ni erta to'xtatish
+# (batch_processor --runaway-guard kabi ixtiyoriy, RUNAWAY_GUARD=1 bilan yoqiladi)
+RUNAWAY_GUARD = os.environ.get('RUNAWAY_GUARD', '0') != '0'
+CHECKPOINT_CHUNK_SECONDS = 300.0  # Transkripsiya checkpoint bo'lagi (soniya)
+EMOTION_CHECKPOINT_SEGMENTS = 200  # Emotion checkpoint bo'lagidagi segmentlar
+# Server qayta ishga tushganda tugallanmagan task'larni davom ettirish
+RESUME_TASKS = os.environ.get('RESUME_TASKS', '1') != '0'
+MAX_RESUME_ATTEMPTS = 3
+
+# Ishga tushishda oldindan yuklanadigan modellar: "model[:precision[:backend]]"
+# vergul bilan ajratiladi, masalan "medium,small:int8". Bo'sh = preload yo'q
+PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', 'medium')
+READINESS = {
+    'warmup_done': False,
+    'models': [],  # [{'model_name', 'precision', 'backend', 'warmup_time', 'error'}]
+}
 
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -58,11 +107,19 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 # Pydantic models
 class ProcessingRequest(BaseModel):
     whisper_model: str = "medium"
+    backend: str = "whisper"
+    precision: str = "fp32"  # fp32 yoki int8 (CPU dinamik kvantizatsiya)
+    preset: Optional[str] = None  # fast, balanced, accurate (None = standart decode)
+    cascade_draft_model: Optional[str] = None  # masalan "tiny": kaskad rejim (whisper_model faqat ishonchsiz oynalar uchun)
+    speculative_draft_model: Optional[str] = None  # masalan "tiny": speculative decoding (greedy natija o'zgarmaydi)
+    deadline_seconds: Optional[float] = None  # Transkripsiya shu vaqtga sig'ishi kerak: whisper_model eng katta nomzod, kerak bo'lsa kichikroq modelga o'tiladi
     language: str = "uz"
     enable_preprocessing: bool = True
     enable_diarization: bool = True
     enable_emotion: bool = True
     enable_subtitles: bool = True
+    streaming: bool = False  # Segmentlarni tayyor bo'lishi bilan /segments orqali berish
+    batched: bool = False  # Oynalarni boshqa task'lar bilan umumiy micro-batch navbatida decode qilish
 
 
 class TaskStatus(BaseModel):
@@ -98,6 +155,224 @@ def update_task_status(task_id: str, status: str, progress: float, message: str,
     })
 
 
+def parse_preload_models(spec: str) -> List[dict]:
+    """PRELOAD_MODELS qatorini model spetsifikatsiyalariga ajratish"""
+    models = []
+    for item in spec.split(','):
+        parts = [part.strip() for part in item.split(':')]
+        if not parts[0]:
+            continue
+        models.append({
+            'model_name': parts[0],
+            'precision': parts[1] if len(parts) > 1 and parts[1] else 'fp32',
+            'backend': parts[2] if len(parts) > 2 and parts[2] else 'whisper',
+        })
+    return models
+
+
+def warmup_models():
+    """
+    PRELOAD_MODELS dagi modellarni registry'ga yuklash va warm-up inference
+    
+    Modellar registry'da pin qilinadi: release qilingandan keyin ham va
+    boshqa modellar RAM byudjetini to'ldirganda ham chiqarilmaydi, shuning
+    uchun birinchi so'rov modelni qayta yuklamaydi va /ready 503 ga
+    tushib qolmaydi.
+    """
+    registry = get_model_registry()
+    for spec in parse_preload_models(PRELOAD_MODELS):
+        status = {**spec, 'device': None, 'warmup_time': None, 'error': None}
+        READINESS['models'].append(status)
+        
+        try:
+            transcriber = WhisperTranscriber(
+                model_name=spec['model_name'],
+                precision=spec['precision'],
+                backend=spec['backend'],
+                use_cache=False
+            )
+            status['device'] = transcriber.device
+            try:
+                status['warmup_time'] = round(transcriber.warmup(), 3)
+                registry.pin(spec['model_name'], transcriber.device, spec['precision'], spec['backend'])
+            finally:
+                transcriber.release_model()
+        except Exception as e:
+            status['error'] = str(e)
+            print(f"❌ Warm-up xatoligi ({spec['model_name']}): {str(e)}")
+    
+    READINESS['warmup_done'] = True
+
+
+@app.on_event("startup")
+async def start_warmup():
+    """Warm-up fon thread'ida - server /health ga darhol javob beradi"""
+    threading.Thread(target=warmup_models, daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def stop_inference_services():
+    """Batch inference worker'larini to'xtatish va modellarni bo'shatish"""
+    shutdown_inference_services()
+
+
+@app.on_event("startup")
+async def resume_interrupted_tasks():
+    """Oldingi jarayonda tugallanmagan task'larni checkpoint'dan davom ettirish"""
+    if not RESUME_TASKS:
+        return
+    
+    tasks = TaskCheckpoint.find_interrupted(OUTPUT_DIR, MAX_RESUME_ATTEMPTS)
+    if not tasks:
+        return
+    
+    for task in tasks:
+        update_task_status(task['task_id'], "pending", 0, "Checkpoint'dan davom ettirish navbatida...")
+    
+    def resume_sequentially():
+        # Oldingi jarayon ko'pincha OOM bilan to'xtagan: task'lar bir vaqtda
+        # model yuklasa xuddi shu xato takrorlanadi, shuning uchun navbat bilan
+        for task in tasks:
+            print(f"♻️ Task davom ettiriladi: {task['task_id']}")
+            try:
+                config = ProcessingRequest(**task['config'])
+            except Exception as e:
+                update_task_status(task['task_id'], "failed", 0, f"Xatolik: {str(e)}")
+                continue
+            process_audio_task(task['task_id'], task['file_path'], config)
+    
+    threading.Thread(target=resume_sequentially, daemon=True).start()
+
+
+def _segments_to_dicts(segments: List, is_final: bool) -> List[dict]:
+    """Segmentlarni JSON uchun dict ko'rinishiga o'tkazish"""
+    return [
+        {'text': seg.text, 'start': seg.start, 'end': seg.end, 'final': is_final}
+        for seg in segments
+    ]
+
+
+def transcribe_streaming(
+    task_id: str,
+    transcriber: WhisperTranscriber,
+    audio_data,
+    sr: int,
+    timestamp_map: TimestampMap,
+    checkpoint: TaskCheckpoint
+) -> List:
+    """
+    Audiodni bo'laklab StreamingTranscriber'ga berish va tayyor segmentlarni
+    darhol TASKS[task_id]['partial_segments'] ga yozish (GET /segments)
+    
+    Har bir checkpoint bo'lagi (transcribe_checkpointed) alohida oqim
+    sifatida decode qilinadi: bo'lak chegarasi sukutga to'g'ri keladi,
+    shuning uchun oqimni u yerda yakunlash gapni bo'lmaydi.
+    """
+    step = int(STREAM_CHUNK_SECONDS * sr)
+    total = max(len(audio_data), 1)
+    
+    def stream_chunk(chunk, offset: float, previous: List) -> List:
+        streamer = StreamingTranscriber(transcriber, sample_rate=sr)
+        committed = []
+        for start in range(0, len(chunk), step):
+            update = streamer.push(chunk[start:start + step])
+            committed.extend(update.committed)
+            
+            shown = [
+                replace(seg, start=seg.start + offset, end=seg.end + offset)
+                for seg in committed + update.provisional
+            ]
+            TASKS[task_id]['partial_segments'] = (
+                _segments_to_dicts(timestamp_map.remap_segments(previous + shown[:len(committed)]), True) +
+                _segments_to_dicts(timestamp_map.remap_segments(shown[len(committed):]), False)
+            )
+            progress = 40 + 20 * min(offset * sr + start + step, total) / total
+            update_task_status(
+                task_id, "processing", progress,
+                f"Transkripsiya... ({len(previous) + len(committed)} segment)"
+            )
+        
+        committed.extend(streamer.finish().committed)
+        return committed
+    
+    segments = transcribe_checkpointed(task_id, audio_data, sr, checkpoint, stream_chunk)
+    TASKS[task_id]['partial_segments'] = _segments_to_dicts(timestamp_map.remap_segments(segments), True)
+    
+    return segments
+
+
+def transcribe_checkpointed(
+    task_id: str,
+    audio_data,
+    sr: int,
+    checkpoint: TaskCheckpoint,
+    transcribe_chunk: Callable[..., List]
+) -> List:
+    """
+    Audiodni CHECKPOINT_CHUNK_SECONDS bo'laklarda transkripsiya qilish
+    
+    Har bir tugagan bo'lak checkpoint'ga yoziladi; avval yozilgan
+    bo'laklar qayta transkripsiya qilinmaydi. Bo'lak chegaralari audiodan
+    deterministik hisoblanadi (sukutga moslangan).
+    
+    Args:
+        transcribe_chunk: (bo'lak audio, bo'lak boshi (soniya), oldingi
+            segmentlar) -> bo'lakka nisbatan vaqtli segmentlar. Oddiy,
+            streaming va batched rejimlar shu orqali checkpoint qilinadi.
+    """
+    boundaries = WhisperTranscriber._find_silence_boundaries(audio_data, sr, CHECKPOINT_CHUNK_SECONDS)
+    chunks = list(zip(boundaries[:-1], boundaries[1:]))
+    done = checkpoint.load_chunks('transcript')
+    if done:
+        print(f"♻️ Checkpoint: {len(done)}/{len(chunks)} bo'lak tayyor")
+    
+    segments = []
+    for index, (start, end) in enumerate(chunks):
+        if index in done:
+            chunk_segments = [TranscriptionSegment(**item) for item in done[index]]
+        else:
+            offset = start / sr
+            chunk_segments = transcribe_chunk(audio_data[start:end], offset, list(segments))
+            for seg in chunk_segments:
+                seg.start += offset
+                seg.end = min(seg.end + offset, end / sr)
+            checkpoint.commit_chunk('transcript', index, [asdict(seg) for seg in chunk_segments])
+        
+        segments.extend(chunk_segments)
+        update_task_status(
+            task_id, "processing", 40 + 20 * (index + 1) / len(chunks),
+            f"Transkripsiya... ({index + 1}/{len(chunks)} bo'lak)"
+        )
+    
+    return segments
+
+
+def load_window_checkpoint(checkpoint: TaskCheckpoint):
+    """
+    Deadline va kaskad rejimlari uchun oyna darajasidagi checkpoint
+    
+    Bu rejimlar oynalarni o'zlari rejalashtiradi (model tanlash,
+    eskalatsiya), shuning uchun bo'laklar 'transcript_windows' ga oyna
+    raqami bo'yicha yoziladi va completed_windows / on_window orqali
+    qayta tiklanadi.
+    
+    Returns:
+        Tuple[Dict, Callable]: completed_windows va on_window
+    """
+    completed = {
+        index: ([TranscriptionSegment(**item) for item in items[0]['segments']], items[0]['info'])
+        for index, items in checkpoint.load_chunks('transcript_windows').items()
+    }
+    
+    def on_window(index: int, segments: List, info: dict):
+        checkpoint.commit_chunk(
+            'transcript_windows', index,
+            [{'segments': [asdict(seg) for seg in segments], 'info': info}]
+        )
+    
+    return completed, on_window
+
+
 def process_audio_task(
     task_id: str,
     file_path: str,
@@ -108,8 +383,15 @@ def process_audio_task(
     """
     output_dir = os.path.join(OUTPUT_DIR, task_id)
     os.makedirs(output_dir, exist_ok=True)
+    transcriber = None
+    task_started = time.perf_counter()
+    checkpoint = None
     
     try:
+        # Checkpoint yozishdagi xato (disk, fsync) ham task'ni failed qiladi
+        checkpoint = TaskCheckpoint(output_dir)
+        checkpoint.save_request(file_path, config.model_dump())
+        
         update_task_status(task_id, "processing", 10, "Audio yuklanmoqda...")
         
         # 1. Audio yuklash
@@ -118,65 +400,161 @@ def process_audio_task(
         
         update_task_status(task_id, "processing", 20, "Preprocessing...")
         
+        # Tozalangan vaqt -> asl media vaqti (sukut kesilmasa o'zgarmaydi)
+        timestamp_map = TimestampMap.identity(len(audio_data), sr)
+        
         # 2. Preprocessing
         if config.enable_preprocessing:
             preprocessor = AudioPreprocessor()
             audio_data = preprocessor.preprocess_audio(audio_data)
             
             remover = SilenceRemover()
-            audio_data, _ = remover.remove_silence(audio_data)
+            audio_data, _, timestamp_map = remover.remove_silence(audio_data, return_map=True)
             
             # Tozalangan audiodni saqlash
             clean_path = os.path.join(output_dir, "clean_audio.wav")
             loader.save_audio(audio_data, clean_path, sr)
         
+        # Preprocessing boshqa natija bersa eski bo'laklar ishlatilmaydi
+        if checkpoint.validate_audio(audio_fingerprint(np.asarray(audio_data, dtype=np.float32))):
+            print(f"♻️ Task {task_id} checkpoint'dan davom etmoqda")
+        
         update_task_status(task_id, "processing", 40, "Transkripsiya...")
         
         # 3. Transkripsiya
         transcriber = WhisperTranscriber(
             model_name=config.whisper_model,
-            language=config.language
+            language=config.language,
+            backend=config.backend,
+            precision=config.precision,
+            preset=config.preset,
+            speculative_draft=config.speculative_draft_model,
+            variable_length_max=VARIABLE_LENGTH_MAX,
+            runaway_guard=RUNAWAY_GUARD
         )
-        segments = transcriber.transcribe_with_timestamps(audio_data, sr)
+        cascade_info = None
+        deadline_info = None
+        # Runaway guard yoqilgan bo'lsa bo'lakning VAD nutq intervallari ham
+        # beriladi - faqat nutqli oynalar decode qilinadi (transcribe_gated)
+        vad = SilenceRemover(sample_rate=sr) if RUNAWAY_GUARD else None
+        if config.streaming:
+            segments = transcribe_streaming(task_id, transcriber, audio_data, sr, timestamp_map, checkpoint)
+        elif config.batched:
+            # Parallel task'lar oynalari bitta batch'ga yig'iladi
+            service = get_inference_service(
+                config.whisper_model,
+                precision=config.precision,
+                backend=config.backend,
+                preset=config.preset,
+                runaway_guard=RUNAWAY_GUARD,
+                variable_length_max=VARIABLE_LENGTH_MAX
+            )
+            segments = transcribe_checkpointed(
+                task_id, audio_data, sr, checkpoint,
+                lambda chunk, offset, previous: service.transcribe(
+                    chunk,
+                    sr,
+                    language=config.language,
+                    speech_segments=vad.get_speech_segments(chunk) if vad is not None else None
+                )
+            )
+        elif config.deadline_seconds:
+            # Yuklash va preprocessing'ga ketgan vaqt deadline'dan ayriladi
+            completed_windows, on_window = load_window_checkpoint(checkpoint)
+            segments, deadline_info = transcriber.transcribe_with_deadline(
+                audio_data,
+                sr,
+                deadline_seconds=config.deadline_seconds - (time.perf_counter() - task_started),
+                completed_windows=completed_windows,
+                on_window=on_window
+            )
+            deadline_info['requested_deadline_seconds'] = config.deadline_seconds
+        elif config.cascade_draft_model:
+            completed_windows, on_window = load_window_checkpoint(checkpoint)
+            segments, cascade_info = transcriber.transcribe_cascade(
+                audio_data,
+                sr,
+                draft_model=config.cascade_draft_model,
+                completed_windows=completed_windows,
+                on_window=on_window
+            )
+        else:
+            segments = transcribe_checkpointed(
+                task_id, audio_data, sr, checkpoint,
+                lambda chunk, offset, previous: transcriber.transcribe_auto(
+                    chunk,
+                    sr,
+                    long_audio_threshold=LONG_AUDIO_THRESHOLD,
+                    speech_segments=vad.get_speech_segments(chunk) if vad is not None else None
+                )
+            )
         
         # Transkripsiyani saqlash
         transcript_path = os.path.join(output_dir, "transcript.txt")
-        transcriber.save_transcript(segments, transcript_path)
+        transcriber.save_transcript(timestamp_map.remap_segments(segments), transcript_path)
         
         update_task_status(task_id, "processing", 60, "Speaker diarization...")
         
         # 4. Speaker Diarization
-        aligned = segments
+        speaker_segments = None
         if config.enable_diarization:
             diarizer = SpeakerDiarizer()
-            speaker_segments = diarizer.diarize(audio_data)
-            aligned = diarizer.align_with_transcription(speaker_segments, segments)
-            
-            # Spikerlar bo'yicha matn
-            diarization_path = os.path.join(output_dir, "speakers.txt")
-            formatted = diarizer.format_diarization(aligned)
-            with open(diarization_path, 'w', encoding='utf-8') as f:
-                f.write(formatted)
+            saved = checkpoint.load_stage('diarization')
+            if saved is not None:
+                speaker_segments = [SpeakerSegment(**item) for item in saved]
+            else:
+                speaker_segments = diarizer.diarize(audio_data)
+                checkpoint.save_stage('diarization', [asdict(seg) for seg in speaker_segments])
         
         update_task_status(task_id, "processing", 75, "Emotion detection...")
         
         # 5. Emotion Detection
+        emotions = None
         if config.enable_emotion:
             detector = EmotionDetector()
-            emotions = detector.detect_emotions_segments(audio_data, segments)
+            done = checkpoint.load_chunks('emotion')
+            emotions = []
+            # Segment yo'q bo'lsa detektor butun audiodni o'zi bo'laklaydi
+            batch_starts = range(0, len(segments), EMOTION_CHECKPOINT_SEGMENTS) if segments else [0]
+            for index, first in enumerate(batch_starts):
+                if index in done:
+                    emotions.extend(EmotionPrediction(**item) for item in done[index])
+                    continue
+                predictions = detector.detect_emotions_segments(
+                    audio_data,
+                    segments[first:first + EMOTION_CHECKPOINT_SEGMENTS]
+                )
+                checkpoint.commit_chunk('emotion', index, [asdict(pred) for pred in predictions])
+                emotions.extend(predictions)
             
             emotion_path = os.path.join(output_dir, "emotions.txt")
-            formatted_emotions = detector.format_emotions(emotions)
+            formatted_emotions = detector.format_emotions(timestamp_map.remap_segments(emotions))
             with open(emotion_path, 'w', encoding='utf-8') as f:
                 f.write(formatted_emotions)
         
+        # Segment, spiker va emotsiyalarni bitta vaqt chizig'ida birlashtirish
+        aligned = join_timeline(segments, speakers=speaker_segments, emotions=emotions)
+        timeline = timestamp_map.remap_segments(aligned)
+        speaker_emotions = summarize_speaker_emotions(timeline)
+        
+        if config.enable_diarization:
+            # Spikerlar bo'yicha matn
+            diarization_path = os.path.join(output_dir, "speakers.txt")
+            formatted = diarizer.format_diarization(timeline)
+            with open(diarization_path, 'w', encoding='utf-8') as f:
+                f.write(formatted)
+        
+        timeline_path = os.path.join(output_dir, "timeline.json")
+        with open(timeline_path, 'w', encoding='utf-8') as f:
+            json.dump(timeline, f, ensure_ascii=False, indent=2)
+        
         update_task_status(task_id, "processing", 90, "Subtitrlar yaratilmoqda...")
         
         # 6. Subtitrlar
         if config.enable_subtitles:
             generator = SubtitleGenerator()
             srt_path, vtt_path = generator.generate_both(
-                aligned,
+                timeline,
                 output_dir,
                 filename="subtitles",
                 include_speaker=config.enable_diarization
@@ -185,21 +563,38 @@ def process_audio_task(
         # Natijalar
         result = {
             'duration': len(audio_data) / sr,
+            'original_duration': timestamp_map.original_duration,
             'segments_count': len(segments),
+            'cascade': cascade_info,
+            'deadline': deadline_info,
+            'runaway_guard': transcriber.get_guard_stats(),
+            'speaker_emotions': speaker_emotions,
             'files': {
                 'transcript': 'transcript.txt',
                 'srt': 'subtitles.srt' if config.enable_subtitles else None,
                 'vtt': 'subtitles.vtt' if config.enable_subtitles else None,
                 'speakers': 'speakers.txt' if config.enable_diarization else None,
                 'emotions': 'emotions.txt' if config.enable_emotion else None,
+                'timeline': 'timeline.json',
                 'clean_audio': 'clean_audio.wav' if config.enable_preprocessing else None
             }
         }
         
+        checkpoint.mark_completed()
         update_task_status(task_id, "completed", 100, "Qayta ishlash tugallandi!", result)
         
     except Exception as e:
         update_task_status(task_id, "failed", 0, f"Xatolik: {str(e)}")
+        if checkpoint is not None:
+            try:
+                checkpoint.mark_failed(str(e))
+            except OSError as write_error:
+                print(f"⚠️ Checkpoint'ga xato yozilmadi ({task_id}): {str(write_error)}")
+    
+    finally:
+        # Model registry'da qoladi - keyingi task uni qayta yuklamaydi
+        if transcriber is not None:
+            transcriber.release_model()
 
 
 # API Endpoints
@@ -214,7 +609,9 @@ async def root():
             "upload": "POST /upload",
             "process": "POST /process",
             "status": "GET /status/{task_id}",
-            "download": "GET /download/{task_id}/{file_type}"
+            "download": "GET /download/{task_id}/{file_type}",
+            "models": "GET /models",
+            "ready": "GET /ready"
         }
     }
 
@@ -276,6 +673,36 @@ async def process_audio(
         if not file_path:
             raise HTTPException(status_code=404, detail="Fayl topilmadi")
         
+        # Speculative decoding greedy: boshqa presetlar jim e'tiborsiz qolmasin
+        if config.speculative_draft_model and config.preset not in (None, 'fast'):
+            raise HTTPException(
+                status_code=400,
+                detail=f"speculative_draft_model faqat 'fast' preset bilan ishlaydi (berilgan: {config.preset})"
+            )
+        
+        # Inference service oynalarni bitta model bilan batch decode qiladi
+        if config.batched and (config.speculative_draft_model or config.cascade_draft_model):
+            raise HTTPException(
+                status_code=400,
+                detail="batched rejim speculative_draft_model / cascade_draft_model bilan ishlamaydi"
+            )
+        
+        # Transkripsiya rejimlari bir-birini istisno qiladi (process_audio_task
+        # faqat bittasini tanlaydi - qolganlari jimgina e'tiborsiz qolardi)
+        modes = [
+            name for name, enabled in (
+                ('streaming', config.streaming),
+                ('batched', config.batched),
+                ('deadline_seconds', config.deadline_seconds),
+                ('cascade_draft_model', config.cascade_draft_model),
+            ) if enabled
+        ]
+        if len(modes) > 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Bu rejimlar birga ishlamaydi: {', '.join(modes)}"
+            )
+        
         # Task yaratish
         task_id = generate_task_id()
         update_task_status(task_id, "pending", 0, "Navbatda...")
@@ -312,6 +739,74 @@ async def get_task_status(task_id: str):
     return TASKS[task_id]
 
 
+@app.get("/segments/{task_id}")
+async def get_task_segments(task_id: str):
+    """
+    Task uchun hozirgacha tayyor bo'lgan segmentlar (streaming rejimi)
+    
+    Args:
+        task_id: Task ID
+    
+    Returns:
+        Dict: status va segmentlar (final=True - o'zgarmaydi)
+    """
+    if task_id not in TASKS:
+        raise HTTPException(status_code=404, detail="Task topilmadi")
+    
+    task = TASKS[task_id]
+    return {
+        "task_id": task_id,
+        "status": task['status'],
+        "segments": task.get('partial_segments', [])
+    }
+
+
+@app.websocket("/stream")
+async def stream_transcription(
+    websocket: WebSocket,
+    model: str = "small",
+    language: str = "uz"
+):
+    """
+    Jonli transkripsiya: mijoz 16 kHz mono float32 PCM bo'laklarini binary
+    xabar sifatida yuboradi, "end" matni bilan yakunlaydi. Har bir bo'lakdan
+    keyin final va provisional segmentlar JSON ko'rinishida qaytariladi.
+    """
+    await websocket.accept()
+    
+    transcriber = WhisperTranscriber(model_name=model, language=language)
+    streamer = StreamingTranscriber(transcriber, sample_rate=16000)
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            
+            if message.get('bytes') is not None:
+                chunk = np.frombuffer(message['bytes'], dtype=np.float32)
+                update = await run_in_threadpool(streamer.push, chunk)
+            elif message.get('text') == 'end':
+                update = await run_in_threadpool(streamer.finish)
+            elif message.get('type') == 'websocket.disconnect':
+                break
+            else:
+                continue
+            
+            await websocket.send_json({
+                "committed": _segments_to_dicts(update.committed, True),
+                "provisional": _segments_to_dicts(update.provisional, False)
+            })
+            
+            if message.get('text') == 'end':
+                await websocket.close()
+                break
+    
+    except WebSocketDisconnect:
+        pass
+    
+    finally:
+        transcriber.release_model()
+
+
 @app.get("/download/{task_id}/{file_type}")
 async def download_file(task_id: str, file_type: str):
     """
@@ -319,7 +814,7 @@ async def download_file(task_id: str, file_type: str):
     
     Args:
         task_id: Task ID
-        file_type: Fayl turi (transcript, srt, vtt, speakers, emotions)
+        file_type: Fayl turi (transcript, srt, vtt, speakers, emotions, timeline)
     
     Returns:
         FileResponse: Fayl
@@ -339,6 +834,7 @@ async def download_file(task_id: str, file_type: str):
         'vtt': 'subtitles.vtt',
         'speakers': 'speakers.txt',
         'emotions': 'emotions.txt',
+        'timeline': 'timeline.json',
         'audio': 'clean_audio.wav'
     }
     
@@ -391,6 +887,23 @@ async def list_tasks():
     return list(TASKS.values())
 
 
+@app.get("/models")
+async def list_models():
+    """
+    Yuklangan Whisper modellar, registry va transkripsiya keshi statistikasi
+    
+    Returns:
+        Dict: Yuklash vaqtlari, hit/miss, RAM ishlatilishi
+    """
+    return {
+        **get_model_registry().get_stats(),
+        'transcription_cache': get_transcription_cache().get_stats(),
+        'encoder_cache': get_encoder_cache().get_stats(),
+        'inference_services': get_inference_services_stats(),
+        'rtf_table': get_rtf_table().get_stats()
+    }
+
+
 # Health check
 @app.get("/health")
 async def health_check():
@@ -401,6 +914,45 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Tayyorlik tekshiruvi (load balancer uchun)
+    
+    Warm-up tugamaguncha, xatolik bo'lsa yoki oldindan yuklangan model
+    registry'da bo'lmasa 503 qaytaradi. Preload modellar pin qilingan
+    (LRU ularni chiqarmaydi), 'pinned' maydoni shu holatni ko'rsatadi.
+    """
+    registry = get_model_registry()
+    pinned = {
+        (model['model_name'], model['device'], model['precision'], model['backend'])
+        for model in registry.get_stats()['models']
+        if model['pinned']
+    }
+    models = []
+    for status in list(READINESS['models']):
+        key = (status['model_name'], status['device'] or 'cpu', status['precision'], status['backend'])
+        models.append({
+            **status,
+            'loaded': registry.is_loaded(*key),
+            'pinned': key in pinned,
+        })
+    
+    ready = READINESS['warmup_done'] and all(
+        model['loaded'] and model['error'] is None for model in models
+    )
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "warmup_done": READINESS['warmup_done'],
+            "models": models,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -5,8 +5,48 @@ O'zbek tilidagi nutqni matnga aylantirish moduli
 
 Qo'llab-quvvatlanadigan modellar:
     - Whisper (OpenAI)
+
+Backend'lar:
+    - whisper, faster-whisper (CTranslate2), onnx, fake
 """
 
-from .whisper_model import WhisperTranscriber
+from .whisper_model import WhisperTranscriber, DECODE_PRESETS
+from .model_registry import ModelRegistry, get_model_registry, configure_model_registry
+from .backends import InferenceBackend, get_backend, BACKENDS
+from .streaming import StreamingTranscriber, StreamUpdate
+from .transcription_cache import TranscriptionCache, get_transcription_cache
+from .encoder_cache import EncoderCache, get_encoder_cache
+from .speculative import SpeculativeDecoder
+from .inference_service import (
+    InferenceService,
+    get_inference_service,
+    get_inference_services_stats,
+    shutdown_inference_services,
+)
+from .rtf_table import RTFTable, get_rtf_table
+from .decode_guard import RunawayGuard
 
-__all__ = ['WhisperTranscriber']
+__all__ = [
+    'WhisperTranscriber',
+    'DECODE_PRESETS',
+    'ModelRegistry',
+    'get_model_registry',
+    'configure_model_registry',
+    'InferenceBackend',
+    'get_backend',
+    'BACKENDS',
+    'StreamingTranscriber',
+    'StreamUpdate',
+    'TranscriptionCache',
+    'get_transcription_cache',
+    'EncoderCache',
+    'get_encoder_cache',
+    'SpeculativeDecoder',
+    'InferenceService',
+    'get_inference_service',
+    'get_inference_services_stats',
+    'shutdown_inference_services',
+    'RTFTable',
+    'get_rtf_table',
+    'RunawayGuard',
+]
@@ -0,0 +1,457 @@
+"""
+STT Inference Backends
+======================
+WhisperTranscriber ortidagi almashtiriladigan inference backend'lar
+
+Har bir backend bir xil natija strukturasini qaytaradi (openai-whisper
+model.transcribe formati):
+
+    {
+        'text': str,
+        'language': str,
+        'segments': [{'start': float, 'end': float, 'text': str, ...}, ...]
+    }
+
+Mavjud backend'lar:
+    - whisper: openai-whisper (PyTorch)
+    - faster-whisper: CTranslate2 (int8/float32, CPU uchun tez)
+    - onnx: ONNX Runtime (optimum + transformers)
+    - fake: Deterministik soxta backend (test va CI uchun)
+"""
+
+import os
+import warnings
+import numpy as np
+from typing import Any, Dict, Optional
+
+
+class InferenceBackend:
+    """
+    Backend interfeysi
+
+    Backend'lar holatsiz: load_model() model obyektini qaytaradi (u
+    ModelRegistry'da keshlanadi), transcribe() esa shu obyekt bilan ishlaydi.
+    """
+
+    name = 'base'
+
+    def load_model(self, model_name: str, device: str = 'cpu', precision: str = 'fp32') -> Any:
+        """
+        Modelni yuklash
+
+        Args:
+            model_name (str): Model nomi (tiny, base, small, medium, large)
+            device (str): 'cpu' yoki 'cuda'
+            precision (str): Aniqlik rejimi
+
+        Returns:
+            Any: Backend'ga xos model obyekti
+        """
+        raise NotImplementedError
+
+    def transcribe(
+        self,
+        model: Any,
+        audio_data: np.ndarray,
+        language: Optional[str] = None,
+        task: str = 'transcribe',
+        verbose: bool = False,
+        **decode_options
+    ) -> Dict:
+        """
+        16 kHz float32 audiodni transkripsiya qilish
+
+        Args:
+            model (Any): load_model() natijasi
+            audio_data (np.ndarray): 16 kHz mono float32 audio
+            language (str, optional): Til kodi
+            task (str): 'transcribe' yoki 'translate'
+            verbose (bool): Batafsil chiqarish
+            **decode_options: Backend'ga xos decode parametrlari
+
+        Returns:
+            Dict: {'text', 'language', 'segments'}
+        """
+        raise NotImplementedError
+
+
+class WhisperBackend(InferenceBackend):
+    """
+    openai-whisper (PyTorch) backend
+
+    precision='int8' bo'lsa Linear qatlamlarga dinamik kvantizatsiya
+    (torch.quantization.quantize_dynamic, qint8) bir marta qo'llanadi va
+    natija (model o'lchamlari + state_dict) diskka keshlanadi - keyingi
+    ishga tushirishlarda bo'sh model kvantizatsiya qilinib, keshdagi
+    og'irliklar yuklanadi (fp32 checkpoint o'qilmaydi).
+    """
+
+    name = 'whisper'
+
+    def load_model(self, model_name: str, device: str = 'cpu', precision: str = 'fp32') -> Any:
+        import whisper
+
+        if precision != 'int8':
+            return whisper.load_model(model_name, device=device)
+
+        if device != 'cpu':
+            raise ValueError("int8 dinamik kvantizatsiya faqat CPU uchun")
+
+        return self._load_quantized(model_name)
+
+    @staticmethod
+    def quantized_cache_path(model_name: str) -> str:
+        """Kvantizatsiya qilingan model kesh fayli yo'li"""
+        import torch
+
+        cache_dir = os.environ.get(
+            'WHISPER_QUANT_CACHE_DIR',
+            os.path.join(os.path.expanduser("~"), ".cache", "whisper", "quantized")
+        )
+        return os.path.join(cache_dir, f"{model_name}-int8-torch{torch.__version__}.state.pt")
+
+    @staticmethod
+    def _quantize(model) -> Any:
+        import torch
+
+        # whisper.model.Linear nn.Linear'ning vorisi; quantize_dynamic faqat aniq
+        # nn.Linear turini almashtiradi. fp32 da forward'lari bir xil.
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+                module.__class__ = torch.nn.Linear
+
+        quantized = torch.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+        return quantized.eval()
+
+    def _load_cached_quantized(self, model_name: str, cache_path: str) -> Any:
+        import torch
+        import whisper
+        from whisper.model import ModelDimensions, Whisper
+
+        # Jarayonning o'zi yozgan kesh (qint8 packed params); torch >= 2.6 da
+        # weights_only standarti True, shuning uchun aniq beriladi
+        payload = torch.load(cache_path, map_location='cpu', weights_only=False)
+
+        model = Whisper(ModelDimensions(**payload['dims']))
+        quantized = self._quantize(model)
+        quantized.load_state_dict(payload['state_dict'])
+
+        # alignment_heads persistent bo'lmagan buffer - state_dict'da yo'q
+        alignment_heads = getattr(whisper, '_ALIGNMENT_HEADS', {}).get(model_name)
+        if alignment_heads is not None:
+            quantized.set_alignment_heads(alignment_heads)
+
+        return quantized
+
+    def _load_quantized(self, model_name: str) -> Any:
+        import torch
+        import whisper
+
+        cache_path = self.quantized_cache_path(model_name)
+
+        if os.path.exists(cache_path):
+            try:
+                print(f"📦 Kvantizatsiya qilingan model keshdan yuklanmoqda: {cache_path}")
+                return self._load_cached_quantized(model_name, cache_path)
+            except Exception as e:
+                print(f"⚠️ Kesh o'qilmadi, qayta kvantizatsiya qilinadi: {str(e)}")
+
+        model = whisper.load_model(model_name, device='cpu')
+        dims = dict(vars(model.dims))
+
+        print("⚙️ Linear qatlamlar int8 ga kvantizatsiya qilinmoqda...")
+        quantized = self._quantize(model)
+
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = cache_path + '.tmp'
+            torch.save({'dims': dims, 'state_dict': quantized.state_dict()}, tmp_path)
+            os.replace(tmp_path, cache_path)
+            print(f"💾 Kvantizatsiya qilingan model saqlandi: {cache_path}")
+        except Exception as e:
+            print(f"⚠️ Kvantizatsiya keshini saqlab bo'lmadi: {str(e)}")
+
+        return quantized
+
+    def transcribe(
+        self,
+        model: Any,
+        audio_data: np.ndarray,
+        language: Optional[str] = None,
+        task: str = 'transcribe',
+        verbose: bool = False,
+        **decode_options
+    ) -> Dict:
+        decode_options.setdefault('fp16', False)  # CPU uchun False
+        return model.transcribe(
+            audio_data,
+            language=language,
+            task=task,
+            verbose=verbose,
+            **decode_options
+        )
+
+
+class FasterWhisperBackend(InferenceBackend):
+    """CTranslate2 (faster-whisper) backend - CPU'da int8 inference"""
+
+    name = 'faster-whisper'
+
+    # WhisperTranscriber precision -> CTranslate2 compute_type
+    COMPUTE_TYPES = {
+        'fp32': 'float32',
+        'fp16': 'float16',
+        'int8': 'int8',
+    }
+
+    def load_model(self, model_name: str, device: str = 'cpu', precision: str = 'fp32') -> Any:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ImportError(
+                "faster-whisper o'rnatilmagan: pip install faster-whisper"
+            )
+
+        return WhisperModel(
+            model_name,
+            device=device,
+            compute_type=self.COMPUTE_TYPES.get(precision, 'int8')
+        )
+
+    def transcribe(
+        self,
+        model: Any,
+        audio_data: np.ndarray,
+        language: Optional[str] = None,
+        task: str = 'transcribe',
+        verbose: bool = False,
+        **decode_options
+    ) -> Dict:
+        decode_options.pop('fp16', None)
+        # openai-whisper'da None = greedy; CTranslate2 buni 1 deb kutadi
+        for key in ('beam_size', 'best_of'):
+            if key in decode_options and decode_options[key] is None:
+                decode_options[key] = 1
+        segments_iter, info = model.transcribe(
+            audio_data,
+            language=language,
+            task=task,
+            **decode_options
+        )
+
+        segments = []
+        for i, seg in enumerate(segments_iter):
+            segments.append({
+                'id': i,
+                'start': float(seg.start),
+                'end': float(seg.end),
+                'text': seg.text,
+                'avg_logprob': float(seg.avg_logprob),
+                'compression_ratio': float(seg.compression_ratio),
+                'no_speech_prob': float(seg.no_speech_prob),
+            })
+            if verbose:
+                print(f"[{seg.start:.2f} --> {seg.end:.2f}] {seg.text}")
+
+        return {
+            'text': ''.join(seg['text'] for seg in segments),
+            'language': info.language,
+            'segments': segments,
+        }
+
+
+class ONNXBackend(InferenceBackend):
+    """ONNX Runtime backend (optimum.onnxruntime + transformers pipeline)"""
+
+    name = 'onnx'
+
+    def load_model(self, model_name: str, device: str = 'cpu', precision: str = 'fp32') -> Any:
+        try:
+            from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+            from transformers import AutoProcessor, pipeline
+        except ImportError:
+            raise ImportError(
+                "ONNX backend uchun optimum[onnxruntime] kerak: "
+                "pip install optimum[onnxruntime]"
+            )
+
+        model_id = f"openai/whisper-{model_name}"
+        processor = AutoProcessor.from_pretrained(model_id)
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(model_id, export=True)
+
+        return pipeline(
+            'automatic-speech-recognition',
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor,
+            chunk_length_s=30,
+            device=-1 if device == 'cpu' else 0
+        )
+
+    def transcribe(
+        self,
+        model: Any,
+        audio_data: np.ndarray,
+        language: Optional[str] = None,
+        task: str = 'transcribe',
+        verbose: bool = False,
+        **decode_options
+    ) -> Dict:
+        generate_kwargs = self._generate_kwargs(decode_options)
+        generate_kwargs['task'] = task
+        if language is not None:
+            generate_kwargs['language'] = language
+
+        output = model(
+            {'raw': audio_data, 'sampling_rate': 16000},
+            return_timestamps=True,
+            generate_kwargs=generate_kwargs
+        )
+
+        duration = len(audio_data) / 16000
+        segments = []
+        for i, chunk in enumerate(output.get('chunks', [])):
+            start, end = chunk['timestamp']
+            segments.append({
+                'id': i,
+                'start': float(start or 0.0),
+                'end': float(end if end is not None else duration),
+                'text': chunk['text'],
+            })
+
+        return {
+            'text': output.get('text', ''),
+            'language': language or '',
+            'segments': segments,
+        }
+
+    @staticmethod
+    def _generate_kwargs(decode_options: Dict) -> Dict:
+        """
+        openai-whisper decode parametrlarini transformers generate_kwargs ga o'tkazish
+
+        beam_size -> num_beams, temperature > 0 -> sampling. Pipeline har bir
+        30 soniyalik bo'lakni bir marta decode qiladi, shuning uchun temperature
+        fallback (ketma-ketlikdagi birinchi qiymat ishlatiladi), best_of, sifat
+        chegaralari va condition_on_previous_text qo'llanmaydi - bu haqda
+        ogohlantiriladi.
+        """
+        options = dict(decode_options)
+        options.pop('fp16', None)
+        generate_kwargs = {}
+        ignored = []
+
+        beam_size = options.pop('beam_size', None)
+        if beam_size is not None:
+            generate_kwargs['num_beams'] = int(beam_size)
+
+        temperature = options.pop('temperature', None)
+        if isinstance(temperature, (tuple, list)):
+            if len(temperature) > 1:
+                ignored.append('temperature fallback')
+            temperature = temperature[0] if temperature else None
+        if temperature is not None and temperature > 0:
+            generate_kwargs['do_sample'] = True
+            generate_kwargs['temperature'] = float(temperature)
+
+        if options.pop('best_of', None) is not None:
+            ignored.append('best_of')
+        if options.pop('condition_on_previous_text', False):
+            ignored.append('condition_on_previous_text')
+        ignored.extend(key for key, value in options.items() if value is not None)
+
+        if ignored:
+            warnings.warn(
+                f"ONNX backend quyidagi decode parametrlarini qo'llamaydi: {', '.join(ignored)}"
+            )
+        return generate_kwargs
+
+
+class FakeBackend(InferenceBackend):
+    """
+    Deterministik soxta backend
+
+    Model yuklamaydi: audiodagi energiyali (ovozli) qismlarni 0.5 soniyalik
+    frame'lar bo'yicha topib, har biri uchun "segment N" matnini qaytaradi.
+    Pipeline va conformance tekshiruvlari uchun.
+    """
+
+    name = 'fake'
+
+    def __init__(self, frame_duration: float = 0.5, threshold: float = 1e-3):
+        self.frame_duration = frame_duration
+        self.threshold = threshold
+
+    def load_model(self, model_name: str, device: str = 'cpu', precision: str = 'fp32') -> Any:
+        return {'model_name': model_name, 'device': device, 'precision': precision}
+
+    def transcribe(
+        self,
+        model: Any,
+        audio_data: np.ndarray,
+        language: Optional[str] = None,
+        task: str = 'transcribe',
+        verbose: bool = False,
+        **decode_options
+    ) -> Dict:
+        frame = max(1, int(self.frame_duration * 16000))
+        n_frames = int(np.ceil(len(audio_data) / frame))
+        duration = len(audio_data) / 16000
+
+        padded = np.zeros(n_frames * frame, dtype=np.float32)
+        padded[:len(audio_data)] = audio_data
+        rms = np.sqrt(np.mean(padded.reshape(n_frames, frame) ** 2, axis=1)) if n_frames else np.zeros(0)
+        voiced = rms > self.threshold
+
+        segments = []
+        i = 0
+        while i < n_frames:
+            if not voiced[i]:
+                i += 1
+                continue
+            j = i
+            while j < n_frames and voiced[j]:
+                j += 1
+            segments.append({
+                'id': len(segments),
+                'start': round(i * self.frame_duration, 3),
+                'end': round(min(j * self.frame_duration, duration), 3),
+                'text': f" segment {len(segments) + 1}",
+            })
+            i = j
+
+        return {
+            'text': ''.join(seg['text'] for seg in segments),
+            'language': language or 'uz',
+            'segments': segments,
+        }
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    ONNXBackend.name: ONNXBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+
+def get_backend(name: str) -> InferenceBackend:
+    """
+    Backend nomi bo'yicha backend obyektini yaratish
+
+    Args:
+        name (str): Backend nomi (whisper, faster-whisper, onnx, fake)
+
+    Returns:
+        InferenceBackend: Backend
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Noto'g'ri backend: {name}. "
+            f"Mavjud backend'lar: {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[name]()
@@ -0,0 +1,223 @@
+"""
+Backend Conformance Suite
+=========================
+Har bir STT backend o'tishi shart bo'lgan tekshiruvlar
+
+Backend lokal fixture audio fayllarda (yoki sintetik signallarda)
+ishga tushiriladi va natija strukturasi, vaqt belgilari va
+determinizm tekshiriladi.
+
+Foydalanish:
+    python -m stt.conformance --backend fake
+    python -m stt.conformance --backend whisper --model tiny --fixtures ./fixtures
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .backends import get_backend, BACKENDS
+from .whisper_model import WhisperTranscriber, TranscriptionSegment
+
+
+SAMPLE_RATE = 16000
+TIME_TOLERANCE = 0.5  # soniya
+
+
+def synthetic_fixtures() -> Dict[str, np.ndarray]:
+    """
+    Fayl talab qilmaydigan sintetik fixture'lar
+
+    Returns:
+        Dict[str, np.ndarray]: nom -> 16 kHz float32 audio
+    """
+    rng = np.random.default_rng(0)
+
+    def tone(duration: float, freq: float = 220.0) -> np.ndarray:
+        t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        return (0.3 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+    def silence(duration: float) -> np.ndarray:
+        return np.zeros(int(duration * SAMPLE_RATE), dtype=np.float32)
+
+    return {
+        'silence_2s': silence(2.0),
+        'short_0.3s': tone(0.3),
+        'bursts': np.concatenate([tone(1.0), silence(1.0), tone(1.5, 330.0), silence(0.5)]),
+        'noise_3s': (0.05 * rng.standard_normal(3 * SAMPLE_RATE)).astype(np.float32),
+        'long_45s': np.concatenate([tone(4.0), silence(1.0)] * 9),
+    }
+
+
+def load_fixtures(fixture_dir: str) -> Dict[str, np.ndarray]:
+    """
+    Papkadagi .wav/.flac fixture'larni 16 kHz mono sifatida yuklash
+
+    Args:
+        fixture_dir (str): Fixture papkasi
+
+    Returns:
+        Dict[str, np.ndarray]: nom -> audio
+    """
+    import soundfile as sf
+
+    fixtures = {}
+    for path in sorted(Path(fixture_dir).iterdir()):
+        if path.suffix.lower() not in ('.wav', '.flac'):
+            continue
+        audio, sr = sf.read(str(path), dtype='float32', always_2d=True)
+        audio = audio.mean(axis=1)
+        if sr != SAMPLE_RATE:
+            import librosa
+            audio = librosa.resample(audio, orig_sr=sr, target_sr=SAMPLE_RATE)
+        fixtures[path.stem] = audio.astype(np.float32)
+    return fixtures
+
+
+def _check_result_structure(result: Dict, duration: float) -> List[str]:
+    errors = []
+
+    if not isinstance(result, dict):
+        return [f"natija dict emas: {type(result).__name__}"]
+
+    for key in ('text', 'language', 'segments'):
+        if key not in result:
+            errors.append(f"'{key}' kaliti yo'q")
+    if errors:
+        return errors
+
+    if not isinstance(result['text'], str):
+        errors.append("'text' str emas")
+    if not isinstance(result['segments'], list):
+        return errors + ["'segments' list emas"]
+
+    prev_start = -1.0
+    for i, seg in enumerate(result['segments']):
+        for key in ('start', 'end', 'text'):
+            if key not in seg:
+                errors.append(f"segment {i}: '{key}' yo'q")
+        if any(key not in seg for key in ('start', 'end', 'text')):
+            continue
+
+        start, end = float(seg['start']), float(seg['end'])
+        if not isinstance(seg['text'], str):
+            errors.append(f"segment {i}: text str emas")
+        if start < 0 or end < start:
+            errors.append(f"segment {i}: noto'g'ri interval ({start}, {end})")
+        if end > duration + TIME_TOLERANCE:
+            errors.append(f"segment {i}: tugash {end:.2f}s audio davomiyligidan ({duration:.2f}s) katta")
+        if start < prev_start:
+            errors.append(f"segment {i}: segmentlar tartiblanmagan")
+        prev_start = start
+
+    return errors
+
+
+def _check_determinism(first: Dict, second: Dict) -> List[str]:
+    def signature(result):
+        return [
+            (round(float(seg['start']), 2), round(float(seg['end']), 2), seg['text'])
+            for seg in result.get('segments', [])
+        ]
+
+    if signature(first) != signature(second):
+        return ["bir xil kirish uchun natija deterministik emas"]
+    return []
+
+
+def _check_transcriber_segments(segments: List, duration: float) -> List[str]:
+    errors = []
+    for i, seg in enumerate(segments):
+        if not isinstance(seg, TranscriptionSegment):
+            errors.append(f"segment {i}: TranscriptionSegment emas")
+            continue
+        if seg.end < seg.start or seg.end > duration + TIME_TOLERANCE:
+            errors.append(f"segment {i}: noto'g'ri vaqt ({seg.start}, {seg.end})")
+    return errors
+
+
+def run_conformance(
+    backend_name: str,
+    model_name: str = 'tiny',
+    language: str = 'uz',
+    fixtures: Optional[Dict[str, np.ndarray]] = None
+) -> List[Tuple[str, str, List[str]]]:
+    """
+    Backend uchun barcha tekshiruvlarni ishga tushirish
+
+    Args:
+        backend_name (str): Backend nomi
+        model_name (str): Model nomi. Default: 'tiny'
+        language (str): Til kodi. Default: 'uz'
+        fixtures (Dict, optional): nom -> audio (None = sintetik)
+
+    Returns:
+        List[Tuple[str, str, List[str]]]: (fixture, tekshiruv, xatolar)
+    """
+    if fixtures is None:
+        fixtures = synthetic_fixtures()
+
+    backend = get_backend(backend_name)
+    model = backend.load_model(model_name, 'cpu', 'fp32')
+
+    transcriber = WhisperTranscriber(
+        model_name=model_name,
+        language=language,
+        use_registry=False,
+        backend=backend_name,
+        use_cache=False
+    )
+    transcriber.model = model
+
+    checks: List[Tuple[str, Callable[[np.ndarray, float], List[str]]]] = [
+        ('structure', lambda audio, dur: _check_result_structure(
+            backend.transcribe(model, audio, language=language), dur)),
+        ('determinism', lambda audio, dur: _check_determinism(
+            backend.transcribe(model, audio, language=language, temperature=0.0),
+            backend.transcribe(model, audio, language=language, temperature=0.0))
+            if backend_name != 'onnx' else []),
+        ('transcriber', lambda audio, dur: _check_transcriber_segments(
+            transcriber.transcribe_with_timestamps(audio, SAMPLE_RATE, language), dur)),
+    ]
+
+    report = []
+    for fixture_name, audio in fixtures.items():
+        duration = len(audio) / SAMPLE_RATE
+        for check_name, check in checks:
+            try:
+                errors = check(audio, duration)
+            except Exception as e:
+                errors = [f"istisno: {type(e).__name__}: {e}"]
+            report.append((fixture_name, check_name, errors))
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='STT backend conformance tekshiruvi')
+    parser.add_argument('--backend', default='fake', choices=list(BACKENDS))
+    parser.add_argument('--model', default='tiny')
+    parser.add_argument('--language', default='uz')
+    parser.add_argument('--fixtures', default=None, help='Lokal fixture audio papkasi')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else None
+    report = run_conformance(args.backend, args.model, args.language, fixtures)
+
+    failed = 0
+    for fixture_name, check_name, errors in report:
+        status = '✅' if not errors else '❌'
+        print(f"{status} {fixture_name} :: {check_name}")
+        for error in errors:
+            print(f"     - {error}")
+        failed += bool(errors)
+
+    print(f"\n{len(report) - failed}/{len(report)} tekshiruv o'tdi ({args.backend})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Runaway Decoding Guard
+======================
+Musiqa va shovqin oynalarida Whisper decoder'ining takrorlanish
+sikliga tushib, oyna token limitigacha gallyutsinatsiya qilishini to'xtatish
+
+Ikki tekshiruv decode paytida ishlaydi (oyna erta yakunlanadi - EOT):
+    - takrorlanish: namuna tokenlarining oxiri bir xil n-gramning ketma-ket
+      takrorlaridan iborat bo'lsa (har qadamda har bir qator qayta
+      tekshiriladi - beam search qatorlarni qayta tartiblaydi). Natijada
+      takrorlangan dum bitta nusxagacha qisqartiriladi
+    - nutq ehtimoli: decoder'ning <|nospeech|> ehtimoli (birinchi forward,
+      SOT pozitsiyasi) chegaradan yuqori bo'lsa - birinchi tokendayoq,
+      audio bo'yicha (uning barcha beam/namuna qatorlari)
+
+openai-whisper DecodingTask'iga logit filtri qo'shiladi (bir marta,
+jarayon bo'yicha). Filtr faqat RunawayGuard.active() konteksti ichida
+yaratilgan decode'larda ishlaydi, shuning uchun guard'siz transcriber'lar
+ulashilgan modelda avvalgidek ishlaydi.
+"""
+
+import threading
+from dataclasses import replace
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import torch
+    import whisper
+except ImportError:
+    torch = None
+    whisper = None
+
+
+_local = threading.local()
+_patch_lock = threading.Lock()
+
+
+class RunawayGuard:
+    """
+    Guard sozlamalari va statistikasi (bitta transcriber uchun)
+    """
+
+    def __init__(
+        self,
+        max_ngram: int = 8,
+        min_repeats: int = 4,
+        min_repeat_tokens: int = 12,
+        no_speech_threshold: float = 0.8
+    ):
+        """
+        Args:
+            max_ngram (int): Tekshiriladigan eng uzun takrorlanuvchi n-gram (token)
+            min_repeats (int): Ketma-ket takrorlar soni (kamida)
+            min_repeat_tokens (int): Takrorlangan qismning minimal uzunligi
+                (token) - "ha ha ha" kabi qisqa haqiqiy takrorlar uchun
+            no_speech_threshold (float): Shundan yuqori <|nospeech|>
+                ehtimolida oyna decode qilinmaydi
+        """
+        self.max_ngram = max_ngram
+        self.min_repeats = min_repeats
+        self.min_repeat_tokens = min_repeat_tokens
+        self.no_speech_threshold = no_speech_threshold
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'decoded_windows': 0,
+            'aborted_repetition': 0,
+            'aborted_no_speech': 0,
+            'vad_skipped_windows': 0,
+        }
+
+    @contextmanager
+    def active(self):
+        """Shu thread'dagi decode'larga guard'ni qo'llash"""
+        previous = getattr(_local, 'guard', None)
+        _local.guard = self
+        try:
+            yield self
+        finally:
+            _local.guard = previous
+
+    def repetition_period(self, tokens: List[int]) -> int:
+        """
+        Tokenlar oxiridagi takrorlanuvchi n-gram uzunligi
+
+        Args:
+            tokens (List[int]): Matn tokenlari
+
+        Returns:
+            int: n-gram uzunligi (0 = takrorlanish yo'q)
+        """
+        for period in range(1, self.max_ngram + 1):
+            repeats = max(self.min_repeats, -(-self.min_repeat_tokens // period))
+            span = period * repeats
+            if len(tokens) < span:
+                break
+
+            tail = tokens[-span:]
+            if all(tail[i] == tail[i % period] for i in range(period, span)):
+                return period
+        return 0
+
+    def trim_repetition(self, tokens: List[int], eot: int) -> Optional[List[int]]:
+        """
+        Oxiridagi takrorlanishni bitta nusxagacha qisqartirish
+
+        Vaqt belgisi tokenlari (>= eot) takrorlanishni aniqlashda hisobga
+        olinmaydi, lekin saqlangan qismda o'z joyida qoladi.
+
+        Args:
+            tokens (List[int]): Natija tokenlari (EOT'siz)
+            eot (int): EOT token ID
+
+        Returns:
+            Optional[List[int]]: Qisqartirilgan tokenlar (None = takrorlanish yo'q)
+        """
+        positions = [i for i, token in enumerate(tokens) if token < eot]
+        text = [tokens[i] for i in positions]
+        period = self.repetition_period(text)
+        if not period:
+            return None
+
+        keep = len(text)
+        while keep >= 2 * period and text[keep - period:keep] == text[keep - 2 * period:keep - period]:
+            keep -= period
+        return tokens[:positions[keep - 1] + 1]
+
+    def count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    def get_stats(self) -> Dict:
+        """
+        Guard statistikasi
+
+        Returns:
+            Dict: decode qilingan, to'xtatilgan va VAD bo'yicha o'tkazib
+                yuborilgan oynalar soni
+        """
+        with self._lock:
+            return dict(self.stats)
+
+
+class _GuardFilter:
+    """DecodingTask logit filtri (whisper.decoding.LogitFilter interfeysi)"""
+
+    def __init__(self, guard: RunawayGuard, task):
+        self.guard = guard
+        self.tokenizer = task.tokenizer
+        self.sample_begin = task.sample_begin
+        self.sot_index = task.sot_index
+        self.n_group = task.n_group
+        self.no_speech_probs: Optional[List[float]] = None
+        # Audio indeksi -> sabab (qatorlar beam search'da qayta tartiblanadi,
+        # audio indeksi esa row // n_group bo'yicha o'zgarmaydi)
+        self.aborted: Dict[int, str] = {}
+
+    def observe_prompt(self, tokens: 'torch.Tensor', logits: 'torch.Tensor'):
+        """Birinchi decoder forward'idan <|nospeech|> ehtimolini olish"""
+        no_speech = self.tokenizer.no_speech
+        if no_speech is None:
+            return
+        probs = logits[:, self.sot_index].float().softmax(dim=-1)
+        self.no_speech_probs = probs[:, no_speech].tolist()
+
+    def apply(self, logits: 'torch.Tensor', tokens: 'torch.Tensor'):
+        eot = self.tokenizer.eot
+        step = tokens.shape[1] - self.sample_begin
+
+        for row in range(tokens.shape[0]):
+            audio = row // self.n_group
+            reason = None
+
+            # Nutqsiz audio: uning barcha qatorlari yakunlanadi
+            if self.aborted.get(audio) == 'no_speech':
+                reason = 'no_speech'
+            elif step == 0 and self.no_speech_probs is not None:
+                if self.no_speech_probs[row] > self.guard.no_speech_threshold:
+                    reason = 'no_speech'
+
+            # Takrorlanish shu qatorning hozirgi tokenlari bo'yicha (sticky emas)
+            if reason is None and step >= self.guard.min_repeat_tokens:
+                sampled = tokens[row, self.sample_begin:].tolist()
+                text_tokens = [t for t in sampled if t < eot]
+                if self.guard.repetition_period(text_tokens):
+                    reason = 'repetition'
+
+            if reason is not None:
+                self.aborted.setdefault(audio, reason)
+                logits[row, :] = -float('inf')
+                logits[row, eot] = 0.0
+
+
+def _guarded_task_class():
+    base = whisper.decoding.DecodingTask
+
+    class GuardedDecodingTask(base):
+        _runaway_guard = True
+
+        def __init__(self, model, options):
+            super().__init__(model, options)
+            guard = getattr(_local, 'guard', None)
+            self.guard_filter = _GuardFilter(guard, self) if guard is not None else None
+            if self.guard_filter is not None:
+                # Oxirida: timestamp qoidalaridan keyin faqat EOT qoladi
+                self.logit_filters.append(self.guard_filter)
+
+        def run(self, mel):
+            if self.guard_filter is None:
+                return super().run(mel)
+
+            previous = getattr(_local, 'filter', None)
+            _local.filter = self.guard_filter
+            try:
+                results = super().run(mel)
+            finally:
+                _local.filter = previous
+
+            guard = self.guard_filter.guard
+            guard.count('decoded_windows', len(results))
+            for reason in self.guard_filter.aborted.values():
+                guard.count(f'aborted_{reason}')
+
+            # Tanlangan natijada takrorlangan dum qolgan bo'lsa - bitta nusxa
+            eot = self.tokenizer.eot
+            trimmed = []
+            for result in results:
+                tokens = guard.trim_repetition(list(result.tokens), eot)
+                if tokens is not None:
+                    result = replace(
+                        result,
+                        tokens=tokens,
+                        text=self.tokenizer.decode([t for t in tokens if t < eot]).strip()
+                    )
+                trimmed.append(result)
+            return trimmed
+
+    return GuardedDecodingTask
+
+
+def install_runaway_guard(model):
+    """
+    openai-whisper modeliga guard ilgaklarini o'rnatish
+
+    DecodingTask bir marta (jarayon bo'yicha) almashtiriladi; decoder
+    forward'i esa har bir model uchun bir marta o'raladi (birinchi forward
+    logitlaridan <|nospeech|> ehtimolini olish uchun).
+
+    Args:
+        model: whisper.model.Whisper
+    """
+    with _patch_lock:
+        if not getattr(whisper.decoding.DecodingTask, '_runaway_guard', False):
+            whisper.decoding.DecodingTask = _guarded_task_class()
+
+    decoder = model.decoder
+    if getattr(decoder, '_runaway_guard', False):
+        return
+
+    original_forward = decoder.forward
+
+    def guarded_forward(x, xa, kv_cache=None):
+        logits = original_forward(x, xa, kv_cache=kv_cache)
+        active = getattr(_local, 'filter', None)
+        if active is not None and x.shape[1] > 1:
+            active.observe_prompt(x, logits)
+        return logits
+
+    decoder.forward = guarded_forward
+    decoder._runaway_guard = True
@@ -0,0 +1,294 @@
+"""
+Encoder Output Cache
+====================
+Whisper audio encoder natijalarini 30 soniyalik oynalar bo'yicha keshlash
+
+task ('transcribe' / 'translate'), til yoki decode presetini o'zgartirib bir
+xil audiodni qayta decode qilishda eng qimmat qism - audio encoder - qayta
+ishlamasligi uchun. Kalit: model + oyna log-mel spektrogrammasining xeshi
+(spektrogramma oynaning PCM'idan deterministik hisoblanadi).
+
+Keshlash model.encoder.forward'ni o'rash orqali amalga oshiriladi, shuning
+uchun model.transcribe, til aniqlash va whisper.decode (batch) yo'llari
+bir xil keshdan foydalanadi. Model registry'da ulashilgani uchun o'rash
+faqat encoder_cache_enabled() konteksti ichida (keshni yoqqan
+transcriber'ning decode chaqiruvlarida) ishlaydi; boshqa chaqiruvlar
+to'g'ridan-to'g'ri asl forward'ga o'tadi. Xotira limiti oshganda eski oynalar
+(ENCODER_CACHE_DIR berilgan bo'lsa) diskka .npy sifatida chiqariladi.
+"""
+
+import os
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+_local = threading.local()
+
+
+class EncoderCache:
+    """
+    Xotirada LRU, ixtiyoriy disk spill bilan encoder natijalari keshi
+    """
+
+    def __init__(
+        self,
+        max_memory_mb: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+        max_disk_mb: Optional[float] = None
+    ):
+        """
+        Args:
+            max_memory_mb (float, optional): Xotira limiti (MB)
+                (None = ENCODER_CACHE_MAX_MB env yoki 128)
+            spill_dir (str, optional): Disk spill papkasi
+                (None = ENCODER_CACHE_DIR env; bo'sh = spill yo'q)
+            max_disk_mb (float, optional): Disk limiti (MB)
+                (None = ENCODER_CACHE_DISK_MB env yoki 2048)
+        """
+        if max_memory_mb is None:
+            max_memory_mb = float(os.environ.get('ENCODER_CACHE_MAX_MB', 128))
+        if spill_dir is None:
+            spill_dir = os.environ.get('ENCODER_CACHE_DIR') or None
+        if max_disk_mb is None:
+            max_disk_mb = float(os.environ.get('ENCODER_CACHE_DISK_MB', 2048))
+
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.spill_dir = spill_dir
+
+        self._memory: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: 'OrderedDict[str, int]' = OrderedDict()  # kalit -> fayl hajmi
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            # Oldingi ishga tushirishlardan qolgan oynalar (eski -> yangi)
+            files = sorted(
+                (
+                    entry for entry in os.scandir(self.spill_dir)
+                    if entry.name.endswith('.npy') and '.tmp' not in entry.name
+                ),
+                key=lambda entry: entry.stat().st_mtime
+            )
+            for entry in files:
+                size = entry.stat().st_size
+                self._disk[entry.name[:-4]] = size
+                self._disk_bytes += size
+
+    @staticmethod
+    def make_key(model_key: str, mel: np.ndarray) -> str:
+        """
+        Model va oyna spektrogrammasidan kalit yasash
+
+        Args:
+            model_key (str): Model identifikatori (nom, precision, backend)
+            mel (np.ndarray): Bitta oynaning log-mel spektrogrammasi
+
+        Returns:
+            str: Kesh kaliti
+        """
+        mel = np.ascontiguousarray(mel)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(model_key.encode())
+        digest.update(str(mel.shape).encode())
+        digest.update(mel.view(np.uint8))
+        return digest.hexdigest()
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, key + '.npy')
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Oyna encoder natijasini olish (avval xotira, keyin disk)
+
+        Returns:
+            np.ndarray | None: Encoder natijasi yoki None (miss)
+        """
+        with self._lock:
+            features = self._memory.get(key)
+            if features is not None:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                return features
+
+            if key not in self._disk:
+                self.stats['misses'] += 1
+                return None
+
+            try:
+                features = np.load(self._spill_path(key))
+            except (OSError, ValueError):
+                self._disk_bytes -= self._disk.pop(key)
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['disk_hits'] += 1
+            self._store(key, features)
+            return features
+
+    def put(self, key: str, features: np.ndarray):
+        """Oyna encoder natijasini saqlash"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._store(key, features)
+
+    def _store(self, key: str, features: np.ndarray):
+        """Xotiraga qo'yish va limit oshsa eski oynalarni chiqarish (lock ostida)"""
+        self._memory[key] = features
+        self._memory_bytes += features.nbytes
+
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            old_key, old_features = self._memory.popitem(last=False)
+            self._memory_bytes -= old_features.nbytes
+            if self.spill_dir and old_key not in self._disk:
+                self._spill(old_key, old_features)
+
+    def _spill(self, key: str, features: np.ndarray):
+        """Oynani diskka yozish va disk limitini saqlash (lock ostida)"""
+        path = self._spill_path(key)
+        try:
+            tmp_path = path + '.tmp.npy'
+            np.save(tmp_path, features)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Encoder keshi diskka yozilmadi: {str(e)}")
+            return
+
+        size = os.path.getsize(path)
+        self._disk[key] = size
+        self._disk_bytes += size
+
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            old_key, old_size = self._disk.popitem(last=False)
+            self._disk_bytes -= old_size
+            try:
+                os.remove(self._spill_path(old_key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Xotira va disk keshini tozalash"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for key in self._disk:
+                try:
+                    os.remove(self._spill_path(key))
+                except OSError:
+                    pass
+            self._disk.clear()
+            self._disk_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Kesh statistikasi
+
+        Returns:
+            Dict: hit/miss, xotira va disk hajmi
+        """
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': (self.stats['hits'] + self.stats['disk_hits']) / lookups if lookups else 0.0,
+                'memory_windows': len(self._memory),
+                'memory_mb': round(self._memory_bytes / (1024 * 1024), 2),
+                'disk_windows': len(self._disk),
+                'disk_mb': round(self._disk_bytes / (1024 * 1024), 2),
+                'spill_dir': self.spill_dir,
+            }
+
+
+@contextmanager
+def encoder_cache_enabled(model):
+    """
+    Shu thread'dagi decode'larda model encoder'i uchun keshni yoqish
+
+    Args:
+        model: whisper.model.Whisper (install_encoder_cache o'rnatilgan)
+    """
+    active = getattr(_local, 'encoders', None)
+    if active is None:
+        active = _local.encoders = set()
+
+    key = id(model.encoder)
+    added = key not in active
+    active.add(key)
+    try:
+        yield
+    finally:
+        if added:
+            active.discard(key)
+
+
+def install_encoder_cache(model, cache: EncoderCache, model_key: str):
+    """
+    openai-whisper modelining encoder'ini kesh bilan o'rash
+
+    Batch ichidagi har bir oyna alohida qidiriladi; topilmaganlari bitta
+    batch qilib encoder'dan o'tkaziladi. Model registry orqali ulashilgani
+    uchun o'rash bir marta o'rnatiladi va faqat encoder_cache_enabled()
+    ichida keshga murojaat qiladi.
+
+    Args:
+        model: whisper.model.Whisper
+        cache (EncoderCache): Kesh
+        model_key (str): Model identifikatori
+    """
+    import torch
+
+    encoder = model.encoder
+    if getattr(encoder, '_encoder_cache', None) is not None:
+        return
+
+    original_forward = encoder.forward
+
+    def cached_forward(mel):
+        if id(encoder) not in getattr(_local, 'encoders', ()):
+            return original_forward(mel)
+
+        # Bitta oyna (n_mels, n_frames) yoki batch (batch, n_mels, n_frames)
+        single = mel.ndim == 2
+        batch = mel.unsqueeze(0) if single else mel
+
+        mel_np = batch.detach().cpu().numpy()
+        keys = [cache.make_key(model_key, item) for item in mel_np]
+        outputs = [cache.get(key) for key in keys]
+
+        missing = [i for i, out in enumerate(outputs) if out is None]
+        if missing:
+            with torch.no_grad():
+                encoded = original_forward(batch[missing])
+            for i, features in zip(missing, encoded.detach().cpu().numpy()):
+                features = features.copy()  # batch massivini ushlab qolmaslik uchun
+                cache.put(keys[i], features)
+                outputs[i] = features
+
+        result = torch.from_numpy(np.stack(outputs)).to(mel.device)
+        return result[0] if single else result
+
+    encoder.forward = cached_forward
+    encoder._encoder_cache = cache
+
+
+_cache: Optional[EncoderCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_encoder_cache() -> EncoderCache:
+    """Jarayon bo'yicha yagona EncoderCache'ni olish"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EncoderCache()
+        return _cache
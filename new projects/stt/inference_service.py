@@ -0,0 +1,400 @@
+"""
+Micro-batching Inference Service
+================================
+Parallel so'rovlar (task'lar, batch worker'lar) oynalarini bitta navbatga
+yig'ib, umumiy model bilan batch qilib decode qilish
+
+Har bir chaqiruvchi o'z audiosini <= 30 soniyalik oynalarga bo'lib
+navbatga qo'yadi va Future oladi. Yagona worker thread navbatdan oynalarni
+max_batch_size yoki max_wait_ms chegarasigacha yig'adi, bir xil til/task
+bo'yicha guruhlab bitta whisper.decode batch'ida ishga tushiradi va har bir
+natijani o'z Future'iga qaytaradi.
+
+Model faqat worker thread'da ishlatiladi, shuning uchun bitta transcriber'ni
+thread'lar orasida ulashish muammosi yo'q va throughput parallel
+so'rovlar soni bilan o'sadi (oynalar bir batch'ga tushadi).
+"""
+
+import os
+import time
+import queue
+import threading
+import numpy as np
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .whisper_model import WhisperTranscriber, TranscriptionSegment
+from .transcription_cache import audio_fingerprint
+
+
+@dataclass(eq=False)
+class _WindowRequest:
+    """Navbatdagi bitta oyna (identity bo'yicha taqqoslanadi - audio massiv emas)"""
+    audio: np.ndarray
+    language: Optional[str]
+    task: str
+    future: Future = field(default_factory=Future)
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class InferenceService:
+    """
+    Jarayon ichidagi micro-batching inference xizmati
+
+    Foydalanish:
+        service = get_inference_service('medium')
+        segments = service.transcribe(audio_data, 16000, language='uz')
+    """
+
+    def __init__(
+        self,
+        model_name: str = 'medium',
+        device: str = 'cpu',
+        precision: str = 'fp32',
+        backend: str = 'whisper',
+        language: str = 'uz',
+        preset: Optional[str] = None,
+        use_cache: bool = True,
+        runaway_guard: bool = False,
+        variable_length_max: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        """
+        Args:
+            model_name (str): Whisper model nomi
+            device (str): 'cpu' yoki 'cuda'
+            precision (str): Model aniqligi
+            backend (str): Inference backend
+            language (str): Standart til kodi
+            preset (str, optional): Decode preseti (WhisperTranscriber kabi)
+            use_cache (bool): Transkripsiya keshidan foydalanish
+            runaway_guard (bool): Batch decode'da runaway guard (WhisperTranscriber kabi)
+            variable_length_max (float, optional): Shundan qisqa oynalar
+                batch'dan tashqarida, qisqartirilgan encoder kirishi bilan
+                (shu worker thread'da) decode qilinadi
+            max_batch_size (int, optional): Bitta batch'dagi maksimal oynalar
+                (None = INFERENCE_MAX_BATCH env yoki 8)
+            max_wait_ms (float, optional): Batch to'lishini kutish vaqti (ms)
+                (None = INFERENCE_MAX_WAIT_MS env yoki 20)
+        """
+        if max_batch_size is None:
+            max_batch_size = int(os.environ.get('INFERENCE_MAX_BATCH', 8))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 20))
+
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.language = language
+
+        self.transcriber = WhisperTranscriber(
+            model_name=model_name,
+            device=device,
+            language=language,
+            precision=precision,
+            backend=backend,
+            preset=preset,
+            use_cache=use_cache,
+            variable_length_max=variable_length_max,
+            runaway_guard=runaway_guard
+        )
+
+        self._queue: 'queue.Queue[Optional[_WindowRequest]]' = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'windows': 0,
+            'batches': 0,
+            'max_batch': 0,
+            'total_wait': 0.0,
+            'total_decode': 0.0,
+        }
+
+        self._thread = threading.Thread(
+            target=self._worker,
+            name=f"inference-{model_name}-{precision}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        task: str = 'transcribe'
+    ) -> Future:
+        """
+        Bitta oynani navbatga qo'yish
+
+        Args:
+            audio (np.ndarray): <= 30 soniyalik 16 kHz mono audio
+            language (str, optional): Til kodi (None = xizmat tili)
+            task (str): 'transcribe' yoki 'translate'
+
+        Returns:
+            Future: List[TranscriptionSegment] (vaqtlar oyna boshiga nisbatan)
+        """
+        if not self._thread.is_alive():
+            raise RuntimeError("Inference xizmati to'xtatilgan")
+
+        request = _WindowRequest(
+            audio=np.asarray(audio, dtype=np.float32),
+            language=language or self.language,
+            task=task
+        )
+        self._queue.put(request)
+        return request.future
+
+    def transcribe(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        speech_segments: Optional[List[Tuple[float, float]]] = None,
+        window_duration: float = 30.0,
+        task: str = 'transcribe'
+    ) -> List[TranscriptionSegment]:
+        """
+        Audiodni oynalarga bo'lib xizmat orqali transkripsiya qilish
+
+        Args:
+            audio_data (np.ndarray): Audio ma'lumotlar
+            sample_rate (int): Sample rate. Default: 16000
+            language (str, optional): Til kodi
+            speech_segments (List[Tuple[float, float]], optional): Nutq
+                intervallari (soniya). None = sukutga moslangan oynalar
+            window_duration (float): Oyna davomiyligi (soniya). Default: 30.0
+            task (str): 'transcribe' yoki 'translate'
+
+        Returns:
+            List[TranscriptionSegment]: Segmentlar ro'yxati
+        """
+        audio_data = np.asarray(audio_data)
+        if sample_rate != 16000:
+            import librosa
+            audio_data = librosa.resample(audio_data, orig_sr=sample_rate, target_sr=16000)
+            sample_rate = 16000
+        audio_data = audio_data.astype(np.float32)
+
+        # Kesh kaliti: oynalash usuli ham natijaga ta'sir qiladi
+        cache = self.transcriber.cache
+        cache_key = None
+        if cache is not None:
+            params = self.transcriber._cache_params(language or self.language, task)
+            params['mode'] = 'batched'
+            params['window_duration'] = window_duration
+            params['speech_segments'] = [list(map(float, seg)) for seg in speech_segments or []] or None
+            cache_key = cache.make_key(audio_fingerprint(audio_data), params)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ Transkripsiya keshdan olindi ({len(cached.get('segments', []))} segment)")
+                return WhisperTranscriber._result_to_segments(cached)
+
+        if speech_segments is not None:
+            windows = WhisperTranscriber._group_speech_windows(speech_segments, window_duration)
+            sample_windows = [
+                (int(start * sample_rate), int(end * sample_rate)) for start, end in windows
+            ]
+        else:
+            boundaries = WhisperTranscriber._find_silence_boundaries(
+                audio_data, sample_rate, window_duration
+            )
+            sample_windows = list(zip(boundaries[:-1], boundaries[1:]))
+
+        futures = [
+            (start / sample_rate, self.submit(audio_data[start:end], language=language, task=task))
+            for start, end in sample_windows
+        ]
+
+        all_segments = []
+        for offset, future in futures:
+            for seg in future.result():
+                seg.start += offset
+                seg.end += offset
+                all_segments.append(seg)
+
+        if cache_key is not None:
+            cache.put(cache_key, {
+                'text': ' '.join(seg.text for seg in all_segments),
+                'language': language or self.language,
+                'segments': [
+                    {'text': seg.text, 'start': seg.start, 'end': seg.end, 'confidence': seg.confidence}
+                    for seg in all_segments
+                ]
+            })
+
+        return all_segments
+
+    def _collect_batch(self) -> Tuple[List[_WindowRequest], bool]:
+        """
+        Navbatdan batch yig'ish: birinchi oynani kutadi, keyin max_wait
+        ichida max_batch_size gacha qo'shimcha oynalar oladi
+
+        Returns:
+            Tuple[List[_WindowRequest], bool]: Oynalar va to'xtash belgisi
+        """
+        first = self._queue.get()
+        if first is None:
+            return [], True
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+
+        return batch, False
+
+    def _worker(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect_batch()
+            if not batch:
+                continue
+
+            # Bitta decode'da til va task bir xil bo'lishi kerak
+            groups: Dict[Tuple[Optional[str], str], List[_WindowRequest]] = {}
+            for request in batch:
+                groups.setdefault((request.language, request.task), []).append(request)
+
+            for (language, task), requests in groups.items():
+                try:
+                    self._decode_group(requests, language, task)
+                except Exception as e:
+                    # Bitta buzilgan batch worker'ni to'xtatmasligi kerak
+                    for request in requests:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+
+        self.transcriber.release_model()
+
+    def _decode_group(self, requests: List[_WindowRequest], language: Optional[str], task: str):
+        """Bir xil til va task'li oynalarni decode qilib, natijalarni future'larga yozish"""
+        started = time.perf_counter()
+
+        # Qisqa oynalar: 30 soniyaga to'ldirilmagan mel bilan alohida
+        short, batched = [], []
+        for request in requests:
+            if self.transcriber._use_variable_length(request.audio, language):
+                short.append(request)
+            else:
+                batched.append(request)
+
+        for request in short:
+            try:
+                self.transcriber.load_model()
+                with self.transcriber._decoding():
+                    result = self.transcriber._transcribe_variable_length(request.audio, language, task)
+                request.future.set_result(WhisperTranscriber._result_to_segments(result))
+            except Exception as e:
+                request.future.set_exception(e)
+
+        results = self.transcriber.decode_window_batch(
+            [request.audio for request in batched],
+            language=language,
+            task=task
+        ) if batched else []
+
+        finished = time.perf_counter()
+        for request, segments in zip(batched, results):
+            request.future.set_result(segments)
+
+        with self._stats_lock:
+            self.stats['windows'] += len(requests)
+            self.stats['batches'] += 1
+            self.stats['max_batch'] = max(self.stats['max_batch'], len(requests))
+            self.stats['total_wait'] += sum(started - request.enqueued for request in requests)
+            self.stats['total_decode'] += finished - started
+
+    def shutdown(self, wait: bool = True):
+        """Navbatdagi oynalar tugagach worker'ni to'xtatish va modelni bo'shatish"""
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def get_stats(self) -> Dict:
+        """
+        Xizmat statistikasi
+
+        Returns:
+            Dict: Oynalar, batch'lar, o'rtacha batch hajmi va kutish vaqti
+        """
+        with self._stats_lock:
+            windows = self.stats['windows']
+            batches = self.stats['batches']
+            return {
+                'model_name': self.transcriber.model_name,
+                'precision': self.transcriber.precision,
+                'backend': self.transcriber.backend_name,
+                'preset': self.transcriber.preset,
+                'runaway_guard': self.transcriber.get_guard_stats(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queued': self._queue.qsize(),
+                'windows': windows,
+                'batches': batches,
+                'max_batch': self.stats['max_batch'],
+                'avg_batch': windows / batches if batches else 0.0,
+                'avg_wait_ms': 1000.0 * self.stats['total_wait'] / windows if windows else 0.0,
+                'avg_decode_ms': 1000.0 * self.stats['total_decode'] / batches if batches else 0.0,
+            }
+
+
+_services: Dict[Tuple, InferenceService] = {}
+_services_lock = threading.Lock()
+
+
+def get_inference_service(
+    model_name: str = 'medium',
+    device: str = 'cpu',
+    precision: str = 'fp32',
+    backend: str = 'whisper',
+    preset: Optional[str] = None,
+    runaway_guard: bool = False,
+    variable_length_max: Optional[float] = None
+) -> InferenceService:
+    """
+    Model konfiguratsiyasi bo'yicha jarayondagi yagona InferenceService'ni olish
+
+    Bir xil model va decode sozlamalariga murojaat qiladigan barcha
+    chaqiruvchilar bitta navbatni ulashadi - oynalari birgalikda batch qilinadi.
+    Speculative decoding bu yo'lda yo'q (chaqiruvchilar uni rad etadi).
+    """
+    key = (model_name, device, precision, backend, preset, runaway_guard, variable_length_max)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = InferenceService(
+                model_name=model_name,
+                device=device,
+                precision=precision,
+                backend=backend,
+                preset=preset,
+                runaway_guard=runaway_guard,
+                variable_length_max=variable_length_max
+            )
+            _services[key] = service
+        return service
+
+
+def shutdown_inference_services(wait: bool = True):
+    """Barcha xizmatlarni to'xtatish (navbatdagi oynalar tugagach modellar bo'shatiladi)"""
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for service in services:
+        service.shutdown(wait=wait)
+
+
+def get_inference_services_stats() -> List[Dict]:
+    """Barcha ishlayotgan xizmatlar statistikasi"""
+    with _services_lock:
+        services = list(_services.values())
+    return [service.get_stats() for service in services]
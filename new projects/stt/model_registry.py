@@ -0,0 +1,352 @@
+"""
+Whisper Model Registry
+======================
+Jarayon (process) bo'yicha umumiy Whisper modellar reyestri
+
+Har bir so'rov uchun modelni diskdan qayta yuklamaslik uchun yuklangan
+modellar (model_name, device, precision, backend) kaliti bo'yicha saqlanadi.
+RAM byudjeti oshsa, ishlatilmayotgan (idle) modellar LRU tartibida
+chiqarib yuboriladi. Oldindan yuklangan (pin qilingan) modellar
+chiqarilmaydi.
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Taxminiy fp32 model hajmi (MB) - yuklashdan oldin joy ajratish uchun
+ESTIMATED_MODEL_SIZE_MB = {
+    'tiny': 150,
+    'base': 290,
+    'small': 970,
+    'medium': 3060,
+    'large': 6170,
+}
+
+ModelKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class _RegistryEntry:
+    """Reyestrdagi bitta model"""
+    model: Any
+    size_mb: float
+    load_time: float
+    ref_count: int = 0
+    last_used: float = field(default_factory=time.time)
+    hits: int = 0
+    pinned: bool = False
+
+
+class ModelRegistry:
+    """
+    Yuklangan modellarni jarayon ichida ulashish
+
+    Foydalanish:
+        model = registry.acquire('medium', 'cpu', 'fp32')
+        try:
+            ...
+        finally:
+            registry.release('medium', 'cpu', 'fp32')
+    """
+
+    def __init__(
+        self,
+        ram_budget_mb: Optional[float] = None,
+        loader: Optional[Callable[[str, str, str, str], Any]] = None
+    ):
+        """
+        Args:
+            ram_budget_mb (float, optional): Modellar uchun RAM byudjeti (MB).
+                None = WHISPER_RAM_BUDGET_MB env yoki 8192
+            loader (Callable, optional): (model_name, device, precision, backend) -> model.
+                Default: backend'ning load_model() metodi
+        """
+        if ram_budget_mb is None:
+            ram_budget_mb = float(os.environ.get('WHISPER_RAM_BUDGET_MB', 8192))
+
+        self.ram_budget_mb = ram_budget_mb
+        self._loader = loader or self._default_loader
+        self._entries: 'OrderedDict[ModelKey, _RegistryEntry]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'loads': 0,
+            'evictions': 0,
+            'total_load_time': 0.0,
+        }
+
+    @staticmethod
+    def _default_loader(model_name: str, device: str, precision: str, backend: str):
+        from .backends import get_backend
+
+        return get_backend(backend).load_model(model_name, device, precision)
+
+    @staticmethod
+    def _model_size_mb(model, model_name: str) -> float:
+        """Yuklangan model hajmini state_dict tensorlari bo'yicha hisoblash"""
+        try:
+            import torch
+
+            total = 0
+            for value in model.state_dict().values():
+                # Dinamik kvantizatsiya qilingan Linear'lar (weight, bias) juftligi
+                tensors = value if isinstance(value, tuple) else (value,)
+                for tensor in tensors:
+                    if isinstance(tensor, torch.Tensor):
+                        total += tensor.numel() * tensor.element_size()
+            return total / (1024 * 1024)
+        except Exception:
+            return float(ESTIMATED_MODEL_SIZE_MB.get(model_name, 0))
+
+    @property
+    def used_mb(self) -> float:
+        with self._lock:
+            return sum(entry.size_mb for entry in self._entries.values())
+
+    def acquire(
+        self,
+        model_name: str,
+        device: str = 'cpu',
+        precision: str = 'fp32',
+        backend: str = 'whisper'
+    ):
+        """
+        Modelni olish (kerak bo'lsa yuklash) va foydalanuvchilar sonini oshirish
+
+        Args:
+            model_name (str): Whisper model nomi
+            device (str): 'cpu' yoki 'cuda'
+            precision (str): Aniqlik rejimi (masalan 'fp32')
+            backend (str): Inference backend nomi. Default: 'whisper'
+
+        Returns:
+            Yuklangan model
+        """
+        key = (model_name, device, precision, backend)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._touch(key, entry)
+                return entry.model
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Bir xil modelni parallel ikki marta yuklamaslik uchun kalit bo'yicha lock
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._touch(key, entry)
+                    return entry.model
+
+                self.stats['misses'] += 1
+                self._evict_for(ESTIMATED_MODEL_SIZE_MB.get(model_name, 0))
+
+            print(f"📥 [Registry] '{model_name}' ({backend}, {device}, {precision}) yuklanmoqda...")
+            start = time.perf_counter()
+            model = self._loader(model_name, device, precision, backend)
+            load_time = time.perf_counter() - start
+
+            entry = _RegistryEntry(
+                model=model,
+                size_mb=self._model_size_mb(model, model_name),
+                load_time=load_time,
+                ref_count=1
+            )
+
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self.stats['loads'] += 1
+                self.stats['total_load_time'] += load_time
+                self._evict_for(0)
+
+            print(f"✅ [Registry] Model yuklandi: {load_time:.2f}s, {entry.size_mb:.0f} MB")
+            return model
+
+    def _touch(self, key: ModelKey, entry: _RegistryEntry):
+        entry.ref_count += 1
+        entry.hits += 1
+        entry.last_used = time.time()
+        self.stats['hits'] += 1
+        self._entries.move_to_end(key)
+
+    def release(
+        self,
+        model_name: str,
+        device: str = 'cpu',
+        precision: str = 'fp32',
+        backend: str = 'whisper'
+    ):
+        """
+        Model foydalanuvchilari sonini kamaytirish (model keshda qoladi)
+        """
+        key = (model_name, device, precision, backend)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.ref_count > 0:
+                entry.ref_count -= 1
+                entry.last_used = time.time()
+
+    def _evict_for(self, needed_mb: float):
+        """
+        Byudjetga sig'ish uchun idle modellarni LRU tartibida chiqarish
+        (self._lock ostida chaqiriladi)
+        """
+        used = sum(entry.size_mb for entry in self._entries.values())
+        if used + needed_mb <= self.ram_budget_mb:
+            return
+
+        evicted = False
+        for key in list(self._entries.keys()):
+            if used + needed_mb <= self.ram_budget_mb:
+                break
+            entry = self._entries[key]
+            if entry.ref_count > 0 or entry.pinned:
+                continue
+
+            del self._entries[key]
+            used -= entry.size_mb
+            self.stats['evictions'] += 1
+            evicted = True
+            print(f"♻️ [Registry] Model chiqarildi: {key[0]} ({key[3]}, {key[1]}, {key[2]})")
+
+        if evicted:
+            gc.collect()
+
+        if used + needed_mb > self.ram_budget_mb:
+            print(
+                f"⚠️ [Registry] RAM byudjeti oshdi: {used + needed_mb:.0f} MB > "
+                f"{self.ram_budget_mb:.0f} MB (barcha modellar band yoki pin qilingan)"
+            )
+
+    def evict(
+        self,
+        model_name: str,
+        device: str = 'cpu',
+        precision: str = 'fp32',
+        backend: str = 'whisper'
+    ) -> bool:
+        """
+        Idle modelni majburan chiqarish (pin qilingan modellar bundan mustasno)
+
+        Returns:
+            bool: Model chiqarilgan bo'lsa True
+        """
+        key = (model_name, device, precision, backend)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.ref_count > 0 or entry.pinned:
+                return False
+            del self._entries[key]
+            self.stats['evictions'] += 1
+        gc.collect()
+        return True
+
+    def pin(
+        self,
+        model_name: str,
+        device: str = 'cpu',
+        precision: str = 'fp32',
+        backend: str = 'whisper',
+        pinned: bool = True
+    ) -> bool:
+        """
+        Modelni LRU chiqarishdan himoyalash (oldindan yuklangan modellar uchun)
+
+        Pin qilingan model idle bo'lsa ham byudjet uchun chiqarilmaydi -
+        /ready preload qilingan modellar doim yuklangan bo'lishiga tayanadi.
+
+        Args:
+            pinned (bool): False = himoyani olib tashlash. Default: True
+
+        Returns:
+            bool: Model reyestrda bo'lsa True
+        """
+        key = (model_name, device, precision, backend)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.pinned = pinned
+            if not pinned:
+                self._evict_for(0)
+            return True
+
+    def is_loaded(
+        self,
+        model_name: str,
+        device: str = 'cpu',
+        precision: str = 'fp32',
+        backend: str = 'whisper'
+    ) -> bool:
+        with self._lock:
+            return (model_name, device, precision, backend) in self._entries
+
+    def get_stats(self) -> Dict:
+        """
+        Reyestr statistikasi (yuklash vaqtlari, hit/miss, xotira)
+
+        Returns:
+            Dict: Statistika
+        """
+        with self._lock:
+            return {
+                **self.stats,
+                'ram_budget_mb': self.ram_budget_mb,
+                'used_mb': sum(entry.size_mb for entry in self._entries.values()),
+                'models': [
+                    {
+                        'model_name': key[0],
+                        'device': key[1],
+                        'precision': key[2],
+                        'backend': key[3],
+                        'size_mb': round(entry.size_mb, 1),
+                        'load_time': round(entry.load_time, 3),
+                        'ref_count': entry.ref_count,
+                        'hits': entry.hits,
+                        'last_used': entry.last_used,
+                        'pinned': entry.pinned,
+                    }
+                    for key, entry in self._entries.items()
+                ],
+            }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Jarayon bo'yicha yagona ModelRegistry'ni olish"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def configure_model_registry(ram_budget_mb: float) -> ModelRegistry:
+    """
+    Reyestr RAM byudjetini sozlash
+
+    Args:
+        ram_budget_mb (float): Yangi byudjet (MB)
+
+    Returns:
+        ModelRegistry: Yagona reyestr
+    """
+    registry = get_model_registry()
+    with registry._lock:
+        registry.ram_budget_mb = ram_budget_mb
+        registry._evict_for(0)
+    return registry
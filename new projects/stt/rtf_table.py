@@ -0,0 +1,187 @@
+"""
+Real-time Factor Table
+======================
+Model konfiguratsiyalari bo'yicha o'lchangan real-time factor (RTF =
+inference vaqti / audio davomiyligi) jadvali
+
+Deadline'li transkripsiya (transcribe_with_deadline) berilgan vaqtga
+sig'adigan eng katta modelni shu jadval bo'yicha tanlaydi. Boshlang'ich
+qiymatlar CPU uchun taxminiy; har bir haqiqiy transkripsiya o'lchovi
+eksponensial o'rtacha bilan jadvalni yangilaydi va (RTF_TABLE_PATH
+berilgan bo'lsa) JSON faylga saqlanadi.
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List, Optional
+
+
+# CPU fp32 uchun taxminiy RTF (o'lchov bo'lmaganda)
+DEFAULT_RTF = {
+    'tiny': 0.05,
+    'base': 0.1,
+    'small': 0.3,
+    'medium': 0.8,
+    'large': 1.8,
+}
+PRECISION_FACTOR = {'fp32': 1.0, 'int8': 0.6}
+DEVICE_FACTOR = {'cpu': 1.0, 'cuda': 0.1}
+
+# 30 soniyagacha to'ldirish sababli juda qisqa audio RTF'i haqiqiydan katta
+MIN_AUDIO_SECONDS = 5.0
+
+
+class RTFTable:
+    """
+    Model bo'yicha RTF o'lchovlari (thread-safe)
+    """
+
+    def __init__(self, path: Optional[str] = None, smoothing: float = 0.3):
+        """
+        Args:
+            path (str, optional): JSON fayl yo'li (None = RTF_TABLE_PATH env;
+                bo'sh = faqat xotirada)
+            smoothing (float): Yangi o'lchov og'irligi (eksponensial o'rtacha)
+        """
+        if path is None:
+            path = os.environ.get('RTF_TABLE_PATH') or None
+
+        self.path = path
+        self.smoothing = smoothing
+        self._measured: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._measured = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ RTF jadvali o'qilmadi: {str(e)}")
+
+    @staticmethod
+    def _key(model_name: str, precision: str, backend: str, device: str) -> str:
+        return f"{model_name}:{precision}:{backend}:{device}"
+
+    def estimate_rtf(
+        self,
+        model_name: str,
+        precision: str = 'fp32',
+        backend: str = 'whisper',
+        device: str = 'cpu'
+    ) -> float:
+        """
+        Konfiguratsiya RTF'i (o'lchov bo'lmasa taxminiy qiymat)
+
+        Returns:
+            float: RTF
+        """
+        with self._lock:
+            entry = self._measured.get(self._key(model_name, precision, backend, device))
+        if entry is not None:
+            return entry['rtf']
+
+        return (
+            DEFAULT_RTF.get(model_name, 1.0)
+            * PRECISION_FACTOR.get(precision, 1.0)
+            * DEVICE_FACTOR.get(device, 1.0)
+        )
+
+    def record(
+        self,
+        model_name: str,
+        precision: str,
+        backend: str,
+        device: str,
+        audio_seconds: float,
+        elapsed: float
+    ):
+        """
+        Bitta transkripsiya o'lchovini qo'shish
+
+        Args:
+            audio_seconds (float): Audio davomiyligi (soniya)
+            elapsed (float): Inference vaqti (soniya)
+        """
+        if audio_seconds < MIN_AUDIO_SECONDS or elapsed <= 0:
+            return
+
+        rtf = elapsed / audio_seconds
+        key = self._key(model_name, precision, backend, device)
+
+        with self._lock:
+            entry = self._measured.get(key)
+            if entry is None:
+                entry = {'rtf': rtf, 'samples': 0}
+            else:
+                entry['rtf'] += self.smoothing * (rtf - entry['rtf'])
+            entry['samples'] += 1
+            self._measured[key] = entry
+            snapshot = dict(self._measured) if self.path else None
+
+        if snapshot is not None:
+            self._save(snapshot)
+
+    def _save(self, snapshot: Dict):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ RTF jadvali saqlanmadi: {str(e)}")
+
+    def choose_model(
+        self,
+        audio_seconds: float,
+        budget_seconds: float,
+        candidates: List[str],
+        precision: str = 'fp32',
+        backend: str = 'whisper',
+        device: str = 'cpu',
+        safety: float = 0.8
+    ) -> str:
+        """
+        Vaqt byudjetiga sig'adigan eng katta modelni tanlash
+
+        Args:
+            audio_seconds (float): Transkripsiya qilinadigan audio (soniya)
+            budget_seconds (float): Mavjud vaqt (soniya)
+            candidates (List[str]): Modellar (kichikdan kattaga)
+            safety (float): Byudjetning ishlatiladigan ulushi (o'lchov xatosi uchun zaxira)
+
+        Returns:
+            str: Tanlangan model (hech biri sig'masa eng kichigi)
+        """
+        for model_name in reversed(candidates):
+            estimate = self.estimate_rtf(model_name, precision, backend, device) * audio_seconds
+            if estimate <= budget_seconds * safety:
+                return model_name
+        return candidates[0]
+
+    def get_stats(self) -> Dict:
+        """
+        O'lchangan RTF'lar
+
+        Returns:
+            Dict: Konfiguratsiya kaliti -> {'rtf', 'samples'}
+        """
+        with self._lock:
+            return {
+                key: {'rtf': round(entry['rtf'], 4), 'samples': entry['samples']}
+                for key, entry in self._measured.items()
+            }
+
+
+_table: Optional[RTFTable] = None
+_table_lock = threading.Lock()
+
+
+def get_rtf_table() -> RTFTable:
+    """Jarayon bo'yicha yagona RTFTable'ni olish"""
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = RTFTable()
+        return _table
@@ -0,0 +1,290 @@
+"""
+Speculative Decoding
+====================
+Kichik (draft) Whisper modeli bilan bir nechta tokenni taklif qilib, katta
+(target) model bilan ularni bitta forward'da tekshirish
+
+Algoritm (greedy, temperature=0):
+    1. Draft model joriy prefiksdan keyin k ta tokenni greedy taklif qiladi
+    2. Target model prefiks + takliflarni bitta forward'da o'tkazadi va har
+       bir pozitsiya uchun o'z (filtrlangan) argmax tokenini hisoblaydi
+    3. Target argmax bilan mos kelgan takliflar qabul qilinadi; birinchi
+       nomuvofiqlikda target tokeni olinadi va qolgan takliflar tashlanadi
+
+Har bir qabul qilingan token target modelning aynan shu prefiks uchun
+argmax'i bo'lgani uchun natija target model bilan oddiy greedy decode
+natijasiga aynan teng (draft faqat tezlikka ta'sir qiladi).
+
+Decoder self-attention kv-keshi shu yerda boshqariladi: openai-whisper'ning
+kv_cache hook'lari bir vaqtda bir nechta yangi token uchun to'g'ri causal
+mask bermaydi va rad etilgan tokenlarni orqaga qaytarishni bilmaydi.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import torch
+    import whisper
+except ImportError:
+    torch = None
+    whisper = None
+
+
+@dataclass
+class SpeculativeResult:
+    """
+    Bitta oyna decode natijasi (whisper.DecodingResult bilan mos maydonlar)
+
+    Attributes:
+        tokens (List[int]): Namuna tokenlari (boshlang'ich va EOT'siz)
+        avg_logprob (float): Target model bo'yicha o'rtacha log-ehtimollik
+        stats (Dict): proposed / accepted / target_forwards / draft_forwards
+    """
+    tokens: List[int]
+    avg_logprob: float
+    stats: Dict = field(default_factory=dict)
+
+
+class _IncrementalDecoder:
+    """
+    Whisper TextDecoder ustidan orqaga qaytariladigan kv-keshli forward
+    """
+
+    def __init__(self, model, audio_features):
+        self.decoder = model.decoder
+        self.blocks = list(self.decoder.blocks)
+
+        # Cross-attention key/value oyna uchun bir marta hisoblanadi
+        self.cross = [
+            (block.cross_attn.key(audio_features), block.cross_attn.value(audio_features))
+            for block in self.blocks
+        ]
+        self.keys: List[Optional[torch.Tensor]] = [None] * len(self.blocks)
+        self.values: List[Optional[torch.Tensor]] = [None] * len(self.blocks)
+        self.length = 0
+
+    @staticmethod
+    def _attend(attn, q, k, v, mask=None):
+        n_batch, n_ctx, n_state = q.shape
+        head_dim = n_state // attn.n_head
+        scale = head_dim ** -0.25
+
+        q = q.view(n_batch, n_ctx, attn.n_head, head_dim).permute(0, 2, 1, 3)
+        k = k.view(n_batch, k.shape[1], attn.n_head, head_dim).permute(0, 2, 1, 3)
+        v = v.view(n_batch, v.shape[1], attn.n_head, head_dim).permute(0, 2, 1, 3)
+
+        qk = (q * scale) @ (k * scale).transpose(-1, -2)
+        if mask is not None:
+            qk = qk + mask
+        weights = qk.float().softmax(dim=-1).to(q.dtype)
+
+        out = (weights @ v).permute(0, 2, 1, 3).flatten(start_dim=2)
+        return attn.out(out)
+
+    def forward(self, new_tokens: List[int]) -> 'torch.Tensor':
+        """
+        Keshdagi prefiksdan keyingi tokenlarni o'tkazish
+
+        Args:
+            new_tokens (List[int]): Yangi tokenlar
+
+        Returns:
+            torch.Tensor: (len(new_tokens), n_vocab) logitlar
+        """
+        n_new = len(new_tokens)
+        offset = self.length
+        device = self.decoder.token_embedding.weight.device
+
+        tokens = torch.tensor([new_tokens], dtype=torch.long, device=device)
+        x = (
+            self.decoder.token_embedding(tokens)
+            + self.decoder.positional_embedding[offset:offset + n_new]
+        )
+        x = x.to(self.cross[0][0].dtype)
+
+        # i-chi yangi token offset + i gacha bo'lgan pozitsiyalarni ko'radi
+        mask = torch.full((n_new, offset + n_new), float('-inf'), device=device).triu_(offset + 1)
+
+        for i, block in enumerate(self.blocks):
+            h = block.attn_ln(x)
+            k_new, v_new = block.attn.key(h), block.attn.value(h)
+            if self.keys[i] is not None:
+                k_new = torch.cat([self.keys[i], k_new], dim=1)
+                v_new = torch.cat([self.values[i], v_new], dim=1)
+            self.keys[i], self.values[i] = k_new, v_new
+
+            x = x + self._attend(block.attn, block.attn.query(h), k_new, v_new, mask)
+
+            h = block.cross_attn_ln(x)
+            cross_k, cross_v = self.cross[i]
+            x = x + self._attend(block.cross_attn, block.cross_attn.query(h), cross_k, cross_v)
+
+            x = x + block.mlp(block.mlp_ln(x))
+
+        self.length += n_new
+
+        x = self.decoder.ln(x)
+        logits = x @ self.decoder.token_embedding.weight.to(x.dtype).T
+        return logits[0].float()
+
+    def truncate(self, length: int):
+        """Keshni length ta pozitsiyagacha qisqartirish (rad etilgan tokenlar)"""
+        if length >= self.length:
+            return
+        for i in range(len(self.blocks)):
+            if self.keys[i] is not None:
+                self.keys[i] = self.keys[i][:, :length]
+                self.values[i] = self.values[i][:, :length]
+        self.length = length
+
+
+class SpeculativeDecoder:
+    """
+    Draft + target Whisper modellari bilan greedy speculative decoding
+
+    Foydalanish:
+        decoder = SpeculativeDecoder(medium_model, tiny_model, language='uz')
+        result = decoder.decode(audio_window)  # <= 30 soniya, 16 kHz
+    """
+
+    def __init__(
+        self,
+        target_model,
+        draft_model=None,
+        language: Optional[str] = 'uz',
+        task: str = 'transcribe',
+        draft_tokens: int = 4
+    ):
+        """
+        Args:
+            target_model: Natijani belgilovchi whisper modeli (medium/large)
+            draft_model: Taklif qiluvchi kichik model (None = oddiy greedy)
+            language (str, optional): Til kodi
+            task (str): 'transcribe' yoki 'translate'
+            draft_tokens (int): Har qadamda taklif qilinadigan tokenlar (k)
+        """
+        if whisper is None:
+            raise ImportError("Speculative decoding uchun openai-whisper kerak")
+
+        if draft_model is not None and draft_model.dims.n_vocab != target_model.dims.n_vocab:
+            raise ValueError("Draft va target modellar lug'ati (vocab) bir xil bo'lishi kerak")
+
+        self.target_model = target_model
+        self.draft_model = draft_model
+        self.draft_tokens = max(1, draft_tokens)
+
+        options = whisper.DecodingOptions(
+            task=task,
+            language=language,
+            temperature=0.0,
+            without_timestamps=False,
+            fp16=False
+        )
+        # Boshlang'ich tokenlar, logit filtrlari va sample_len whisper'ning
+        # o'z greedy decode'i bilan bir xil bo'lishi uchun DecodingTask'dan olinadi
+        decoding_task = whisper.decoding.DecodingTask(target_model, options)
+        self.tokenizer = decoding_task.tokenizer
+        self.initial_tokens = list(decoding_task.initial_tokens)
+        self.sample_begin = decoding_task.sample_begin
+        self.sample_len = decoding_task.sample_len
+        self.logit_filters = decoding_task.logit_filters
+        self.n_text_ctx = target_model.dims.n_text_ctx
+
+    def _embed(self, model, audio: np.ndarray):
+        chunk = whisper.pad_or_trim(torch.from_numpy(np.asarray(audio, dtype=np.float32)))
+        mel = whisper.log_mel_spectrogram(chunk, n_mels=model.dims.n_mels)
+        return model.embed_audio(mel.unsqueeze(0).to(model.device))
+
+    def _filtered_logprobs(self, logits_row: 'torch.Tensor', prefix: List[int]) -> 'torch.Tensor':
+        """Whisper logit filtrlarini qo'llab log-ehtimolliklarni olish"""
+        logits = logits_row.unsqueeze(0).clone()
+        tokens = torch.tensor([prefix], dtype=torch.long, device=logits.device)
+        for logit_filter in self.logit_filters:
+            logit_filter.apply(logits, tokens)
+        return torch.log_softmax(logits[0], dim=-1)
+
+    def decode(self, audio: np.ndarray) -> SpeculativeResult:
+        """
+        Bitta (<= 30 soniya) oynani decode qilish
+
+        Args:
+            audio (np.ndarray): 16 kHz mono audio
+
+        Returns:
+            SpeculativeResult: Tokenlar, avg_logprob va statistika
+        """
+        eot = self.tokenizer.eot
+        max_length = min(self.sample_begin + self.sample_len, self.n_text_ctx)
+        stats = {'proposed': 0, 'accepted': 0, 'target_forwards': 0, 'draft_forwards': 0}
+
+        with torch.no_grad():
+            target = _IncrementalDecoder(self.target_model, self._embed(self.target_model, audio))
+            draft = None
+            if self.draft_model is not None:
+                draft = _IncrementalDecoder(self.draft_model, self._embed(self.draft_model, audio))
+
+            tokens = list(self.initial_tokens)
+            sum_logprob = 0.0
+
+            while len(tokens) < max_length and tokens[-1] != eot:
+                # 1. Draft takliflari (greedy, bir xil filtrlar bilan)
+                proposals: List[int] = []
+                if draft is not None:
+                    budget = min(self.draft_tokens, max_length - len(tokens) - 1)
+                    draft_prefix = list(tokens)
+                    for _ in range(budget):
+                        logits = draft.forward(draft_prefix[draft.length:])
+                        stats['draft_forwards'] += 1
+                        token = int(self._filtered_logprobs(logits[-1], draft_prefix).argmax())
+                        proposals.append(token)
+                        draft_prefix.append(token)
+                        if token == eot:
+                            break
+
+                # 2. Target: prefiks + takliflar bitta forward'da
+                fed_from = target.length
+                logits = target.forward((tokens + proposals)[fed_from:])
+                stats['target_forwards'] += 1
+                stats['proposed'] += len(proposals)
+
+                # 3. Target argmax bilan mos kelguncha qabul qilish
+                base = len(tokens) - 1 - fed_from  # tokens dan keyingi tokenni bashorat qiluvchi qator
+                accepted = 0
+                prefix = list(tokens)
+                while True:
+                    logprobs = self._filtered_logprobs(logits[base + accepted], prefix)
+                    token = int(logprobs.argmax())
+                    sum_logprob += float(logprobs[token])
+                    prefix.append(token)
+
+                    if accepted < len(proposals) and token == proposals[accepted] and token != eot:
+                        accepted += 1
+                        if len(prefix) >= max_length:
+                            break
+                        continue
+                    break
+
+                stats['accepted'] += accepted
+                common = len(tokens) + accepted
+                tokens = prefix
+
+                # Rad etilgan takliflarni keshdan olib tashlash
+                target.truncate(min(target.length, common))
+                if draft is not None:
+                    draft.truncate(min(draft.length, common, len(tokens) - 1))
+
+        sampled = tokens[self.sample_begin:]
+        if sampled and sampled[-1] == eot:
+            sampled = sampled[:-1]
+
+        stats['generated'] = len(sampled)
+        stats['acceptance_rate'] = stats['accepted'] / stats['proposed'] if stats['proposed'] else 0.0
+
+        return SpeculativeResult(
+            tokens=sampled,
+            avg_logprob=sum_logprob / (len(sampled) + 1),
+            stats=stats
+        )
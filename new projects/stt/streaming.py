@@ -0,0 +1,163 @@
+"""
+Streaming Transcription Module
+==============================
+Audio bo'laklari kelishi bilan bosqichma-bosqich transkripsiya qilish
+
+Kelgan audio aylanma buferda yig'iladi va har safar yetarli yangi audio
+to'planganda bufer qayta decode qilinadi. Ketma-ket ikki decode'da bir xil
+chiqqan segmentlar (oxirgisidan tashqari) barqaror deb hisoblanib
+"final" qilinadi, qolganlari "provisional" bo'lib keyingi decode'da
+o'zgarishi mumkin. Final segmentlar buferdan kesib tashlanadi.
+"""
+
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .whisper_model import WhisperTranscriber, TranscriptionSegment
+
+
+@dataclass
+class StreamUpdate:
+    """
+    Bitta push() natijasi
+
+    Attributes:
+        committed (List[TranscriptionSegment]): Yangi final segmentlar
+        provisional (List[TranscriptionSegment]): Hali o'zgarishi mumkin bo'lgan segmentlar
+    """
+    committed: List[TranscriptionSegment] = field(default_factory=list)
+    provisional: List[TranscriptionSegment] = field(default_factory=list)
+
+
+class StreamingTranscriber:
+    """
+    Jonli subtitrlar va uzun yuklamalar uchun inkremental transkripsiya
+
+    Foydalanish:
+        streamer = StreamingTranscriber(WhisperTranscriber('small'))
+        for chunk in audio_chunks:
+            update = streamer.push(chunk)
+            show(update.committed, update.provisional)
+        final = streamer.finish()
+    """
+
+    def __init__(
+        self,
+        transcriber: WhisperTranscriber,
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        min_chunk_duration: float = 2.0,
+        max_buffer_duration: float = 30.0
+    ):
+        """
+        Args:
+            transcriber (WhisperTranscriber): Decode uchun transcriber
+            sample_rate (int): Kiruvchi audio sample rate. Default: 16000
+            language (str, optional): Til kodi (None = transcriber tili)
+            min_chunk_duration (float): Qayta decode uchun minimal yangi audio (soniya)
+            max_buffer_duration (float): Bufer chegarasi; oshsa majburan commit (soniya)
+        """
+        self.transcriber = transcriber
+        self.sample_rate = sample_rate
+        self.language = language
+        self.min_chunk_duration = min_chunk_duration
+        self.max_buffer_duration = max_buffer_duration
+
+        self.reset()
+
+    def reset(self):
+        """Oqim holatini tozalash"""
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_offset = 0.0  # buffer[0] ning oqimdagi vaqti (soniya)
+        self.committed: List[TranscriptionSegment] = []
+        self._previous: List[TranscriptionSegment] = []
+        self._pending_samples = 0
+
+    @property
+    def buffer_duration(self) -> float:
+        return len(self.buffer) / self.sample_rate
+
+    def push(self, chunk: np.ndarray) -> StreamUpdate:
+        """
+        Yangi audio bo'lagini qo'shish
+
+        Args:
+            chunk (np.ndarray): Mono audio bo'lagi
+
+        Returns:
+            StreamUpdate: Yangi final va joriy provisional segmentlar
+        """
+        chunk = np.asarray(chunk, dtype=np.float32)
+        self.buffer = np.concatenate([self.buffer, chunk])
+        self._pending_samples += len(chunk)
+
+        if self._pending_samples < self.min_chunk_duration * self.sample_rate:
+            return StreamUpdate(provisional=list(self._previous))
+
+        return self._decode(final=False)
+
+    def finish(self) -> StreamUpdate:
+        """
+        Oqimni yakunlash - qolgan buferni decode qilib hammasini commit qilish
+
+        Returns:
+            StreamUpdate: Oxirgi final segmentlar
+        """
+        if len(self.buffer) == 0:
+            return StreamUpdate()
+
+        update = self._decode(final=True)
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self._previous = []
+        return update
+
+    def _decode(self, final: bool) -> StreamUpdate:
+        self._pending_samples = 0
+
+        # Oraliq buferlar qayta ishlatilmaydi - keshni to'ldirmaslik uchun
+        segments = self.transcriber.transcribe_with_timestamps(
+            self.buffer,
+            sample_rate=self.sample_rate,
+            language=self.language,
+            use_cache=False
+        )
+        for seg in segments:
+            seg.start += self.buffer_offset
+            seg.end += self.buffer_offset
+
+        if final:
+            stable = len(segments)
+        else:
+            # Oldingi decode bilan mos keladigan prefiks (oxirgi segment doim provisional)
+            stable = 0
+            limit = min(len(self._previous), len(segments) - 1)
+            while stable < limit and self._same_text(self._previous[stable], segments[stable]):
+                stable += 1
+
+            # Bufer to'lib ketsa, barqarorlikni kutmasdan commit qilish
+            if stable == 0 and self.buffer_duration >= self.max_buffer_duration:
+                stable = max(len(segments) - 1, 1) if segments else 0
+                if not segments:
+                    self._trim_to(self.buffer_offset + self.buffer_duration - 1.0)
+
+        committed = segments[:stable]
+        provisional = segments[stable:]
+
+        if committed:
+            self.committed.extend(committed)
+            self._trim_to(committed[-1].end)
+
+        self._previous = provisional
+        return StreamUpdate(committed=committed, provisional=provisional)
+
+    def _trim_to(self, stream_time: float):
+        """Buferdan stream_time gacha bo'lgan qismni olib tashlash"""
+        cut = int(round((stream_time - self.buffer_offset) * self.sample_rate))
+        cut = min(max(cut, 0), len(self.buffer))
+        self.buffer = self.buffer[cut:]
+        self.buffer_offset += cut / self.sample_rate
+
+    @staticmethod
+    def _same_text(a: TranscriptionSegment, b: TranscriptionSegment) -> bool:
+        return a.text.strip().lower() == b.text.strip().lower()
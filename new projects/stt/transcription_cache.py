@@ -0,0 +1,213 @@
+"""
+Transcription Cache Module
+==========================
+Transkripsiya natijalarini lokal SQLite keshda saqlash
+
+Kalit: modelga berilgan aniq PCM (16 kHz float32) xeshi + model nomi,
+backend, precision, til, task va decode parametrlari. Shu sababli bir xil
+yozuvni diarization yoki subtitr sozlamalari o'zgargani uchun qayta
+ishlash Whisper'ni qayta ishga tushirmaydi.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+def audio_fingerprint(audio_data: np.ndarray) -> str:
+    """
+    PCM massivining xeshi (nusxasiz, buffer protokoli orqali)
+
+    Args:
+        audio_data (np.ndarray): Modelga beriladigan audio
+
+    Returns:
+        str: Hex xesh
+    """
+    audio = np.ascontiguousarray(audio_data)
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(str(audio.dtype).encode())
+    digest.update(audio.view(np.uint8))
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Hajm bo'yicha cheklangan, LRU tartibida tozalanadigan SQLite kesh
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_size_mb: Optional[float] = None):
+        """
+        Args:
+            db_path (str, optional): SQLite fayl yo'li
+                (None = TRANSCRIPTION_CACHE_DIR env yoki ~/.cache/uzbek_audio_ai)
+            max_size_mb (float, optional): Maksimal hajm (MB)
+                (None = TRANSCRIPTION_CACHE_MAX_MB env yoki 512)
+        """
+        if db_path is None:
+            cache_dir = os.environ.get(
+                'TRANSCRIPTION_CACHE_DIR',
+                os.path.join(os.path.expanduser("~"), ".cache", "uzbek_audio_ai")
+            )
+            db_path = os.path.join(cache_dir, "transcripts.sqlite")
+
+        if max_size_mb is None:
+            max_size_mb = float(os.environ.get('TRANSCRIPTION_CACHE_MAX_MB', 512))
+
+        self.db_path = db_path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                " key TEXT PRIMARY KEY,"
+                " result TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_access REAL NOT NULL,"
+                " hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transcripts_access ON transcripts(last_access)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:  # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(fingerprint: str, params: Dict) -> str:
+        """
+        Audio xeshi va decode parametrlaridan kalit yasash
+
+        Args:
+            fingerprint (str): audio_fingerprint() natijasi
+            params (Dict): model, backend, precision, language, task, decode options
+
+        Returns:
+            str: Kesh kaliti
+        """
+        encoded = json.dumps(params, sort_keys=True, default=str)
+        return fingerprint + ':' + hashlib.sha1(encoded.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Keshdan natijani olish
+
+        Returns:
+            Dict | None: Transkripsiya natijasi yoki None (miss)
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT result FROM transcripts WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE transcripts SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key)
+            )
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict):
+        """
+        Natijani saqlash va hajm oshsa eski yozuvlarni chiqarish
+        """
+        payload = json.dumps(result, ensure_ascii=False, default=self._json_default)
+        size = len(payload.encode('utf-8'))
+        now = time.time()
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts (key, result, size, created, last_access, hits)"
+                " VALUES (?, ?, ?, ?, ?, 0)",
+                (key, payload, size, now, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT key, size FROM transcripts ORDER BY last_access ASC"
+        ).fetchall()
+
+        to_delete = []
+        for key, size in rows:
+            if total <= self.max_size_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+
+        conn.executemany("DELETE FROM transcripts WHERE key = ?", to_delete)
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        return str(value)
+
+    def clear(self):
+        """Keshni to'liq tozalash"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM transcripts")
+
+    def get_stats(self) -> Dict:
+        """
+        Kesh statistikasi
+
+        Returns:
+            Dict: hit/miss, yozuvlar soni va hajmi
+        """
+        with self._lock, self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts"
+            ).fetchone()
+
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': entries,
+            'size_mb': round(size / (1024 * 1024), 2),
+            'max_size_mb': round(self.max_size_bytes / (1024 * 1024), 2),
+            'db_path': self.db_path,
+        }
+
+
+_cache: Optional[TranscriptionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_transcription_cache() -> TranscriptionCache:
+    """Jarayon bo'yicha yagona TranscriptionCache'ni olish"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranscriptionCache()
+        return _cache
@@ -0,0 +1,80 @@
+"""
+Variable-length Encoder Input
+=============================
+Whisper audio encoder'ini 30 soniyagacha to'ldirilmagan (qisqartirilgan)
+mel spektrogramma bilan ishlatish
+
+openai-whisper AudioEncoder kirish uzunligi aynan 3000 frame bo'lishini
+talab qiladi (positional embedding to'liq qo'shiladi). Bu yerdagi forward
+positional embedding'ni haqiqiy uzunlikkacha kesadi, shuning uchun 3 soniyalik
+segment 30 soniyalik segmentning ~1/10 encoder hisobini talab qiladi.
+To'liq uzunlikdagi kirish uchun natija asl forward bilan bir xil.
+"""
+
+import numpy as np
+
+try:
+    import torch
+    import torch.nn.functional as F
+    import whisper
+except ImportError:
+    torch = None
+    F = None
+    whisper = None
+
+
+# conv2 stride=2: mel frame'lar soni juft bo'lishi kerak (1 frame = 160 sample)
+SAMPLES_PER_ENCODER_FRAME = 320
+
+
+def install_variable_length_encoder(model):
+    """
+    Encoder forward'ini ixtiyoriy (<= n_audio_ctx) uzunlikni qabul
+    qiladigan qilib almashtirish (bir marta, model ulashilgani uchun)
+
+    Args:
+        model: whisper.model.Whisper
+    """
+    encoder = model.encoder
+    if getattr(encoder, '_variable_length', False):
+        return
+
+    def variable_forward(x):
+        x = F.gelu(encoder.conv1(x))
+        x = F.gelu(encoder.conv2(x))
+        x = x.permute(0, 2, 1)
+
+        n_ctx = x.shape[1]
+        if n_ctx > encoder.positional_embedding.shape[0]:
+            raise ValueError(f"Encoder kirishi juda uzun: {n_ctx} frame")
+
+        x = (x + encoder.positional_embedding[:n_ctx]).to(x.dtype)
+
+        for block in encoder.blocks:
+            x = block(x)
+
+        return encoder.ln_post(x)
+
+    encoder.forward = variable_forward
+    encoder._variable_length = True
+
+
+def variable_length_mel(audio: np.ndarray, n_mels: int = 80, padding: float = 0.5):
+    """
+    Qisqa audio uchun 30 soniyagacha to'ldirilmagan log-mel spektrogramma
+
+    Args:
+        audio (np.ndarray): 16 kHz mono float32 audio (<= 30 soniya)
+        n_mels (int): Mel kanallar soni (model.dims.n_mels)
+        padding (float): Oxiriga qo'shiladigan sukut (soniya) - so'nggi
+            so'z va yopuvchi vaqt belgisi uchun joy
+
+    Returns:
+        torch.Tensor: (n_mels, n_frames) - n_frames juft
+    """
+    n_samples = len(audio) + int(padding * 16000)
+    n_samples = -(-n_samples // SAMPLES_PER_ENCODER_FRAME) * SAMPLES_PER_ENCODER_FRAME
+    n_samples = min(n_samples, whisper.audio.N_SAMPLES)
+
+    padded = whisper.pad_or_trim(torch.from_numpy(np.asarray(audio, dtype=np.float32)), n_samples)
+    return whisper.log_mel_spectrogram(padded, n_mels=n_mels)
@@ -6,16 +6,91 @@ O'zbek tilini qo'llab-quvvatlash
 """
 
 import os
-import whisper
+import time
+import threading
 import numpy as np
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from dataclasses import dataclass
+from contextlib import ExitStack
 import warnings
 
+from .model_registry import get_model_registry
+from .backends import get_backend
+from .transcription_cache import TranscriptionCache, audio_fingerprint, get_transcription_cache
+from .encoder_cache import get_encoder_cache, install_encoder_cache, encoder_cache_enabled
+from .speculative import SpeculativeDecoder
+from .variable_length import install_variable_length_encoder, variable_length_mel
+from .rtf_table import get_rtf_table
+from .decode_guard import RunawayGuard, install_runaway_guard
+
+# openai-whisper faqat 'whisper' backend va batch rejim uchun kerak
+try:
+    import whisper
+    import torch
+except ImportError:
+    whisper = None
+    torch = None
+
 # Whisper warning'larini yashirish
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
+_decode_locks_guard = threading.Lock()
+
+
+def _model_decode_lock(model) -> threading.RLock:
+    """
+    Bitta model obyekti uchun decode lock'i
+    
+    openai-whisper har bir decode'da kv-cache hook'larini modelning o'zigagina
+    o'rnatadi: ikki thread bir vaqtda decode qilsa, har birining hook'lari
+    ikkinchisining forward'ida ham ishlab keshlarni aralashtirib yuboradi.
+    Registry modelni transcriber'lar orasida ulashgani uchun lock modelda turadi.
+    """
+    with _decode_locks_guard:
+        lock = getattr(model, '_decode_lock', None)
+        if lock is None:
+            lock = threading.RLock()
+            model._decode_lock = lock
+        return lock
+
+
+# Decode presetlari (tezlik / aniqlik muvozanati)
+#   fast     - greedy, temperature fallback yo'q, oldingi matnga tayanmaydi
+#   balanced - greedy, qisqartirilgan fallback (ko'pi bilan 3 marta decode)
+#   accurate - beam search + to'liq fallback (oyna 6 martagacha qayta decode)
+# None = backend standart sozlamalari
+DECODE_PRESETS = {
+    'fast': {
+        'temperature': 0.0,
+        'beam_size': None,
+        'best_of': None,
+        'condition_on_previous_text': False,
+    },
+    'balanced': {
+        'temperature': (0.0, 0.4, 0.8),
+        'beam_size': None,
+        'best_of': 3,
+        'condition_on_previous_text': True,
+    },
+    'accurate': {
+        'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        'beam_size': 5,
+        'best_of': 5,
+        'condition_on_previous_text': True,
+    },
+}
+
+# whisper.transcribe standart sifat chegaralari: shulardan o'tmagan oyna
+# presetning keyingi temperature qiymati bilan qayta decode qilinadi
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+# Joylangan oynada segment ikki klipning har biri bilan shundan ko'p
+# kesishsa (soniya), u klip chegarasini kesib o'tgan hisoblanadi
+PACK_BOUNDARY_TOLERANCE = 0.2
+
 
 @dataclass
 class TranscriptionSegment:
@@ -47,18 +122,56 @@ class WhisperTranscriber:
     """
     
     AVAILABLE_MODELS = ['tiny', 'base', 'small', 'medium', 'large']
+    AVAILABLE_PRECISIONS = ['fp32', 'int8']
+    AVAILABLE_PRESETS = list(DECODE_PRESETS)
     
     def __init__(
         self, 
         model_name: str = 'medium',
         device: str = 'cpu',
-        language: str = 'uz'
+        language: str = 'uz',
+        precision: str = 'fp32',
+        use_registry: bool = True,
+        backend: str = 'whisper',
+        use_cache: bool = True,
+        cache: Optional[TranscriptionCache] = None,
+        preset: Optional[str] = None,
+        encoder_cache: bool = True,
+        speculative_draft: Optional[str] = None,
+        speculative_tokens: int = 4,
+        variable_length_max: Optional[float] = None,
+        runaway_guard: bool = False
     ):
         """
         Args:
             model_name (str): Whisper model nomi. Default: 'medium'
             device (str): 'cpu' yoki 'cuda'. Default: 'cpu'
             language (str): Til kodi (uz, ru, en). Default: 'uz'
+            precision (str): Model aniqligi ('fp32' yoki 'int8' - CPU uchun
+                dinamik kvantizatsiya). Default: 'fp32'
+            use_registry (bool): Umumiy ModelRegistry'dan foydalanish
+                (modelni har safar qayta yuklamaslik). Default: True
+            backend (str): Inference backend (whisper, faster-whisper, onnx,
+                fake). Default: 'whisper'
+            use_cache (bool): Transkripsiya keshidan foydalanish. Default: True
+            cache (TranscriptionCache, optional): Kesh (None = umumiy kesh)
+            preset (str, optional): Decode preseti (fast, balanced, accurate).
+                None = backend standart sozlamalari
+            encoder_cache (bool): Audio encoder natijalarini oynalar bo'yicha
+                keshlash ('whisper' backend). Default: True
+            speculative_draft (str, optional): Speculative decoding uchun draft
+                model (tiny/base). None = o'chirilgan. Natija target model
+                bilan greedy decode'ga aynan teng
+            speculative_tokens (int): Har qadamda draft taklif qiladigan
+                tokenlar soni. Default: 4
+            variable_length_max (float, optional): Shundan qisqa (soniya)
+                audio transcribe_audio'da 30 soniyagacha to'ldirilmasdan,
+                qisqartirilgan mel bilan encoder'dan o'tkaziladi ('whisper'
+                backend, til berilgan bo'lsa). None = o'chirilgan
+            runaway_guard (bool): Takrorlanish sikli yoki past nutq
+                ehtimolida oyna decode'ini erta to'xtatish ('whisper' backend)
+                va transcribe_auto'ga berilgan nutq segmentlari bo'yicha
+                nutqsiz oynalarni o'tkazib yuborish. Default: False
         """
         if model_name not in self.AVAILABLE_MODELS:
             raise ValueError(
@@ -66,31 +179,155 @@ class WhisperTranscriber:
                 f"Mavjud modellar: {', '.join(self.AVAILABLE_MODELS)}"
             )
         
+        if precision not in self.AVAILABLE_PRECISIONS:
+            raise ValueError(
+                f"Noto'g'ri precision: {precision}. "
+                f"Mavjud: {', '.join(self.AVAILABLE_PRECISIONS)}"
+            )
+        
+        if preset is not None and preset not in DECODE_PRESETS:
+            raise ValueError(
+                f"Noto'g'ri preset: {preset}. "
+                f"Mavjud: {', '.join(self.AVAILABLE_PRESETS)}"
+            )
+        
+        if speculative_draft is not None:
+            if speculative_draft not in self.AVAILABLE_MODELS:
+                raise ValueError(f"Noto'g'ri draft model: {speculative_draft}")
+            if backend != 'whisper':
+                raise ValueError("Speculative decoding faqat 'whisper' backend uchun")
+            # Speculative natija target model greedy decode'iga teng - boshqa
+            # presetlar (beam search, temperature fallback) bu yo'lda ishlamaydi
+            if preset not in (None, 'fast'):
+                raise ValueError(
+                    f"Speculative decoding greedy (temperature=0): '{preset}' preset bilan "
+                    f"birga ishlatib bo'lmaydi, faqat 'fast' mos"
+                )
+        
+        if variable_length_max is not None and not 0 < variable_length_max <= 30:
+            raise ValueError("variable_length_max 0 va 30 soniya oralig'ida bo'lishi kerak")
+        
         self.model_name = model_name
         self.device = device
         self.language = language
+        self.precision = precision
+        self.use_registry = use_registry
+        self.backend_name = backend
+        self.backend = get_backend(backend)
         self.model = None
+        self._registry_acquired = False
+        self.cache = (cache or get_transcription_cache()) if use_cache else None
+        self.preset = preset
+        self.decode_options = dict(DECODE_PRESETS[preset]) if preset else {}
+        self.encoder_cache = encoder_cache
+        self.speculative_draft = speculative_draft
+        self.speculative_tokens = speculative_tokens
+        self.speculative_stats: Dict = {}
+        self.variable_length_max = variable_length_max
+        self.guard = RunawayGuard() if runaway_guard else None
         
         print(f"🤖 WhisperTranscriber yaratildi:")
         print(f"  • Model: {model_name}")
+        print(f"  • Backend: {backend}")
+        print(f"  • Precision: {precision}")
+        print(f"  • Preset: {preset or 'standart'}")
+        if speculative_draft:
+            print(f"  • Speculative draft: {speculative_draft} (k={speculative_tokens})")
+        if variable_length_max:
+            print(f"  • Qisqartirilgan encoder kirishi: <= {variable_length_max:.1f}s")
+        if runaway_guard:
+            print(f"  • Runaway guard: ✅")
         print(f"  • Device: {device}")
         print(f"  • Til: {language}")
     
     def load_model(self):
         """Whisper modelni yuklash"""
+        if self.model is None and self.use_registry:
+            try:
+                self.model = get_model_registry().acquire(
+                    self.model_name,
+                    self.device,
+                    self.precision,
+                    self.backend_name
+                )
+                self._registry_acquired = True
+            except Exception as e:
+                raise Exception(f"Model yuklashda xatolik: {str(e)}")
+        
         if self.model is None:
             print(f"\n📥 Whisper '{self.model_name}' modeli yuklanmoqda...")
             print("⏳ Bu biroz vaqt olishi mumkin (birinchi marta)...")
             
             try:
-                self.model = whisper.load_model(
+                self.model = self.backend.load_model(
                     self.model_name,
-                    device=self.device
+                    self.device,
+                    self.precision
                 )
                 print(f"✅ Model yuklandi: {self.model_name}\n")
                 
             except Exception as e:
                 raise Exception(f"Model yuklashda xatolik: {str(e)}")
+        
+        # Registry modeli ulashilgani uchun o'rashlar bir marta o'rnatiladi.
+        # Variable-length forward to'liq oynalar uchun asl forward bilan bir
+        # xil, shuning uchun har doim kesh o'rashidan oldin (ostida) turadi
+        if self.backend_name == 'whisper':
+            install_variable_length_encoder(self.model)
+            if self.guard is not None:
+                install_runaway_guard(self.model)
+        
+        if self.encoder_cache and self.backend_name == 'whisper':
+            install_encoder_cache(
+                self.model,
+                get_encoder_cache(),
+                f"{self.model_name}:{self.precision}:{self.device}"
+            )
+    
+    def release_model(self):
+        """
+        Modeldan foydalanishni tugatish
+        
+        Registry ishlatilsa model keshda qoladi va keyingi so'rovlar uni
+        qayta yuklamaydi; RAM byudjeti oshganda LRU bo'yicha chiqariladi.
+        """
+        if self._registry_acquired:
+            get_model_registry().release(
+                self.model_name,
+                self.device,
+                self.precision,
+                self.backend_name
+            )
+            self._registry_acquired = False
+        self.model = None
+    
+    def warmup(self, duration: float = 2.0) -> float:
+        """
+        Modelni yuklab, sintetik audio bilan bitta inference bajarish
+        
+        Birinchi inference'dagi graph/kernel sozlash va xotira ajratish
+        xarajatlari real so'rovga tushmasligi uchun. Natija keshga yozilmaydi.
+        
+        Args:
+            duration (float): Sintetik audio davomiyligi (soniya). Default: 2.0
+            
+        Returns:
+            float: Warm-up inference vaqti (soniya)
+        """
+        self.load_model()
+        
+        # Past amplitudali ton + shovqin (jim audio decode'ni qisqa tutadi)
+        n_samples = int(duration * 16000)
+        t = np.arange(n_samples) / 16000
+        rng = np.random.default_rng(0)
+        audio = 0.05 * np.sin(2 * np.pi * 220 * t) + 0.005 * rng.standard_normal(n_samples)
+        
+        start = time.perf_counter()
+        self.transcribe_audio(audio.astype(np.float32), sample_rate=16000, use_cache=False)
+        elapsed = time.perf_counter() - start
+        
+        print(f"🔥 Warm-up tugadi: {self.model_name} ({elapsed:.2f}s)")
+        return elapsed
     
     def transcribe_audio(
         self,
@@ -98,7 +335,8 @@ class WhisperTranscriber:
         sample_rate: int = 16000,
         language: Optional[str] = None,
         task: str = 'transcribe',
-        verbose: bool = False
+        verbose: bool = False,
+        use_cache: bool = True
     ) -> Dict:
         """
         Audiodni matnga aylantirish
@@ -109,13 +347,11 @@ class WhisperTranscriber:
             language (str, optional): Til kodi (None = auto-detect)
             task (str): 'transcribe' yoki 'translate'. Default: 'transcribe'
             verbose (bool): Batafsil chiqarish. Default: False
+            use_cache (bool): Shu chaqiruv uchun keshni ishlatish. Default: True
             
         Returns:
             Dict: Transkripsiya natijalari
         """
-        # Modelni yuklash (agar yuklanmagan bo'lsa)
-        self.load_model()
-        
         # Til sozlash
         if language is None:
             language = self.language
@@ -125,6 +361,9 @@ class WhisperTranscriber:
             print(f"  • Til: {language}")
             print(f"  • Davomiyligi: {len(audio_data)/sample_rate:.2f} soniya")
             
+            # SegmentedAudio kabi buferlarni uzluksiz massivga aylantirish
+            audio_data = np.asarray(audio_data)
+            
             # Whisper uchun audio tayyorlash
             # Whisper 16kHz kutadi
             if sample_rate != 16000:
@@ -138,15 +377,51 @@ class WhisperTranscriber:
             # Audio normalizatsiya
             audio_data = audio_data.astype(np.float32)
             
-            # Transkripsiya
-            result = self.model.transcribe(
-                audio_data,
-                language=language,
-                task=task,
-                verbose=verbose,
-                fp16=False  # CPU uchun False
+            # Kesh: modelga beriladigan aniq PCM + decode parametrlari bo'yicha
+            cache_key = None
+            if self.cache is not None and use_cache:
+                cache_key = self.cache.make_key(
+                    audio_fingerprint(audio_data),
+                    self._cache_params(language, task)
+                )
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    print(f"⚡ Transkripsiya keshdan olindi ({len(cached.get('segments', []))} segment)")
+                    return cached
+            
+            # Modelni yuklash (agar yuklanmagan bo'lsa)
+            self.load_model()
+            
+            # Transkripsiya (backend bir xil segment strukturasini qaytaradi)
+            with self._decoding():
+                # Lock kutish vaqti RTF'ga kirmasligi uchun taymer lock ichida
+                started = time.perf_counter()
+                if self._use_variable_length(audio_data, language):
+                    result = self._transcribe_variable_length(audio_data, language, task)
+                else:
+                    result = self.backend.transcribe(
+                        self.model,
+                        audio_data,
+                        language=language,
+                        task=task,
+                        verbose=verbose,
+                        **self._backend_decode_options()
+                    )
+                decode_time = time.perf_counter() - started
+            
+            # Deadline rejimi modellarni shu o'lchovlar bo'yicha tanlaydi
+            get_rtf_table().record(
+                self.model_name,
+                self.precision,
+                self.backend_name,
+                self.device,
+                len(audio_data) / 16000,
+                decode_time
             )
             
+            if cache_key is not None:
+                self.cache.put(cache_key, result)
+            
             print(f"✅ Transkripsiya tugallandi")
             print(f"  • Aniqlangan til: {result.get('language', 'unknown')}")
             print(f"  • Segmentlar soni: {len(result.get('segments', []))}")
@@ -156,19 +431,170 @@ class WhisperTranscriber:
         except Exception as e:
             raise Exception(f"Transkripsiya xatoligi: {str(e)}")
     
+    def _cache_params(self, language: Optional[str], task: str) -> Dict:
+        """Natijaga ta'sir qiladigan parametrlar (kesh kaliti uchun)"""
+        return {
+            'model': self.model_name,
+            'backend': self.backend_name,
+            'precision': self.precision,
+            'language': language,
+            'task': task,
+            'decode_options': self._backend_decode_options(),
+            'variable_length_max': self.variable_length_max,
+            'runaway_guard': self.guard is not None,
+        }
+    
+    def _backend_decode_options(self) -> Dict:
+        """
+        Backend'ga beriladigan decode parametrlari: preset + fp16
+        
+        fp16 whisper.transcribe standartidagidek faqat CUDA'da yoqiladi -
+        padded, qisqartirilgan va batch yo'llari bir xil aniqlikda decode qiladi.
+        """
+        options = dict(self.decode_options)
+        options.setdefault('fp16', str(self.device).startswith('cuda'))
+        return options
+    
+    def _decoding(self):
+        """
+        Decode chaqiruvlari konteksti: model lock'i, runaway guard va encoder keshi
+        
+        Guard va encoder keshi ulashilgan modelga bir marta o'rnatiladi, lekin
+        faqat shu transcriber sozlamalarida yoqilgan bo'lsa shu thread'da
+        ishlaydi. openai-whisper modelida decode'lar ketma-ket bajariladi
+        (_model_decode_lock) - parallel decode uchun InferenceService bor.
+        """
+        stack = ExitStack()
+        if self.backend_name == 'whisper' and self.model is not None:
+            stack.enter_context(_model_decode_lock(self.model))
+        if self.guard is not None:
+            stack.enter_context(self.guard.active())
+        if self.encoder_cache and self.backend_name == 'whisper' and self.model is not None:
+            stack.enter_context(encoder_cache_enabled(self.model))
+        return stack
+    
+    def get_guard_stats(self) -> Dict:
+        """
+        Runaway guard statistikasi
+        
+        Returns:
+            Dict: decode qilingan, to'xtatilgan (takrorlanish / nutqsiz) va
+                VAD bo'yicha o'tkazib yuborilgan oynalar soni ({} = guard yo'q)
+        """
+        return self.guard.get_stats() if self.guard is not None else {}
+    
+    def _use_variable_length(self, audio_data: np.ndarray, language: Optional[str]) -> bool:
+        """
+        Qisqartirilgan encoder kirishi ishlatiladimi
+        
+        Til aniqlash (language=None) to'liq 30 soniyalik encoder natijasini
+        kutadi, shuning uchun bu rejim faqat til berilganda yoqiladi.
+        """
+        return (
+            self.variable_length_max is not None
+            and self.backend_name == 'whisper'
+            and language is not None
+            and len(audio_data) / 16000 <= self.variable_length_max
+        )
+    
+    def _transcribe_variable_length(
+        self,
+        audio_data: np.ndarray,
+        language: str,
+        task: str = 'transcribe'
+    ) -> Dict:
+        """
+        Qisqa audiodni 30 soniyagacha to'ldirmasdan bitta oyna sifatida decode qilish
+        
+        Encoder haqiqiy uzunlikdagi mel bilan ishlaydi (positional embedding
+        kesiladi), shuning uchun hisob audio davomiyligiga proporsional.
+        
+        Decode padded yo'l (whisper.transcribe) bilan bir xil: preset
+        temperature fallback'i, compression_ratio / logprob / no_speech
+        chegaralari va fp16 - farq faqat mel uzunligida.
+        
+        Returns:
+            Dict: backend.transcribe bilan bir xil tuzilmadagi natija
+        """
+        tokenizer = whisper.tokenizer.get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=getattr(self.model, 'num_languages', 99),
+            language=language,
+            task=task
+        )
+        decode_options = self._backend_decode_options()
+        temperatures = decode_options.get('temperature', (0.0, 0.2, 0.4, 0.6, 0.8, 1.0))
+        if not isinstance(temperatures, (tuple, list)):
+            temperatures = [temperatures]
+        mel = variable_length_mel(audio_data, n_mels=self.model.dims.n_mels).unsqueeze(0).to(self.model.device)
+        
+        # whisper.transcribe decode_with_fallback bilan bir xil tartib
+        for temperature in temperatures:
+            sampling = {'best_of': decode_options.get('best_of')} if temperature > 0 else {
+                'beam_size': decode_options.get('beam_size'),
+                'patience': decode_options.get('patience'),
+            }
+            options = whisper.DecodingOptions(
+                task=task,
+                language=language,
+                temperature=temperature,
+                without_timestamps=False,
+                fp16=decode_options['fp16'],
+                **sampling
+            )
+            with torch.no_grad():
+                decoded = whisper.decode(self.model, mel, options)[0]
+            
+            if not self._decode_failed(
+                decoded,
+                decode_options.get('compression_ratio_threshold', COMPRESSION_RATIO_THRESHOLD),
+                decode_options.get('logprob_threshold', LOGPROB_THRESHOLD),
+                decode_options.get('no_speech_threshold', NO_SPEECH_THRESHOLD)
+            ):
+                break
+        
+        # Nutqsiz oyna (whisper.transcribe kabi matn tashlanadi)
+        if self._is_silent(
+            decoded,
+            decode_options.get('logprob_threshold', LOGPROB_THRESHOLD),
+            decode_options.get('no_speech_threshold', NO_SPEECH_THRESHOLD)
+        ):
+            segments = []
+        else:
+            segments = self._tokens_to_segments(
+                decoded,
+                tokenizer,
+                offset=0.0,
+                window_length=len(audio_data) / 16000
+            )
+        
+        return {
+            'text': ' '.join(seg.text for seg in segments),
+            'language': language,
+            'segments': [
+                {'text': seg.text, 'start': seg.start, 'end': seg.end, 'confidence': seg.confidence}
+                for seg in segments
+            ],
+        }
+    
     def transcribe_with_timestamps(
         self,
         audio_data: np.ndarray,
         sample_rate: int = 16000,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        use_cache: bool = True
     ) -> List[TranscriptionSegment]:
         """
         Audiodni matnga aylantirish (vaqt belgilari bilan)
         
+        Natija avval transkripsiya keshidan qidiriladi; topilmasa model
+        ishga tushiriladi va natija keshga yoziladi.
+        
         Args:
             audio_data (np.ndarray): Audio ma'lumotlar
             sample_rate (int): Sample rate. Default: 16000
             language (str, optional): Til kodi
+            use_cache (bool): Shu chaqiruv uchun keshni ishlatish. Default: True
             
         Returns:
             List[TranscriptionSegment]: Segmentlar ro'yxati
@@ -177,13 +603,27 @@ class WhisperTranscriber:
         result = self.transcribe_audio(
             audio_data,
             sample_rate=sample_rate,
-            language=language
+            language=language,
+            use_cache=use_cache
         )
         
-        # Segmentlarni TranscriptionSegment formatiga o'tkazish
+        return self._result_to_segments(result)
+    
+    @staticmethod
+    def _result_to_segments(result: Dict) -> List[TranscriptionSegment]:
+        """
+        Backend natijasini TranscriptionSegment ro'yxatiga o'tkazish
+        
+        Matnsiz segmentlar tashlanadi: runaway guard no_speech bilan to'xtatgan
+        oyna darhol EOT oladi (avg_logprob 0), shuning uchun whisper'ning
+        nutqsiz oyna qoidasi ishlamaydi va butun oynani qoplaydigan bo'sh
+        segment qoladi.
+        """
         segments = []
         
         for seg in result.get('segments', []):
+            if not seg['text'].strip():
+                continue
             segment = TranscriptionSegment(
                 text=seg['text'].strip(),
                 start=seg['start'],
@@ -194,47 +634,542 @@ class WhisperTranscriber:
         
         return segments
     
+    def transcribe_batched(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        speech_segments: Optional[List[Tuple[float, float]]] = None,
+        batch_size: int = 8,
+        window_duration: float = 30.0,
+        task: str = 'transcribe'
+    ) -> List[TranscriptionSegment]:
+        """
+        Nutq segmentlarini oynalarga guruhlab, batch rejimida transkripsiya qilish
+        
+        model.transcribe 30 soniyalik oynalarni birma-bir decode qiladi.
+        Bu yerda nutq segmentlari (masalan SilenceRemover.get_speech_segments)
+        window_duration'dan oshmaydigan oynalarga guruhlanadi va encoder hamda
+        greedy decoder bir nechta oyna uchun bitta batch tensor bilan ishlaydi.
+        Vaqt belgilari har bir oynaning boshlanish vaqtiga qarab tiklanadi.
+        
+        Args:
+            audio_data (np.ndarray): Audio ma'lumotlar
+            sample_rate (int): Sample rate. Default: 16000
+            language (str, optional): Til kodi
+            speech_segments (List[Tuple[float, float]], optional): Nutq
+                intervallari (soniya). None = butun audio
+            batch_size (int): Bir batch'dagi oynalar soni. Default: 8
+            window_duration (float): Oyna davomiyligi (soniya). Default: 30.0
+            task (str): 'transcribe' yoki 'translate'. Default: 'transcribe'
+            
+        Returns:
+            List[TranscriptionSegment]: Segmentlar ro'yxati
+        """
+        self.load_model()
+        
+        if language is None:
+            language = self.language
+        
+        # SegmentedAudio oynalar bo'yicha kesiladi - uzluksiz nusxa kerak emas
+        if sample_rate != 16000:
+            import librosa
+            audio_data = librosa.resample(np.asarray(audio_data), orig_sr=sample_rate, target_sr=16000)
+            sample_rate = 16000
+        
+        total_duration = len(audio_data) / sample_rate
+        if speech_segments is None:
+            speech_segments = [(0.0, total_duration)]
+        
+        windows = self._group_speech_windows(speech_segments, window_duration)
+        
+        print(f"\n🎤 Batch transkripsiya:")
+        print(f"  • Til: {language}")
+        print(f"  • Oynalar soni: {len(windows)}")
+        print(f"  • Batch hajmi: {batch_size}")
+        
+        all_segments = []
+        
+        try:
+            for batch_start in range(0, len(windows), batch_size):
+                batch_windows = windows[batch_start:batch_start + batch_size]
+                chunks = [
+                    np.asarray(
+                        audio_data[int(win_start * sample_rate):int(win_end * sample_rate)],
+                        dtype=np.float32
+                    )
+                    for win_start, win_end in batch_windows
+                ]
+                
+                batch_segments = self.decode_window_batch(chunks, language=language, task=task)
+                
+                for (win_start, _), segments in zip(batch_windows, batch_segments):
+                    for seg in segments:
+                        seg.start += win_start
+                        seg.end += win_start
+                        all_segments.append(seg)
+                
+                print(f"  • {min(batch_start + batch_size, len(windows))}/{len(windows)} oyna tayyor")
+            
+            print(f"✅ Batch transkripsiya tugallandi: {len(all_segments)} ta segment")
+            
+            return all_segments
+            
+        except Exception as e:
+            raise Exception(f"Batch transkripsiya xatoligi: {str(e)}")
+    
+    def transcribe_packed(
+        self,
+        clips: List[np.ndarray],
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        window_duration: float = 30.0,
+        guard_duration: float = 2.0,
+        batch_size: int = 8
+    ) -> List[List[TranscriptionSegment]]:
+        """
+        Ko'p qisqa kliplarni umumiy 30 soniyalik oynalarga joylab transkripsiya qilish
+        
+        Whisper har bir kirishni 30 soniyagacha to'ldiradi, shuning uchun
+        3 soniyalik klip ham 30 soniyalik encoder hisobini talab qiladi.
+        Bu yerda kliplar orasiga guard_duration sukut qo'yilib bitta oynaga
+        ketma-ket joylanadi, oynalar batch qilib decode qilinadi va segmentlar
+        vaqt belgilari bo'yicha kliplarga qaytariladi. Decode presetlari
+        decode_window_batch orqali qo'llanadi.
+        
+        Whisper ba'zan sukutdan o'tib ikki klip matnini bitta segmentga
+        qo'shadi - bunday segmentni bitta klipga berish ikkinchisining
+        matnini yo'qotadi. Shuning uchun ikki klip bilan kesishgan segment
+        topilsa, shu kliplar alohida (joylanmasdan) qayta decode qilinadi.
+        Oynaga sig'maydigan kliplar ham alohida transkripsiya qilinadi.
+        
+        Args:
+            clips (List[np.ndarray]): Kliplar (bir xil sample rate)
+            sample_rate (int): Sample rate. Default: 16000
+            language (str, optional): Til kodi
+            window_duration (float): Oyna davomiyligi (soniya). Default: 30.0
+            guard_duration (float): Kliplar orasidagi sukut (soniya). Default: 2.0
+            batch_size (int): Bir batch'dagi oynalar soni. Default: 8
+            
+        Returns:
+            List[List[TranscriptionSegment]]: Har bir klip uchun segmentlar
+                (vaqtlar klip boshiga nisbatan)
+        """
+        if language is None:
+            language = self.language
+        
+        prepared = []
+        for clip in clips:
+            clip = np.asarray(clip)
+            if sample_rate != 16000:
+                import librosa
+                clip = librosa.resample(clip, orig_sr=sample_rate, target_sr=16000)
+            prepared.append(clip.astype(np.float32))
+        
+        window_samples = int(window_duration * 16000)
+        guard_samples = int(guard_duration * 16000)
+        
+        # Kliplarni oynalarga ketma-ket joylash: [(klip indeksi, boshlanish sample)]
+        packs: List[List[Tuple[int, int]]] = []
+        current: List[Tuple[int, int]] = []
+        position = 0
+        oversized = []
+        
+        for index, clip in enumerate(prepared):
+            if len(clip) > window_samples - guard_samples:
+                oversized.append(index)
+                continue
+            
+            start = position + guard_samples if current else 0
+            if start + len(clip) > window_samples:
+                packs.append(current)
+                current, start = [], 0
+            
+            current.append((index, start))
+            position = start + len(clip)
+        
+        if current:
+            packs.append(current)
+        
+        print(f"\n📦 Qisqa kliplarni joylash:")
+        print(f"  • Kliplar: {len(prepared)} ({len(oversized)} tasi oynaga sig'madi)")
+        print(f"  • Oynalar: {len(packs)}")
+        
+        windows = []
+        for pack in packs:
+            last_index, last_start = pack[-1]
+            window = np.zeros(last_start + len(prepared[last_index]), dtype=np.float32)
+            for index, start in pack:
+                window[start:start + len(prepared[index])] = prepared[index]
+            windows.append(window)
+        
+        clip_segments: List[List[TranscriptionSegment]] = [[] for _ in prepared]
+        half_guard = guard_duration / 2
+        redecode = set()
+        
+        for batch_start in range(0, len(windows), batch_size):
+            batch_windows = windows[batch_start:batch_start + batch_size]
+            batch_packs = packs[batch_start:batch_start + batch_size]
+            batch_segments = self.decode_window_batch(batch_windows, language=language)
+            
+            for pack, segments in zip(batch_packs, batch_segments):
+                for seg in segments:
+                    touched = []
+                    for index, start in pack:
+                        clip_start = start / 16000
+                        clip_end = clip_start + len(prepared[index]) / 16000
+                        overlap = min(seg.end, clip_end) - max(seg.start, clip_start)
+                        if overlap > PACK_BOUNDARY_TOLERANCE:
+                            touched.append(index)
+                    
+                    # Klip chegarasini kesib o'tgan segment
+                    if len(touched) > 1:
+                        redecode.update(touched)
+                        continue
+                    
+                    middle = (seg.start + seg.end) / 2
+                    for index, start in pack:
+                        clip_start = start / 16000
+                        clip_duration = len(prepared[index]) / 16000
+                        if touched and index != touched[0]:
+                            continue
+                        if touched or clip_start - half_guard <= middle < clip_start + clip_duration + half_guard:
+                            seg.start = min(max(seg.start - clip_start, 0.0), clip_duration)
+                            seg.end = min(max(seg.end - clip_start, seg.start), clip_duration)
+                            clip_segments[index].append(seg)
+                            break
+        
+        if redecode:
+            print(f"  • Chegarani kesib o'tgan segmentlar: {len(redecode)} klip alohida qayta decode qilinadi")
+            indices = sorted(redecode)
+            for batch_start in range(0, len(indices), batch_size):
+                batch_indices = indices[batch_start:batch_start + batch_size]
+                batch_segments = self.decode_window_batch(
+                    [prepared[index] for index in batch_indices],
+                    language=language
+                )
+                for index, segments in zip(batch_indices, batch_segments):
+                    clip_segments[index] = segments
+        
+        for index in oversized:
+            clip_segments[index] = self.transcribe_auto(
+                prepared[index],
+                sample_rate=16000,
+                language=language
+            )
+        
+        print(f"✅ Joylangan transkripsiya tugallandi: {len(prepared)} klip, {len(packs)} oyna")
+        
+        return clip_segments
+    
+    def decode_window_batch(
+        self,
+        chunks: List[np.ndarray],
+        language: Optional[str] = None,
+        task: str = 'transcribe'
+    ) -> List[List[TranscriptionSegment]]:
+        """
+        <= 30 soniyalik 16 kHz oynalarni bitta batch qilib decode qilish
+        
+        Encoder va greedy decoder barcha oynalar uchun bitta batch tensor
+        bilan ishlaydi. Batch decode openai-whisper ichki API'siga tayanadi;
+        boshqa backend'lar oynalarni birma-bir transkripsiya qiladi.
+        
+        Preset temperature fallback'ni talab qilsa, sifat chegarasidan
+        o'tmagan oynalar (_decode_failed) preset parametrlari bilan alohida
+        qayta decode qilinadi - natija padded yo'l bilan bir xil mezonda.
+        Nutqsiz oynalar (_is_silent) uchun bo'sh ro'yxat qaytariladi.
+        
+        Args:
+            chunks (List[np.ndarray]): Oynalar (16 kHz float32)
+            language (str, optional): Til kodi
+            task (str): 'transcribe' yoki 'translate'. Default: 'transcribe'
+            
+        Returns:
+            List[List[TranscriptionSegment]]: Har bir oyna uchun segmentlar
+                (vaqtlar oyna boshiga nisbatan)
+        """
+        self.load_model()
+        
+        if language is None:
+            language = self.language
+        
+        if self.backend_name != 'whisper':
+            batch_segments = []
+            for chunk in chunks:
+                result = self.backend.transcribe(
+                    self.model,
+                    chunk,
+                    language=language,
+                    task=task,
+                    **self._backend_decode_options()
+                )
+                window_length = len(chunk) / 16000
+                segments = self._result_to_segments(result)
+                for seg in segments:
+                    seg.end = min(seg.end, window_length)
+                batch_segments.append(segments)
+            return batch_segments
+        
+        tokenizer = whisper.tokenizer.get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=getattr(self.model, 'num_languages', 99),
+            language=language,
+            task=task
+        )
+        options = whisper.DecodingOptions(
+            task=task,
+            language=language,
+            temperature=0.0,
+            beam_size=self.decode_options.get('beam_size'),
+            without_timestamps=False,
+            fp16=self._backend_decode_options()['fp16']
+        )
+        n_mels = self.model.dims.n_mels
+        
+        mels = [
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(np.asarray(chunk, dtype=np.float32))),
+                n_mels=n_mels
+            )
+            for chunk in chunks
+        ]
+        mel_batch = torch.stack(mels).to(self.model.device)
+        
+        with torch.no_grad(), self._decoding():
+            results = whisper.decode(self.model, mel_batch, options)
+        
+        fallback = isinstance(self.decode_options.get('temperature'), (tuple, list))
+        batch_segments = []
+        for chunk, result in zip(chunks, results):
+            window_length = len(chunk) / 16000
+            
+            # Nutqsiz oyna (whisper.transcribe kabi matn tashlanadi)
+            if self._is_silent(
+                result,
+                self.decode_options.get('logprob_threshold', LOGPROB_THRESHOLD),
+                self.decode_options.get('no_speech_threshold', NO_SPEECH_THRESHOLD)
+            ):
+                batch_segments.append([])
+                continue
+            
+            if fallback and self._decode_failed(
+                result,
+                self.decode_options.get('compression_ratio_threshold', COMPRESSION_RATIO_THRESHOLD),
+                self.decode_options.get('logprob_threshold', LOGPROB_THRESHOLD),
+                self.decode_options.get('no_speech_threshold', NO_SPEECH_THRESHOLD)
+            ):
+                with self._decoding():
+                    retry = self.backend.transcribe(
+                        self.model,
+                        chunk,
+                        language=language,
+                        task=task,
+                        **self._backend_decode_options()
+                    )
+                segments = self._result_to_segments(retry)
+                for seg in segments:
+                    seg.end = min(seg.end, window_length)
+                batch_segments.append(segments)
+                continue
+            
+            batch_segments.append(
+                self._tokens_to_segments(
+                    result,
+                    tokenizer,
+                    offset=0.0,
+                    window_length=window_length
+                )
+            )
+        
+        return batch_segments
+    
+    @staticmethod
+    def _is_silent(
+        result,
+        logprob_threshold: Optional[float] = LOGPROB_THRESHOLD,
+        no_speech_threshold: Optional[float] = NO_SPEECH_THRESHOLD
+    ) -> bool:
+        """whisper.transcribe mezoni: oyna nutqsiz deb hisoblanadimi"""
+        if no_speech_threshold is None or result.no_speech_prob <= no_speech_threshold:
+            return False
+        return logprob_threshold is None or result.avg_logprob < logprob_threshold
+    
+    @staticmethod
+    def _decode_failed(
+        result,
+        compression_ratio_threshold: Optional[float] = COMPRESSION_RATIO_THRESHOLD,
+        logprob_threshold: Optional[float] = LOGPROB_THRESHOLD,
+        no_speech_threshold: Optional[float] = NO_SPEECH_THRESHOLD
+    ) -> bool:
+        """
+        whisper.transcribe mezoni: oyna natijasi keyingi temperature bilan
+        qayta decode talab qiladimi (nutqsiz oynalar bundan mustasno)
+        """
+        if WhisperTranscriber._is_silent(result, logprob_threshold, no_speech_threshold):
+            return False
+        if compression_ratio_threshold is not None and result.compression_ratio > compression_ratio_threshold:
+            return True
+        return logprob_threshold is not None and result.avg_logprob < logprob_threshold
+    
+    @staticmethod
+    def _group_speech_windows(
+        speech_segments: List[Tuple[float, float]],
+        window_duration: float = 30.0
+    ) -> List[Tuple[float, float]]:
+        """
+        Nutq intervallarini window_duration'dan oshmaydigan uzluksiz oynalarga guruhlash
+        
+        Args:
+            speech_segments (List[Tuple[float, float]]): Tartiblangan nutq intervallari
+            window_duration (float): Maksimal oyna davomiyligi (soniya)
+            
+        Returns:
+            List[Tuple[float, float]]: Oynalar (boshlanish, tugash)
+        """
+        windows = []
+        current_start = None
+        current_end = None
+        
+        for start, end in speech_segments:
+            if end <= start:
+                continue
+            
+            # Juda uzun nutq intervalini bo'laklash
+            while end - start > window_duration:
+                if current_start is not None:
+                    windows.append((current_start, current_end))
+                    current_start = None
+                windows.append((start, start + window_duration))
+                start += window_duration
+            
+            if current_start is None:
+                current_start, current_end = start, end
+            elif end - current_start <= window_duration:
+                current_end = end
+            else:
+                windows.append((current_start, current_end))
+                current_start, current_end = start, end
+        
+        if current_start is not None:
+            windows.append((current_start, current_end))
+        
+        return windows
+    
+    @staticmethod
+    def _tokens_to_segments(
+        result,
+        tokenizer,
+        offset: float,
+        window_length: float
+    ) -> List[TranscriptionSegment]:
+        """
+        DecodingResult tokenlaridagi vaqt belgilaridan segmentlar yaratish
+        
+        Args:
+            result: whisper.DecodingResult
+            tokenizer: Whisper tokenizer
+            offset (float): Oynaning audiodagi boshlanish vaqti (soniya)
+            window_length (float): Oyna davomiyligi (soniya)
+            
+        Returns:
+            List[TranscriptionSegment]: Segmentlar
+        """
+        timestamp_begin = tokenizer.timestamp_begin
+        confidence = float(np.exp(result.avg_logprob)) if np.isfinite(result.avg_logprob) else 0.0
+        
+        segments = []
+        text_tokens = []
+        segment_start = 0.0
+        
+        def add_segment(start: float, end: float):
+            text = tokenizer.decode(text_tokens).strip()
+            if text:
+                segments.append(TranscriptionSegment(
+                    text=text,
+                    start=offset + min(start, window_length),
+                    end=offset + min(max(end, start), window_length),
+                    confidence=confidence
+                ))
+        
+        for token in result.tokens:
+            if token >= timestamp_begin:
+                time = (token - timestamp_begin) * 0.02
+                if text_tokens:
+                    add_segment(segment_start, time)
+                    text_tokens = []
+                segment_start = time
+            elif token < tokenizer.eot:
+                text_tokens.append(token)
+        
+        # Yopuvchi vaqt belgisisiz qolgan matn
+        if text_tokens:
+            add_segment(segment_start, window_length)
+        
+        return segments
+    
     def transcribe_long_audio(
         self,
         audio_data: np.ndarray,
         sample_rate: int = 16000,
         chunk_duration: float = 30.0,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        align_to_silence: bool = True,
+        search_window: float = 5.0
     ) -> List[TranscriptionSegment]:
         """
         Uzun audiodni bo'laklarga bo'lib transkripsiya qilish
         
+        align_to_silence=True bo'lsa bo'lak chegaralari maqsadli uzunlikka
+        yaqin eng jim joyga qo'yiladi, shuning uchun overlap kerak emas va
+        so'zlar o'rtasidan kesilmaydi. Aks holda eski rejim: qat'iy chegaralar
+        va 1 soniyalik overlap (takroriy segmentlar olib tashlanadi).
+        
         Args:
             audio_data (np.ndarray): Audio ma'lumotlar
             sample_rate (int): Sample rate. Default: 16000
             chunk_duration (float): Bo'lak davomiyligi (soniya). Default: 30.0
             language (str, optional): Til kodi
+            align_to_silence (bool): Chegaralarni sukutga moslash. Default: True
+            search_window (float): Chegara qidiriladigan oraliq (soniya,
+                maqsadli uzunlikdan oldin). Default: 5.0
             
         Returns:
             List[TranscriptionSegment]: Segmentlar ro'yxati
         """
+        audio_data = np.asarray(audio_data)
         total_duration = len(audio_data) / sample_rate
         
         print(f"\n📊 Uzun audio transkripsiyasi:")
         print(f"  • Umumiy davomiylik: {total_duration:.2f} soniya")
         print(f"  • Bo'lak davomiyligi: {chunk_duration:.2f} soniya")
+        print(f"  • Sukutga moslangan chegaralar: {'✅' if align_to_silence else '❌'}")
         
         # Bo'laklarga ajratish
-        chunk_samples = int(chunk_duration * sample_rate)
-        overlap_samples = int(1.0 * sample_rate)  # 1 soniyalik overlap
+        if align_to_silence:
+            boundaries = self._find_silence_boundaries(
+                audio_data,
+                sample_rate,
+                chunk_duration,
+                search_window
+            )
+            chunks = list(zip(boundaries[:-1], boundaries[1:]))
+        else:
+            chunk_samples = int(chunk_duration * sample_rate)
+            step_samples = int((chunk_duration - 1.0) * sample_rate)  # 1 soniyalik overlap
+            chunks = [
+                (start, min(start + chunk_samples, len(audio_data)))
+                for start in range(0, len(audio_data), step_samples)
+            ]
         
         all_segments = []
-        offset = 0.0
-        chunk_num = 0
+        last_end = 0.0
         
-        while offset * sample_rate < len(audio_data):
-            chunk_num += 1
-            start_sample = int(offset * sample_rate)
-            end_sample = min(start_sample + chunk_samples, len(audio_data))
-            
+        for chunk_num, (start_sample, end_sample) in enumerate(chunks, 1):
+            offset = start_sample / sample_rate
             chunk_audio = audio_data[start_sample:end_sample]
             
-            print(f"\n🔄 Bo'lak {chunk_num} transkripsiya qilinmoqda...")
+            print(f"\n🔄 Bo'lak {chunk_num}/{len(chunks)} transkripsiya qilinmoqda...")
             
             # Transkripsiya
             segments = self.transcribe_with_timestamps(
@@ -247,15 +1182,631 @@ class WhisperTranscriber:
             for seg in segments:
                 seg.start += offset
                 seg.end += offset
+                
+                # Overlap qismida qayta transkripsiya qilingan segmentlarni tashlash
+                if not align_to_silence and seg.start < last_end:
+                    continue
+                
                 all_segments.append(seg)
             
-            # Keyingi bo'lakka o'tish (overlap bilan)
-            offset += (chunk_duration - 1.0)
+            if all_segments:
+                last_end = max(last_end, all_segments[-1].end)
         
         print(f"\n✅ Umumiy {len(all_segments)} ta segment yaratildi")
         
         return all_segments
     
+    @staticmethod
+    def _find_silence_boundaries(
+        audio_data: np.ndarray,
+        sample_rate: int,
+        chunk_duration: float = 30.0,
+        search_window: float = 5.0,
+        frame_duration: float = 0.03
+    ) -> List[int]:
+        """
+        Bo'lak chegaralarini maqsadli uzunlikka yaqin eng jim frame'larga qo'yish
+        
+        RMS energiya butun audio uchun bir marta (vektorlashtirilgan) hisoblanadi,
+        keyin har bir chegara [maqsad - search_window, maqsad] oralig'idagi
+        eng past energiyali frame markaziga qo'yiladi.
+        
+        Returns:
+            List[int]: Chegaralar (sample), 0 va len(audio_data) bilan
+        """
+        total = len(audio_data)
+        chunk_samples = int(chunk_duration * sample_rate)
+        frame = max(1, int(frame_duration * sample_rate))
+        
+        if total <= chunk_samples:
+            return [0, total]
+        
+        n_frames = total // frame
+        frames = audio_data[:n_frames * frame].reshape(n_frames, frame).astype(np.float32)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        
+        search_frames = max(1, int(search_window * sample_rate) // frame)
+        boundaries = [0]
+        
+        while total - boundaries[-1] > chunk_samples:
+            target_frame = (boundaries[-1] + chunk_samples) // frame
+            low = max(target_frame - search_frames, boundaries[-1] // frame + 1)
+            high = min(target_frame, n_frames)
+            
+            if high > low:
+                best = low + int(np.argmin(rms[low:high]))
+                cut = best * frame + frame // 2
+            else:
+                cut = boundaries[-1] + chunk_samples
+            
+            boundaries.append(min(cut, total))
+        
+        boundaries.append(total)
+        return boundaries
+    
+    def transcribe_auto(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        long_audio_threshold: float = 300.0,
+        speech_segments: Optional[List[Tuple[float, float]]] = None
+    ) -> List[TranscriptionSegment]:
+        """
+        Audio uzunligiga qarab transkripsiya rejimini tanlash
+        
+        long_audio_threshold'dan uzun audio sukutga moslangan bo'laklar
+        bilan (transcribe_long_audio), qisqasi to'g'ridan-to'g'ri
+        transkripsiya qilinadi. speculative_draft berilgan bo'lsa har doim
+        transcribe_speculative ishlatiladi - u ham audio uzunligidan qat'i
+        nazar sukut chegaralaridagi oynalar bilan ishlaydi va keshlanadi
+        (preset mosligi __init__ da tekshiriladi).
+        
+        Args:
+            audio_data (np.ndarray): Audio ma'lumotlar
+            sample_rate (int): Sample rate. Default: 16000
+            language (str, optional): Til kodi
+            long_audio_threshold (float): Uzun audio chegarasi (soniya). Default: 300.0
+            speech_segments (List[Tuple[float, float]], optional): VAD nutq
+                intervallari - runaway guard yoqilgan bo'lsa faqat nutqli
+                oynalar decode qilinadi (transcribe_gated)
+            
+        Returns:
+            List[TranscriptionSegment]: Segmentlar ro'yxati
+        """
+        if self.speculative_draft:
+            return self.transcribe_speculative(
+                audio_data,
+                sample_rate=sample_rate,
+                language=language
+            )
+        
+        if speech_segments is not None and self.guard is not None:
+            return self.transcribe_gated(
+                audio_data,
+                speech_segments,
+                sample_rate=sample_rate,
+                language=language
+            )
+        
+        if len(audio_data) / sample_rate > long_audio_threshold:
+            return self.transcribe_long_audio(
+                audio_data,
+                sample_rate=sample_rate,
+                language=language,
+                align_to_silence=True
+            )
+        
+        return self.transcribe_with_timestamps(
+            audio_data,
+            sample_rate=sample_rate,
+            language=language
+        )
+    
+    def transcribe_gated(
+        self,
+        audio_data: np.ndarray,
+        speech_segments: List[Tuple[float, float]],
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        window_duration: float = 30.0
+    ) -> List[TranscriptionSegment]:
+        """
+        Faqat VAD nutq oynalarini transkripsiya qilish
+        
+        Nutq intervallari window_duration'dan oshmaydigan oynalarga
+        guruhlanadi; nutq tushmagan qismlar (musiqa, shovqin, sukut)
+        decoder'ga umuman berilmaydi. O'tkazib yuborilgan oynalar
+        (audio window_duration to'rida nutqsiz oynalar) guard
+        statistikasiga yoziladi.
+        
+        Args:
+            audio_data (np.ndarray): Audio ma'lumotlar
+            speech_segments (List[Tuple[float, float]]): Nutq intervallari (soniya)
+            sample_rate (int): Sample rate. Default: 16000
+            language (str, optional): Til kodi
+            window_duration (float): Oyna davomiyligi (soniya). Default: 30.0
+            
+        Returns:
+            List[TranscriptionSegment]: Segmentlar ro'yxati
+        """
+        # Faqat oynalar kesiladi - SegmentedAudio materialize qilinmaydi
+        total_duration = len(audio_data) / sample_rate
+        windows = self._group_speech_windows(speech_segments, window_duration)
+        
+        covered = set()
+        for start, end in windows:
+            covered.update(range(int(start // window_duration), int(np.ceil(end / window_duration))))
+        n_grid = int(np.ceil(total_duration / window_duration))
+        skipped = max(n_grid - len(covered), 0)
+        if self.guard is not None:
+            self.guard.count('vad_skipped_windows', skipped)
+        
+        print(f"\n🛡️ VAD bo'yicha transkripsiya: {len(windows)} nutq oynasi, "
+              f"{skipped} ta nutqsiz oyna o'tkazib yuborildi")
+        
+        all_segments = []
+        for start, end in windows:
+            start_sample, end_sample = int(start * sample_rate), int(end * sample_rate)
+            segments = self.transcribe_with_timestamps(
+                audio_data[start_sample:end_sample],
+                sample_rate=sample_rate,
+                language=language
+            )
+            for seg in segments:
+                seg.start += start
+                seg.end = min(seg.end + start, end)
+            all_segments.extend(segments)
+        
+        return all_segments
+    
+    def transcribe_speculative(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        task: str = 'transcribe',
+        window_duration: float = 30.0,
+        use_cache: bool = True
+    ) -> List[TranscriptionSegment]:
+        """
+        Speculative decoding bilan transkripsiya (greedy, temperature=0)
+        
+        Audio sukutga moslangan oynalarga bo'linadi; har bir oynada draft
+        model tokenlarni taklif qiladi, target model (shu transcriber modeli)
+        ularni bitta forward'da tekshiradi. Tokenlar target model greedy
+        natijasiga aynan teng. Temperature fallback qo'llanmaydi.
+        
+        Uzun audio uchun alohida rejim kerak emas: oynalar har doim sukut
+        chegaralarida (<= window_duration) kesiladi. Natija transkripsiya
+        keshida speculative rejim belgisi bilan saqlanadi.
+        
+        Args:
+            audio_data (np.ndarray): Audio ma'lumotlar
+            sample_rate (int): Sample rate. Default: 16000
+            language (str, optional): Til kodi
+            task (str): 'transcribe' yoki 'translate'. Default: 'transcribe'
+            window_duration (float): Oyna davomiyligi (soniya). Default: 30.0
+            use_cache (bool): Transkripsiya keshidan foydalanish. Default: True
+            
+        Returns:
+            List[TranscriptionSegment]: Segmentlar ro'yxati
+        """
+        if self.speculative_draft is None:
+            raise ValueError("speculative_draft berilmagan")
+        
+        if language is None:
+            language = self.language
+        
+        audio_data = np.asarray(audio_data)
+        if sample_rate != 16000:
+            import librosa
+            audio_data = librosa.resample(audio_data, orig_sr=sample_rate, target_sr=16000)
+            sample_rate = 16000
+        audio_data = audio_data.astype(np.float32)
+        
+        cache_key = None
+        if self.cache is not None and use_cache:
+            params = self._cache_params(language, task)
+            params['mode'] = 'speculative'
+            params['window_duration'] = window_duration
+            cache_key = self.cache.make_key(audio_fingerprint(audio_data), params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ Transkripsiya keshdan olindi ({len(cached.get('segments', []))} segment)")
+                return self._result_to_segments(cached)
+        
+        self.load_model()
+        draft = WhisperTranscriber(
+            model_name=self.speculative_draft,
+            device=self.device,
+            language=language,
+            precision=self.precision,
+            use_registry=self.use_registry,
+            use_cache=False,
+            encoder_cache=self.encoder_cache
+        )
+        draft.load_model()
+        
+        boundaries = self._find_silence_boundaries(audio_data, sample_rate, window_duration)
+        windows = list(zip(boundaries[:-1], boundaries[1:]))
+        
+        print(f"\n⚡ Speculative decoding: {self.speculative_draft} -> {self.model_name}")
+        print(f"  • Oynalar soni: {len(windows)}")
+        
+        totals = {'proposed': 0, 'accepted': 0, 'target_forwards': 0, 'draft_forwards': 0, 'generated': 0}
+        all_segments = []
+        
+        try:
+            decoder = SpeculativeDecoder(
+                self.model,
+                draft.model,
+                language=language,
+                task=task,
+                draft_tokens=self.speculative_tokens
+            )
+            
+            with self._decoding(), draft._decoding():
+                for start_sample, end_sample in windows:
+                    result = decoder.decode(audio_data[start_sample:end_sample])
+                    for key in totals:
+                        totals[key] += result.stats[key]
+                    
+                    all_segments.extend(
+                        self._tokens_to_segments(
+                            result,
+                            decoder.tokenizer,
+                            offset=start_sample / sample_rate,
+                            window_length=(end_sample - start_sample) / sample_rate
+                        )
+                    )
+        finally:
+            draft.release_model()
+        
+        totals['acceptance_rate'] = totals['accepted'] / totals['proposed'] if totals['proposed'] else 0.0
+        self.speculative_stats = totals
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, {
+                'text': ' '.join(seg.text for seg in all_segments),
+                'language': language,
+                'segments': [
+                    {'text': seg.text, 'start': seg.start, 'end': seg.end, 'confidence': seg.confidence}
+                    for seg in all_segments
+                ]
+            })
+        
+        print(f"✅ Speculative decoding tugadi: {totals['generated']} token, "
+              f"{totals['target_forwards']} target forward, "
+              f"qabul: {totals['acceptance_rate']:.0%}")
+        
+        return all_segments
+    
+    def transcribe_cascade(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        draft_model: str = 'tiny',
+        window_duration: float = 30.0,
+        logprob_threshold: float = -0.8,
+        compression_ratio_threshold: float = 2.4,
+        no_speech_threshold: float = 0.6,
+        completed_windows: Optional[Dict[int, Tuple[List[TranscriptionSegment], Dict]]] = None,
+        on_window: Optional[Callable[[int, List[TranscriptionSegment], Dict], None]] = None
+    ) -> Tuple[List[TranscriptionSegment], Dict]:
+        """
+        Kaskad transkripsiya: har bir oyna avval kichik (draft) model bilan
+        decode qilinadi, faqat ishonchsiz oynalar shu transcriber modeli
+        (masalan medium/large) bilan qayta decode qilinadi
+        
+        Oyna ishonchsiz hisoblanadi, agar:
+            - segmentlarning (davomiylik bo'yicha o'rtacha) avg_logprob'i
+              logprob_threshold'dan past bo'lsa
+            - biror segmentning compression_ratio'si
+              compression_ratio_threshold'dan yuqori bo'lsa (takrorlanish)
+            - no_speech_prob no_speech_threshold'dan yuqori bo'lsa-yu,
+              model baribir matn chiqargan bo'lsa (gallyutsinatsiya)
+        
+        Args:
+            audio_data (np.ndarray): Audio ma'lumotlar
+            sample_rate (int): Sample rate. Default: 16000
+            language (str, optional): Til kodi
+            draft_model (str): Birinchi bosqich modeli. Default: 'tiny'
+            window_duration (float): Oyna davomiyligi (soniya). Default: 30.0
+            logprob_threshold (float): avg_logprob chegarasi. Default: -0.8
+            compression_ratio_threshold (float): Default: 2.4
+            no_speech_threshold (float): Default: 0.6
+            completed_windows (Dict, optional): Avval tugagan oynalar - oyna
+                raqami -> (segmentlar, on_window info) (checkpoint'dan davom ettirish)
+            on_window (Callable, optional): Har bir oyna tugagach
+                (oyna raqami, segmentlar, {'escalated': sabab yoki None})
+            
+        Returns:
+            Tuple[List[TranscriptionSegment], Dict]: Segmentlar va kaskad
+                metadata (oynalar, eskalatsiya soni va ulushi)
+        """
+        if language is None:
+            language = self.language
+        
+        audio_data = np.asarray(audio_data)
+        if sample_rate != 16000:
+            import librosa
+            audio_data = librosa.resample(audio_data, orig_sr=sample_rate, target_sr=16000)
+            sample_rate = 16000
+        audio_data = audio_data.astype(np.float32)
+        
+        draft = WhisperTranscriber(
+            model_name=draft_model,
+            device=self.device,
+            language=language,
+            precision=self.precision,
+            use_registry=self.use_registry,
+            backend=self.backend_name,
+            use_cache=self.cache is not None,
+            cache=self.cache,
+            preset=self.preset,
+            encoder_cache=self.encoder_cache,
+            variable_length_max=self.variable_length_max,
+            runaway_guard=self.guard is not None
+        )
+        
+        boundaries = self._find_silence_boundaries(audio_data, sample_rate, window_duration)
+        windows = list(zip(boundaries[:-1], boundaries[1:]))
+        
+        print(f"\n🪜 Kaskad transkripsiya: {draft_model} -> {self.model_name}")
+        print(f"  • Oynalar soni: {len(windows)}")
+        
+        all_segments = []
+        escalated = []
+        
+        completed_windows = completed_windows or {}
+        if completed_windows:
+            print(f"  • Checkpoint: {len(completed_windows)} oyna tayyor")
+        
+        try:
+            for index, (start_sample, end_sample) in enumerate(windows):
+                offset = start_sample / sample_rate
+                chunk = audio_data[start_sample:end_sample]
+                
+                if index in completed_windows:
+                    segments, info = completed_windows[index]
+                    all_segments.extend(segments)
+                    if info.get('escalated'):
+                        escalated.append({'window': index, 'start': offset, 'reason': info['escalated']})
+                    continue
+                
+                result = draft.transcribe_audio(chunk, sample_rate=sample_rate, language=language)
+                reason = self._cascade_escalation_reason(
+                    result.get('segments', []),
+                    logprob_threshold,
+                    compression_ratio_threshold,
+                    no_speech_threshold
+                )
+                
+                if reason is not None:
+                    print(f"  ⬆️ Oyna {index + 1}: {reason} -> {self.model_name}")
+                    result = self.transcribe_audio(chunk, sample_rate=sample_rate, language=language)
+                    escalated.append({'window': index, 'start': offset, 'reason': reason})
+                
+                segments = self._result_to_segments(result)
+                for seg in segments:
+                    seg.start += offset
+                    seg.end = min(seg.end + offset, end_sample / sample_rate)
+                all_segments.extend(segments)
+                
+                if on_window is not None:
+                    on_window(index, segments, {'escalated': reason})
+        finally:
+            draft.release_model()
+        
+        metadata = {
+            'draft_model': draft_model,
+            'model': self.model_name,
+            'windows': len(windows),
+            'escalated': len(escalated),
+            'escalation_rate': len(escalated) / len(windows) if windows else 0.0,
+            'escalated_windows': escalated,
+        }
+        
+        print(f"✅ Kaskad tugadi: {len(escalated)}/{len(windows)} oyna eskalatsiya qilindi")
+        
+        return all_segments, metadata
+    
+    @staticmethod
+    def _cascade_escalation_reason(
+        segments: List[Dict],
+        logprob_threshold: float,
+        compression_ratio_threshold: float,
+        no_speech_threshold: float
+    ) -> Optional[str]:
+        """Draft oyna natijasi ishonchsiz bo'lsa sababini qaytarish (aks holda None)"""
+        texts = [seg for seg in segments if seg.get('text', '').strip()]
+        if not texts:
+            return None
+        
+        # Metrikalar bo'lmasa (masalan fake/onnx backend) eskalatsiya qilinmaydi
+        weighted = [
+            (seg['avg_logprob'], max(seg['end'] - seg['start'], 1e-3))
+            for seg in texts if seg.get('avg_logprob') is not None
+        ]
+        if weighted:
+            total = sum(weight for _, weight in weighted)
+            avg_logprob = sum(value * weight for value, weight in weighted) / total
+            if avg_logprob < logprob_threshold:
+                return f"avg_logprob {avg_logprob:.2f}"
+        
+        for seg in texts:
+            ratio = seg.get('compression_ratio')
+            if ratio is not None and ratio > compression_ratio_threshold:
+                return f"compression_ratio {ratio:.2f}"
+            no_speech = seg.get('no_speech_prob')
+            if no_speech is not None and no_speech > no_speech_threshold:
+                return f"no_speech_prob {no_speech:.2f}"
+        
+        return None
+    
+    def transcribe_with_deadline(
+        self,
+        audio_data: np.ndarray,
+        sample_rate: int = 16000,
+        deadline_seconds: float = 60.0,
+        language: Optional[str] = None,
+        window_duration: float = 30.0,
+        completed_windows: Optional[Dict[int, Tuple[List[TranscriptionSegment], Dict]]] = None,
+        on_window: Optional[Callable[[int, List[TranscriptionSegment], Dict], None]] = None
+    ) -> Tuple[List[TranscriptionSegment], Dict]:
+        """
+        Berilgan vaqtga sig'adigan eng katta model bilan transkripsiya
+        
+        Model RTF jadvali (get_rtf_table) bo'yicha tanlanadi: shu transcriber
+        modeli eng katta nomzod, undan kichiklari zaxira. Audio sukutga
+        moslangan oynalarga bo'linadi; har bir oynadan oldin qolgan audio
+        joriy model bilan qolgan vaqtga sig'masa, qolgan oynalar kichikroq
+        modelga o'tkaziladi (model faqat kichrayadi).
+        
+        Args:
+            audio_data (np.ndarray): Audio ma'lumotlar
+            sample_rate (int): Sample rate. Default: 16000
+            deadline_seconds (float): Transkripsiya uchun vaqt (soniya)
+            language (str, optional): Til kodi
+            window_duration (float): Oyna davomiyligi (soniya). Default: 30.0
+            completed_windows (Dict, optional): Avval tugagan oynalar - oyna
+                raqami -> (segmentlar, on_window info) (checkpoint'dan davom ettirish)
+            on_window (Callable, optional): Har bir oyna tugagach
+                (oyna raqami, segmentlar, {'model': ishlatilgan model})
+            
+        Returns:
+            Tuple[List[TranscriptionSegment], Dict]: Segmentlar va metadata
+                (rejalashtirilgan model, oraliqlar bo'yicha ishlatilgan
+                modellar, sarflangan vaqt)
+        """
+        started = time.perf_counter()
+        
+        if language is None:
+            language = self.language
+        
+        audio_data = np.asarray(audio_data)
+        if sample_rate != 16000:
+            import librosa
+            audio_data = librosa.resample(audio_data, orig_sr=sample_rate, target_sr=16000)
+            sample_rate = 16000
+        audio_data = audio_data.astype(np.float32)
+        
+        table = get_rtf_table()
+        candidates = self.AVAILABLE_MODELS[:self.AVAILABLE_MODELS.index(self.model_name) + 1]
+        table_args = (self.precision, self.backend_name, self.device)
+        
+        total_seconds = len(audio_data) / sample_rate
+        planned = table.choose_model(total_seconds, deadline_seconds, candidates, *table_args)
+        current = planned
+        
+        boundaries = self._find_silence_boundaries(audio_data, sample_rate, window_duration)
+        windows = list(zip(boundaries[:-1], boundaries[1:]))
+        
+        print(f"\n⏱️ Deadline transkripsiya: {deadline_seconds:.0f}s, audio {total_seconds:.0f}s")
+        print(f"  • Rejalashtirilgan model: {planned} "
+              f"(taxminan {table.estimate_rtf(planned, *table_args) * total_seconds:.0f}s)")
+        
+        transcribers = {self.model_name: self}
+        usage: List[Dict] = []
+        all_segments = []
+        completed_windows = completed_windows or {}
+        if completed_windows:
+            print(f"  • Checkpoint: {len(completed_windows)} oyna tayyor")
+        
+        try:
+            for index, (start_sample, end_sample) in enumerate(windows):
+                offset = start_sample / sample_rate
+                
+                # Checkpoint'dan: model avval tanlangan joydan kichrayishda davom etadi
+                if index in completed_windows:
+                    segments, info = completed_windows[index]
+                    all_segments.extend(segments)
+                    if info.get('model') in candidates:
+                        current = min(current, info['model'], key=candidates.index)
+                    self._record_usage(usage, info.get('model', current), offset, end_sample / sample_rate)
+                    continue
+                
+                remaining_audio = (len(audio_data) - start_sample) / sample_rate
+                remaining_time = deadline_seconds - (time.perf_counter() - started)
+                
+                # Ortda qolinsa qolgan oynalar kichikroq modelga o'tadi
+                if current != candidates[0]:
+                    needed = table.estimate_rtf(current, *table_args) * remaining_audio
+                    if needed > remaining_time:
+                        smaller = candidates[:candidates.index(current)]
+                        downgrade = table.choose_model(remaining_audio, remaining_time, smaller, *table_args)
+                        print(f"  ⬇️ {offset:.0f}s: {current} -> {downgrade} "
+                              f"(kerak ~{needed:.0f}s, qoldi {max(remaining_time, 0):.0f}s)")
+                        current = downgrade
+                
+                transcriber = transcribers.get(current)
+                if transcriber is None:
+                    transcriber = WhisperTranscriber(
+                        model_name=current,
+                        device=self.device,
+                        language=language,
+                        precision=self.precision,
+                        use_registry=self.use_registry,
+                        backend=self.backend_name,
+                        use_cache=self.cache is not None,
+                        cache=self.cache,
+                        preset=self.preset,
+                        encoder_cache=self.encoder_cache,
+                        variable_length_max=self.variable_length_max,
+                        runaway_guard=self.guard is not None
+                    )
+                    transcribers[current] = transcriber
+                
+                segments = transcriber.transcribe_with_timestamps(
+                    audio_data[start_sample:end_sample],
+                    sample_rate=sample_rate,
+                    language=language
+                )
+                for seg in segments:
+                    seg.start += offset
+                    seg.end = min(seg.end + offset, end_sample / sample_rate)
+                all_segments.extend(segments)
+                
+                self._record_usage(usage, current, offset, end_sample / sample_rate)
+                if on_window is not None:
+                    on_window(index, segments, {'model': current})
+        finally:
+            for name, transcriber in transcribers.items():
+                if name != self.model_name:
+                    transcriber.release_model()
+        
+        elapsed = time.perf_counter() - started
+        metadata = {
+            'deadline_seconds': deadline_seconds,
+            'requested_model': self.model_name,
+            'planned_model': planned,
+            'models': usage,
+            'elapsed_seconds': round(elapsed, 2),
+            'deadline_met': elapsed <= deadline_seconds,
+        }
+        
+        print(f"✅ Deadline transkripsiya tugadi: {elapsed:.1f}s "
+              f"({'✅ vaqtida' if metadata['deadline_met'] else '⚠️ kechikdi'}), "
+              f"modellar: {', '.join(part['model'] for part in usage)}")
+        
+        return all_segments, metadata
+    
+    @staticmethod
+    def _record_usage(usage: List[Dict], model: str, start: float, end: float):
+        """Deadline metadata: ketma-ket bir xil model oynalarini bitta oraliqqa qo'shish"""
+        if usage and usage[-1]['model'] == model:
+            usage[-1]['end'] = end
+            usage[-1]['windows'] += 1
+        else:
+            usage.append({
+                'model': model,
+                'start': start,
+                'end': end,
+                'windows': 1,
+            })
+    
     def get_full_text(self, segments: List[TranscriptionSegment]) -> str:
         """
         Segmentlardan to'liq matnni olish
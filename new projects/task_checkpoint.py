@@ -0,0 +1,222 @@
+"""
+Task Checkpoint
+===============
+Uzoq davom etadigan qayta ishlash task'larining oraliq natijalarini task
+papkasiga yozish va qayta ishga tushirilganda davom ettirish
+
+Task papkasidagi checkpoint/ tuzilmasi:
+    manifest.json        - fayl yo'li, sozlamalar, audio xeshi, holat
+                           (completed / failed + xato matni)
+    <kind>.jsonl         - tugagan bo'laklar (har qatorda bitta bo'lak),
+                           masalan transcript.jsonl, emotion.jsonl
+    <stage>.json         - to'liq tugagan bosqich natijasi (diarization.json)
+
+Bo'laklar fayl oxiriga qo'shiladi va fsync qilinadi: worker o'rtada
+o'lsa ko'pi bilan oxirgi (yarim yozilgan) qator yo'qoladi - u keyingi
+yozishdan oldin kesib tashlanadi, o'qishda esa o'tkazib yuboriladi. Audio xeshi
+mos kelmasa (boshqa preprocessing natijasi) eski bo'laklar tashlanadi.
+"""
+
+import os
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class TaskCheckpoint:
+    """
+    Bitta task uchun checkpoint papkasi
+    """
+
+    def __init__(self, task_dir: str):
+        """
+        Args:
+            task_dir (str): Task natijalari papkasi (OUTPUT_DIR/<task_id>)
+        """
+        self.dir = os.path.join(task_dir, 'checkpoint')
+        self.manifest_path = os.path.join(self.dir, 'manifest.json')
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _write_json(self, path: str, payload):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _read_json(self, path: str):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_manifest(self) -> Optional[Dict]:
+        """Manifest (None = checkpoint hali yozilmagan)"""
+        return self._read_json(self.manifest_path)
+
+    def _update_manifest(self, **fields):
+        manifest = self.load_manifest() or {}
+        manifest.update(fields, updated_at=datetime.now().isoformat())
+        self._write_json(self.manifest_path, manifest)
+
+    def save_request(self, file_path: str, config: Dict):
+        """
+        Task'ni qayta ishga tushirish uchun kerakli ma'lumotlarni saqlash
+
+        Args:
+            file_path (str): Yuklangan fayl yo'li
+            config (Dict): ProcessingRequest maydonlari
+        """
+        manifest = self.load_manifest() or {'attempts': 0, 'created_at': datetime.now().isoformat()}
+        self._update_manifest(
+            file_path=file_path,
+            config=config,
+            completed=False,
+            failed=False,
+            error=None,
+            attempts=manifest.get('attempts', 0) + 1,
+            created_at=manifest.get('created_at')
+        )
+
+    def validate_audio(self, fingerprint: str) -> bool:
+        """
+        Checkpoint shu audio uchun yozilganini tekshirish
+
+        Xesh mos kelmasa (yoki hali yozilmagan bo'lsa) barcha bo'laklar va
+        bosqichlar o'chiriladi.
+
+        Args:
+            fingerprint (str): Qayta ishlanadigan (tozalangan) audio xeshi
+
+        Returns:
+            bool: True - oldingi natijalar saqlanib qoldi (davom ettiriladi)
+        """
+        manifest = self.load_manifest() or {}
+        if manifest.get('audio_fingerprint') == fingerprint:
+            return True
+
+        for name in os.listdir(self.dir):
+            if name.endswith('.jsonl') or (name.endswith('.json') and name != 'manifest.json'):
+                os.remove(os.path.join(self.dir, name))
+        self._update_manifest(audio_fingerprint=fingerprint)
+        return False
+
+    def commit_chunk(self, kind: str, index: int, items: List[Dict]):
+        """
+        Tugagan bo'lak natijasini yozish
+
+        Args:
+            kind (str): Natija turi ('transcript', 'emotion', ...)
+            index (int): Bo'lak tartib raqami
+            items (List[Dict]): JSON'ga yoziladigan natijalar
+        """
+        path = os.path.join(self.dir, f'{kind}.jsonl')
+        self._truncate_torn_line(path)
+        line = json.dumps({'index': index, 'items': items}, ensure_ascii=False)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _truncate_torn_line(path: str):
+        """
+        Yarim yozilgan oxirgi qatorni kesish
+
+        Oxirgi qator '\n' bilan tugamasa yangi qator unga yopishib qoladi
+        va ikkalasi ham o'qib bo'lmaydigan bo'ladi.
+        """
+        try:
+            with open(path, 'rb+') as f:
+                data = f.read()
+                if data and not data.endswith(b'\n'):
+                    f.truncate(data.rfind(b'\n') + 1)
+        except FileNotFoundError:
+            pass
+
+    def load_chunks(self, kind: str) -> Dict[int, List[Dict]]:
+        """
+        Avval tugagan bo'laklar
+
+        Returns:
+            Dict[int, List[Dict]]: Bo'lak raqami -> natijalar
+        """
+        chunks = {}
+        try:
+            with open(os.path.join(self.dir, f'{kind}.jsonl'), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Yarim yozilgan qator
+                    chunks[record['index']] = record['items']
+        except OSError:
+            pass
+        return chunks
+
+    def save_stage(self, name: str, items: List[Dict]):
+        """To'liq tugagan bosqich natijasini saqlash"""
+        self._write_json(os.path.join(self.dir, f'{name}.json'), items)
+
+    def load_stage(self, name: str) -> Optional[List[Dict]]:
+        """Bosqich natijasi (None = bosqich tugamagan)"""
+        return self._read_json(os.path.join(self.dir, f'{name}.json'))
+
+    def mark_completed(self):
+        """Task tugadi - qayta ishga tushirishda davom ettirilmaydi"""
+        self._update_manifest(completed=True)
+
+    def mark_failed(self, error: str):
+        """
+        Task xato bilan tugadi - qayta ishga tushirishda davom ettirilmaydi
+
+        Xato deterministik (buzilgan fayl, noto'g'ri sozlama) bo'lishi
+        mumkin: uni har restartda qayta ishga tushirish faqat resurs sarflaydi.
+        Jarayon o'lganda (xato yozilmagan) task davom ettiriladi.
+
+        Args:
+            error (str): Xato matni
+        """
+        self._update_manifest(failed=True, error=error)
+
+    @staticmethod
+    def find_interrupted(output_dir: str, max_attempts: int = 3) -> List[Dict]:
+        """
+        Tugallanmagan task'larni topish (server qayta ishga tushganda)
+
+        Tugagan va xato bilan yakunlangan (mark_failed) task'lar o'tkazib
+        yuboriladi - faqat jarayon o'rtada to'xtagan task'lar qaytariladi.
+
+        Args:
+            output_dir (str): Task papkalari joylashgan papka
+            max_attempts (int): Shuncha urinishdan keyin task tashlab ketiladi
+
+        Returns:
+            List[Dict]: {'task_id', 'file_path', 'config'} ro'yxati
+        """
+        interrupted = []
+        if not os.path.isdir(output_dir):
+            return interrupted
+
+        for task_id in sorted(os.listdir(output_dir)):
+            checkpoint_dir = os.path.join(output_dir, task_id, 'checkpoint')
+            if not os.path.isdir(checkpoint_dir):
+                continue
+
+            manifest = TaskCheckpoint(os.path.join(output_dir, task_id)).load_manifest()
+            if not manifest or manifest.get('completed') or manifest.get('failed'):
+                continue
+            if manifest.get('attempts', 0) >= max_attempts:
+                continue
+            if not os.path.exists(manifest.get('file_path', '')):
+                continue
+
+            interrupted.append({
+                'task_id': task_id,
+                'file_path': manifest['file_path'],
+                'config': manifest.get('config', {}),
+            })
+
+        return interrupted
@@ -0,0 +1,179 @@
+"""
+CPU Thread Budget
+=================
+Batch worker'lar, torch va BLAS/OpenMP thread pool'lari orasida CPU
+yadrolarini taqsimlash
+
+Muammo: har bir worker ichida torch, BLAS (librosa/scipy/sklearn orqali)
+va noisereduce o'z thread pool'larini yaratadi - 4 worker x N thread
+yadrolardan ko'p bo'lib ketadi (oversubscription). ThreadBudget yadrolarni
+worker'lar orasida bo'ladi.
+
+torch va BLAS/OpenMP limitlari jarayon bo'yicha umumiy (thread'ga xos
+emas), shuning uchun ular apply_process_limits() da bir marta o'rnatiladi:
+har bir operatsiya threads_per_worker thread ishlatadi, workers ta worker
+birgalikda yadrolar sonidan oshmaydi. worker_slot() faqat thread'ni o'z
+yadrolariga bog'laydi (affinity thread'ga xos).
+
+Foydalanish:
+    budget = ThreadBudget(workers=4, pin_cpus=True)
+    budget.apply_process_limits()
+    with budget.worker_slot():
+        ...  # shu thread budget.partitions[slot] yadrolarida ishlaydi
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+# BLAS/OpenMP kutubxonalari o'qiydigan muhit o'zgaruvchilari
+THREAD_ENV_VARS = [
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+]
+
+
+def available_cpus() -> List[int]:
+    """Jarayonga ruxsat etilgan CPU yadrolari ro'yxati"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def set_thread_env(threads: int):
+    """
+    BLAS/OpenMP muhit o'zgaruvchilarini o'rnatish
+
+    Faqat keyin yuklanadigan kutubxonalar va child jarayonlarga ta'sir
+    qiladi - allaqachon yuklangan numpy/torch pool'lari uchun
+    ThreadBudget.apply_process_limits() runtime limitlarni o'rnatadi.
+
+    Args:
+        threads (int): Thread'lar soni
+    """
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+
+class ThreadBudget:
+    """
+    Yadrolarni worker'lar orasida taqsimlovchi markaziy kontroller
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        total_cpus: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        pin_cpus: bool = False
+    ):
+        """
+        Args:
+            workers (int): Parallel worker'lar soni
+            total_cpus (int, optional): Ishlatiladigan yadrolar (None = barchasi)
+            threads_per_worker (int, optional): Qo'lda belgilash (None = cpus // workers)
+            pin_cpus (bool): Har bir worker'ni o'z yadrolariga bog'lash (Linux)
+        """
+        cpus = available_cpus()
+        if total_cpus is not None:
+            cpus = cpus[:max(1, total_cpus)]
+
+        self.workers = max(1, workers)
+        self.cpus = cpus
+        self.threads_per_worker = threads_per_worker or max(1, len(cpus) // self.workers)
+        self.pin_cpus = pin_cpus and hasattr(os, 'sched_setaffinity')
+
+        # Har bir slot uchun alohida yadrolar to'plami
+        self.partitions: List[List[int]] = []
+        for i in range(self.workers):
+            start = (i * self.threads_per_worker) % len(cpus)
+            self.partitions.append([
+                cpus[(start + j) % len(cpus)] for j in range(self.threads_per_worker)
+            ])
+
+        self._slots: 'queue.Queue[int]' = queue.Queue()
+        for i in range(self.workers):
+            self._slots.put(i)
+
+        self._local = threading.local()
+        self._process_limiter = None
+
+    def describe(self) -> Dict:
+        return {
+            'cpus': len(self.cpus),
+            'workers': self.workers,
+            'threads_per_worker': self.threads_per_worker,
+            'pin_cpus': self.pin_cpus,
+        }
+
+    def apply_process_limits(self):
+        """
+        Jarayon darajasidagi limitlar (asosiy thread'dan, worker'lar
+        ishga tushishidan oldin bir marta chaqiriladi)
+
+        torch intra-op va yuklangan BLAS/OpenMP pool'lari threads_per_worker
+        bilan cheklanadi va jarayon tugaguncha shunday qoladi - worker'lar
+        bir-birining limitini almashtirmaydi yoki tiklamaydi.
+        """
+        threads = self.threads_per_worker
+
+        # Child jarayonlar (ffmpeg va h.k.) va keyin yuklanadigan kutubxonalar uchun
+        set_thread_env(threads)
+
+        try:
+            import torch
+            torch.set_num_threads(threads)
+            # Inter-op pool faqat ishga tushmasdan oldin sozlanadi
+            torch.set_num_interop_threads(1)
+        except (ImportError, RuntimeError):
+            pass
+
+        try:
+            from threadpoolctl import threadpool_limits
+            self._process_limiter = threadpool_limits(limits=threads)
+        except ImportError:
+            self._process_limiter = None
+
+    @contextmanager
+    def worker_slot(self):
+        """
+        Joriy thread'ni bitta worker slotiga bog'lash
+
+        Bir vaqtda ko'pi bilan workers ta slot band bo'ladi; pin_cpus=True
+        bo'lsa thread slotga ajratilgan yadrolarga bog'lanadi. Thread
+        limitlari bu yerda o'zgartirilmaydi (apply_process_limits).
+
+        Yields:
+            int: Slot raqami
+        """
+        slot = self._slots.get()
+        previous_affinity = None
+
+        try:
+            if self.pin_cpus:
+                try:
+                    # Linux'da pid=0 chaqirayotgan thread'ni bildiradi
+                    previous_affinity = os.sched_getaffinity(0)
+                    os.sched_setaffinity(0, self.partitions[slot])
+                except OSError as e:
+                    print(f"⚠️ CPU affinity o'rnatilmadi: {str(e)}")
+                    previous_affinity = None
+
+            self._local.slot = slot
+            yield slot
+
+        finally:
+            if previous_affinity is not None:
+                try:
+                    os.sched_setaffinity(0, previous_affinity)
+                except OSError:
+                    pass
+            self._local.slot = None
+            self._slots.put(slot)
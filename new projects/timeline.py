@@ -0,0 +1,232 @@
+"""
+Timeline Join
+=============
+Transkripsiya, spiker, emotsiya va sukut interval oqimlarini bitta vaqt
+chizig'ida birlashtirish
+
+Har bir oqim boshlanish vaqti bo'yicha tartiblangan intervallar ro'yxati
+(dataclass yoki dict, start/end maydonlari bilan). Transkripsiya
+segmentlari bo'ylab har bir oqimda bitta ko'rsatkich oldinga siljiydi
+(sweep-line), shuning uchun birlashtirish O(N + M) - har bir transkripsiya
+segmenti uchun barcha spikerlarni qayta ko'rib chiqish (O(N * M)) yo'q.
+
+Tanlov kesishish davomiyligi bo'yicha:
+    - spiker: segment bilan eng ko'p kesishgan spiker (bir xil spikerning
+      bir nechta intervali qo'shiladi); kesishma bo'lmasa eng yaqin spiker
+      (past confidence bilan)
+    - emotsiya: kesishish * confidence og'irligi eng katta emotsiya
+    - sukut: segment ichidagi sukut davomiyligi (soniya)
+
+Natija - har bir transkripsiya segmenti uchun yagona dict yozuv
+(speaker/text/start/end/confidence kalitlari avvalgi aligned segmentlar
+bilan bir xil, shuning uchun formatlash va subtitrlar o'zgarmaydi).
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+# Kesishmasiz (eng yaqin) spiker tanlanganda confidence koeffitsienti
+NEAREST_SPEAKER_PENALTY = 0.7
+
+
+def _get(item, *keys, default=None):
+    for key in keys:
+        if isinstance(item, dict):
+            if key in item:
+                return item[key]
+        elif hasattr(item, key):
+            return getattr(item, key)
+    return default
+
+
+def _sorted(stream: Optional[List]) -> List:
+    """Oqimni boshlanish vaqti bo'yicha tartiblash (allaqachon tartiblangan bo'lsa nusxasiz)"""
+    if not stream:
+        return []
+
+    starts = [_get(item, 'start') for item in stream]
+    if all(a <= b for a, b in zip(starts, starts[1:])):
+        return stream
+    return sorted(stream, key=lambda item: _get(item, 'start'))
+
+
+def _sweep(queries: List, stream: List):
+    """
+    Har bir so'rov intervali uchun oqimdagi kesishmalar (bitta o'tish)
+
+    So'rovlar va oqim boshlanish bo'yicha tartiblangan bo'lishi kerak.
+    Ko'rsatkich so'rov boshlanishidan oldin tugagan intervallardan o'tib
+    ketadi va orqaga qaytmaydi.
+
+    Yields:
+        Tuple[List[Tuple[item, float]], item, item]: (interval, kesishish
+            soniyasi) ro'yxati, undan oldingi va keyingi eng yaqin intervallar
+    """
+    starts = [float(_get(item, 'start')) for item in stream]
+    ends = [float(_get(item, 'end')) for item in stream]
+    n = len(stream)
+    j = 0
+
+    for query in queries:
+        q_start = float(_get(query, 'start'))
+        q_end = float(_get(query, 'end'))
+
+        while j < n and ends[j] <= q_start:
+            j += 1
+
+        overlaps = []
+        k = j
+        while k < n and starts[k] < q_end:
+            overlap = min(q_end, ends[k]) - max(q_start, starts[k])
+            if overlap > 0:
+                overlaps.append((stream[k], overlap))
+            k += 1
+
+        # Nol uzunlikdagi segment: uni o'z ichiga olgan interval
+        if q_end <= q_start and j < n and starts[j] <= q_start < ends[j]:
+            overlaps.append((stream[j], 0.0))
+
+        before = stream[j - 1] if j > 0 else None
+        after = stream[k] if k < n else None
+        yield overlaps, before, after
+
+
+def _pick_label(overlaps: List[Tuple], label_keys: Tuple[str, ...], by_confidence: bool):
+    """
+    Kesishish og'irligi eng katta yorliq
+
+    Returns:
+        Tuple[str, float, float]: Yorliq, kesishish (soniya) va
+            kesishish bo'yicha o'rtacha confidence
+    """
+    weights: Dict[str, float] = {}
+    seconds: Dict[str, float] = {}
+    confidence: Dict[str, float] = {}
+
+    for item, overlap in overlaps:
+        label = _get(item, *label_keys)
+        conf = float(_get(item, 'confidence', default=1.0))
+        weights[label] = weights.get(label, 0.0) + overlap * (conf if by_confidence else 1.0)
+        seconds[label] = seconds.get(label, 0.0) + overlap
+        confidence[label] = confidence.get(label, 0.0) + overlap * conf
+
+    label = max(weights, key=weights.get)
+    if seconds[label] > 0:
+        mean_conf = confidence[label] / seconds[label]
+    else:
+        mean_conf = float(_get(overlaps[0][0], 'confidence', default=1.0))
+    return label, seconds[label], mean_conf
+
+
+def join_timeline(
+    transcript: List,
+    speakers: Optional[List] = None,
+    emotions: Optional[List] = None,
+    silences: Optional[List] = None
+) -> List[Dict]:
+    """
+    Interval oqimlarini transkripsiya segmentlari bo'yicha birlashtirish
+
+    Args:
+        transcript (List): Transkripsiya segmentlari (text, start, end, confidence)
+        speakers (List, optional): Spiker segmentlari (speaker_id yoki speaker)
+        emotions (List, optional): Emotsiya bashoratlari (emotion, confidence)
+        silences (List, optional): Sukut intervallari (start, end)
+
+    Returns:
+        List[Dict]: Har bir segment uchun yozuv - speaker, text, start, end,
+            confidence, speaker_overlap (segmentning spiker bilan qoplangan
+            ulushi), emotion, emotion_confidence, silence (soniya)
+    """
+    transcript = _sorted(transcript)
+    speakers = _sorted(speakers)
+    emotions = _sorted(emotions)
+    silences = _sorted(silences)
+
+    records = []
+    for seg in transcript:
+        start = float(_get(seg, 'start'))
+        end = float(_get(seg, 'end'))
+        records.append({
+            'speaker': None,
+            'text': _get(seg, 'text', default=''),
+            'start': start,
+            'end': end,
+            'confidence': float(_get(seg, 'confidence', default=1.0)),
+            'speaker_overlap': 0.0,
+            'emotion': None,
+            'emotion_confidence': None,
+            'silence': 0.0,
+        })
+
+    if speakers:
+        for record, (overlaps, before, after) in zip(records, _sweep(transcript, speakers)):
+            duration = record['end'] - record['start']
+
+            if overlaps:
+                label, seconds, speaker_conf = _pick_label(overlaps, ('speaker_id', 'speaker'), False)
+                record['speaker'] = label
+                record['speaker_overlap'] = seconds / duration if duration > 0 else 1.0
+                record['confidence'] = (speaker_conf + record['confidence']) / 2
+                continue
+
+            # Kesishma yo'q: oldingi yoki keyingi eng yaqin spiker
+            mid = (record['start'] + record['end']) / 2
+            candidates = []
+            if before is not None:
+                candidates.append((mid - float(_get(before, 'end')), before))
+            if after is not None:
+                candidates.append((float(_get(after, 'start')) - mid, after))
+            nearest = min(candidates, key=lambda c: c[0])[1]
+            record['speaker'] = _get(nearest, 'speaker_id', 'speaker')
+            record['confidence'] *= NEAREST_SPEAKER_PENALTY
+
+    if emotions:
+        for record, (overlaps, _, _) in zip(records, _sweep(transcript, emotions)):
+            if overlaps:
+                label, _, emotion_conf = _pick_label(overlaps, ('emotion',), True)
+                record['emotion'] = label
+                record['emotion_confidence'] = emotion_conf
+
+    if silences:
+        for record, (overlaps, _, _) in zip(records, _sweep(transcript, silences)):
+            record['silence'] = sum((overlap for _, overlap in overlaps), 0.0)
+
+    return records
+
+
+def summarize_speaker_emotions(records: List[Dict]) -> Dict[str, Dict]:
+    """
+    Spikerlar bo'yicha emotsiya taqsimoti
+
+    Args:
+        records (List[Dict]): join_timeline natijasi
+
+    Returns:
+        Dict[str, Dict]: Spiker -> {'duration', 'segments', 'emotions'}
+            (emotions: emotsiya -> gapirilgan vaqt ulushi)
+    """
+    summary: Dict[str, Dict] = {}
+
+    for record in records:
+        speaker = record.get('speaker')
+        if speaker is None:
+            continue
+
+        duration = max(0.0, record['end'] - record['start'])
+        entry = summary.setdefault(speaker, {'duration': 0.0, 'segments': 0, 'emotions': {}})
+        entry['duration'] += duration
+        entry['segments'] += 1
+
+        emotion = record.get('emotion')
+        if emotion is not None:
+            entry['emotions'][emotion] = entry['emotions'].get(emotion, 0.0) + duration
+
+    for entry in summary.values():
+        total = sum(entry['emotions'].values())
+        entry['emotions'] = {
+            emotion: seconds / total
+            for emotion, seconds in sorted(entry['emotions'].items(), key=lambda x: x[1], reverse=True)
+        } if total > 0 else {}
+
+    return summary